@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+from arte.data.trade_resampler import ONE_DAY_MS
+
+
+class AuxiliarySeries:
+    """
+    Class AuxiliarySeries
+        환율, funding rate 등 backtest에 필요한 보조 시계열을 replay 시간 grid에 맞춘 float array로 미리 계산해 두는 모듈
+        start_time부터 end_time까지를 resolution_ms 간격으로 나누고, 각 칸에는 그 시작 시점 이전의 가장 최근 관측값을 저장함.
+        (일 단위 market_index.csv는 resolution_ms=ONE_DAY_MS, 분 단위 환율은 resolution_ms=60000 등)
+        이후 get은 index 계산 한 번으로 값을 반환하므로 매 step 호출해도 부담이 없음.
+
+    Attributes:
+        name : series 이름 ( ex : "exchange_rate" )
+        start_time : grid의 시작 timestamp
+        resolution_ms : grid 간격, ms 단위
+        values : grid 별 값을 가진 float64 array, start_time 이전에 관측값이 없던 칸은 nan
+
+    Functions:
+        __init__ : name, start_time, end_time, resolution_ms 입력 필요
+        load_series : timestamp ( 또는 날짜 문자열 ) index를 가진 pd.Series를 grid에 맞춰 values에 저장
+        load_csv : 첫 column을 index로 하는 csv 파일의 value_column을 읽어 load_series 실행
+        get : 특정 시점의 값을 반환, start_time 이전 시점은 nan ( 미래 값을 읽지 않도록 )
+
+    """
+
+    def __init__(self, name: str, start_time, end_time, resolution_ms: int = ONE_DAY_MS):
+        self.name = name
+        self.start_time = pd.Timestamp(start_time)
+        self.resolution_ms = resolution_ms
+
+        self._start_ns = self.start_time.value
+        self._resolution_ns = resolution_ms * 1_000_000
+        n_slots = -(-(pd.Timestamp(end_time).value - self._start_ns) // self._resolution_ns)
+        self.values = np.full(max(n_slots, 1), np.nan)
+        self._values_view = memoryview(self.values)
+
+    def load_series(self, series: pd.Series):
+        """
+        series의 값을 grid의 각 칸 시작 시점 기준 as-of로 정렬하여 values에 저장
+        값이 "1,180.5" 처럼 쉼표가 들어간 문자열이어도 float로 변환
+        """
+        if series.dtype == object:
+            series = series.astype(str).str.replace(",", "")
+        observed_values = pd.to_numeric(series).to_numpy(dtype=np.float64)
+        observed_times = pd.to_datetime(series.index).values.astype("datetime64[ns]").astype(np.int64)
+
+        order = np.argsort(observed_times, kind="stable")
+        observed_times = observed_times[order]
+        observed_values = observed_values[order]
+
+        if len(observed_times) == 0:
+            self.values = np.full(len(self.values), np.nan)
+            self._values_view = memoryview(self.values)
+            return
+
+        slot_times = self._start_ns + np.arange(len(self.values), dtype=np.int64) * self._resolution_ns
+        positions = np.searchsorted(observed_times, slot_times, side="right") - 1
+        self.values = np.where(positions >= 0, observed_values[np.maximum(positions, 0)], np.nan)
+        self._values_view = memoryview(self.values)
+
+    def load_csv(self, csv_path: str, value_column: str = "value"):
+        series_df = pd.read_csv(csv_path, index_col=0)
+        self.load_series(series_df[value_column])
+
+    def get(self, current_time):
+        slot = (current_time.value - self._start_ns) // self._resolution_ns
+        if slot < 0:
+            # before the grid, a negative slot would index a later value from the end
+            return np.nan
+        if slot >= len(self.values):
+            slot = len(self.values) - 1
+        return self._values_view[slot]
@@ -0,0 +1,322 @@
+"""
+live websocket message를 압축된 segment 파일로 기록하고 다시 읽습니다.
+"""
+import os
+import gzip
+import time
+import queue
+import struct
+import logging
+import threading
+
+ONE_HOUR_MS = 3600 * 1000
+
+# receive time ( ms ), 1 if the payload was bytes ( upbit ) else 0 ( binance str ), payload length
+RECORD_HEADER = struct.Struct("<qBI")
+SEGMENT_SUFFIX = ".seg.gz"
+INDEX_SUFFIX = ".idx"
+
+_STOP = object()
+
+
+def encode_records(records):
+    """
+    records : (receive_time, message) list, message는 str 또는 bytes
+    """
+    chunks = []
+    for receive_time, message in records:
+        is_bytes = isinstance(message, (bytes, bytearray))
+        payload = bytes(message) if is_bytes else message.encode("utf-8")
+        chunks.append(RECORD_HEADER.pack(receive_time, is_bytes, len(payload)))
+        chunks.append(payload)
+    return b"".join(chunks)
+
+
+def decode_records(data: bytes):
+    offset = 0
+    while offset < len(data):
+        receive_time, is_bytes, length = RECORD_HEADER.unpack_from(data, offset)
+        offset += RECORD_HEADER.size
+        payload = data[offset : offset + length]
+        offset += length
+        yield receive_time, payload if is_bytes else payload.decode("utf-8")
+
+
+class _SegmentWriter:
+    """
+    한 channel의 segment 파일에 block ( gzip member ) 단위로 append 하고, block 마다 index 한 줄을 추가함.
+    segment_ms 경계를 넘거나 파일이 max_segment_bytes 이상이 되면 새 segment 파일로 rotate.
+    """
+
+    def __init__(self, channel_path, channel, segment_ms, max_segment_bytes, compresslevel):
+        self.channel_path = channel_path
+        self.channel = channel
+        self.segment_ms = segment_ms
+        self.max_segment_bytes = max_segment_bytes
+        self.compresslevel = compresslevel
+        self.segment_file = None
+        self.index_file = None
+        self.segment_end = None
+        os.makedirs(channel_path, exist_ok=True)
+
+    def _open(self, first_time):
+        self.close()
+        base_path = os.path.join(self.channel_path, f"{self.channel}-{first_time}")
+        self.segment_file = open(base_path + SEGMENT_SUFFIX, "ab")
+        self.index_file = open(base_path + INDEX_SUFFIX, "a")
+        self.segment_end = first_time - first_time % self.segment_ms + self.segment_ms
+
+    def _needs_rotate(self, receive_time):
+        return (
+            self.segment_file is None
+            or receive_time >= self.segment_end
+            or self.segment_file.tell() >= self.max_segment_bytes
+        )
+
+    def write(self, records):
+        block_start = 0
+        for i, (receive_time, _) in enumerate(records):
+            if self._needs_rotate(receive_time):
+                self._write_block(records[block_start:i])
+                self._open(receive_time)
+                block_start = i
+        self._write_block(records[block_start:])
+
+    def _write_block(self, records):
+        if not records:
+            return
+        block = gzip.compress(encode_records(records), compresslevel=self.compresslevel)
+        offset = self.segment_file.tell()
+        self.segment_file.write(block)
+        self.segment_file.flush()
+        # the index line is written after its block, so an indexed block is always complete
+        receive_times = [receive_time for receive_time, _ in records]
+        self.index_file.write(f"{min(receive_times)},{max(receive_times)},{offset},{len(block)},{len(records)}\n")
+        self.index_file.flush()
+
+    def close(self):
+        if self.segment_file is not None:
+            self.segment_file.close()
+            self.index_file.close()
+            self.segment_file = None
+            self.index_file = None
+
+
+class MarketDataCapture:
+    """
+    Class MarketDataCapture
+        WebsocketConnection이 받은 raw message를 수신 시각과 함께 background thread에서 파일로 기록하는 모듈
+        websocket thread는 put으로 (channel, receive_time, message) 를 queue에 넣기만 하고,
+        writer thread가 flush_interval 마다 모은 message를 channel 별로 gzip block으로 압축하여
+            root_path/{channel}/{channel}-{첫 receive_time}.seg.gz : gzip member ( block ) 들을 append 한 segment 파일
+            root_path/{channel}/{channel}-{첫 receive_time}.idx : block 별 "최소 시각,최대 시각,offset,크기,message 수" 줄
+        에 저장함. segment 파일은 gzip -d로도 풀 수 있으며, CaptureReader가 index로 필요한 block만 읽음.
+        block 기록이 실패하면 ( disk full, 권한, str / bytes가 아닌 message 등 ) log를 남기고 그 block의 message를 버림.
+        max_errors 번 연속으로 실패하면 기록을 멈추고 put은 message를 버리기만 하므로 queue가 계속 커지지 않음.
+
+    Attributes:
+        root_path : segment 파일들이 저장되는 base 경로
+        segment_ms : segment 파일의 시간 길이, ms 단위 ( 경계에 맞춰 rotate )
+        max_segment_bytes : segment 파일의 최대 크기, 넘으면 rotate
+        flush_interval : writer thread가 block을 쓰는 간격, 초 단위
+        max_block_records : block 하나에 넣는 최대 message 수
+        written : 파일에 기록한 message 수
+        dropped : 기록에 실패했거나 기록을 멈춘 뒤 받아서 버린 message 수
+        error : 마지막으로 발생한 기록 exception, 없으면 None
+        stopped_on_error : 연속 실패로 기록을 멈췄는지 여부
+        max_errors : 기록을 멈추기 전까지 허용하는 연속 실패 block 수
+
+    Functions:
+        put : (channel, receive_time, message) tuple을 queue에 추가 ( websocket thread의 hot path )
+        capture : put의 인자를 풀어서 받는 버전
+        close : 남은 message를 모두 기록하고 writer thread를 종료
+        is_capturing : writer thread가 살아 있고 기록을 멈추지 않았는지 반환 ( live system의 상태 확인용 )
+
+    """
+
+    def __init__(
+        self,
+        root_path: str,
+        segment_ms: int = ONE_HOUR_MS,
+        max_segment_bytes: int = 256 * 1024 * 1024,
+        flush_interval: float = 1.0,
+        max_block_records: int = 100000,
+        compresslevel: int = 6,
+        max_errors: int = 3,
+    ):
+        self.root_path = root_path
+        self.segment_ms = segment_ms
+        self.max_segment_bytes = max_segment_bytes
+        self.flush_interval = flush_interval
+        self.max_block_records = max_block_records
+        self.compresslevel = compresslevel
+        self.max_errors = max_errors
+        self.written = 0
+        self.dropped = 0
+        self.error = None
+        self.stopped_on_error = False
+        self.logger = logging.getLogger(__name__)
+        self._queue = queue.SimpleQueue()
+        # bound C method, the websocket thread pays only this call
+        self.put = self._queue.put
+        self._writers = dict()
+        self._thread = threading.Thread(target=self._run, name="market-data-capture", daemon=True)
+        self._thread.start()
+
+    def capture(self, channel: str, receive_time: int, message):
+        self.put((channel, receive_time, message))
+
+    def close(self, timeout: float = None):
+        # not self.put, it drops every item once the capture stopped on errors
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def is_capturing(self):
+        return self._thread.is_alive() and not self.stopped_on_error
+
+    def _drop(self, item):
+        self.dropped += 1
+
+    def _run(self):
+        stopped = False
+        consecutive_errors = 0
+        while not stopped:
+            batch = []
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stopped = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.max_block_records:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if self._write_batch(batch):
+                consecutive_errors = 0
+            else:
+                consecutive_errors += 1
+                if consecutive_errors >= self.max_errors:
+                    self._stop_on_error()
+                    stopped = True
+        for writer in self._writers.values():
+            try:
+                writer.close()
+            except Exception as e:
+                self.logger.error(f"[MarketDataCapture] closing {writer.channel} failed : {e}")
+
+    def _stop_on_error(self):
+        self.logger.error(f"[MarketDataCapture] capture stopped after {self.max_errors} failed blocks : {self.error!r}")
+        self.stopped_on_error = True
+        self.put = self._drop
+        # drain what the websocket threads put before the switch
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                self.dropped += 1
+
+    def _write_batch(self, batch):
+        # returns False if a channel block of the batch could not be written
+        succeeded = True
+        by_channel = dict()
+        for channel, receive_time, message in batch:
+            by_channel.setdefault(channel, []).append((receive_time, message))
+        for channel, records in by_channel.items():
+            try:
+                if channel not in self._writers:
+                    self._writers[channel] = _SegmentWriter(
+                        os.path.join(self.root_path, channel),
+                        channel,
+                        self.segment_ms,
+                        self.max_segment_bytes,
+                        self.compresslevel,
+                    )
+                self._writers[channel].write(records)
+            except Exception as e:
+                self.error = e
+                self.dropped += len(records)
+                self.logger.error(f"[MarketDataCapture] {len(records)} {channel} messages dropped : {e!r}")
+                succeeded = False
+            else:
+                self.written += len(records)
+        return succeeded
+
+
+class CaptureReader:
+    """
+    Class CaptureReader
+        MarketDataCapture가 저장한 segment 파일들을 수신 시각 순서로 읽는 모듈
+        segment 별 index로 [start_time, end_time) 과 겹치지 않는 block은 압축을 풀지 않고 건너뜀.
+        message는 파일에 기록된 순서로 반환하므로, 여러 connection이 같은 channel에 기록하면 시각이 ms 단위로 앞뒤가 바뀔 수 있음.
+
+    Attributes:
+        root_path : MarketDataCapture의 root_path
+
+    Functions:
+        channels : 저장된 channel 목록을 반환
+        segments : channel의 segment 별 (첫 시각, segment 경로, index 경로) list를 반환
+        read_index : index 파일의 block 별 (최소 시각, 최대 시각, offset, 크기, message 수) list를 반환
+        read : channel의 (receive_time, message) 를 시간 범위로 iterate
+
+    """
+
+    def __init__(self, root_path: str):
+        self.root_path = root_path
+
+    def channels(self):
+        if not os.path.isdir(self.root_path):
+            return []
+        return sorted(name for name in os.listdir(self.root_path) if os.path.isdir(os.path.join(self.root_path, name)))
+
+    def segments(self, channel: str):
+        channel_path = os.path.join(self.root_path, channel)
+        segments = []
+        for file_name in os.listdir(channel_path):
+            if file_name.endswith(SEGMENT_SUFFIX):
+                base_name = file_name[: -len(SEGMENT_SUFFIX)]
+                first_time = int(base_name.rsplit("-", 1)[1])
+                base_path = os.path.join(channel_path, base_name)
+                segments.append((first_time, base_path + SEGMENT_SUFFIX, base_path + INDEX_SUFFIX))
+        return sorted(segments)
+
+    @staticmethod
+    def read_index(index_path: str):
+        blocks = []
+        if os.path.exists(index_path):
+            with open(index_path, "r") as f:
+                for line in f:
+                    fields = line.split(",")
+                    # a line cut by a crash has less than five fields
+                    if len(fields) == 5 and line.endswith("\n"):
+                        blocks.append(tuple(int(field) for field in fields))
+        return blocks
+
+    def read(self, channel: str, start_time: int = None, end_time: int = None):
+        """
+        start_time, end_time : ms 단위 수신 시각, None이면 처음 또는 끝까지
+        """
+        for _, segment_path, index_path in self.segments(channel):
+            blocks = [
+                block
+                for block in self.read_index(index_path)
+                if (start_time is None or block[1] >= start_time) and (end_time is None or block[0] < end_time)
+            ]
+            if not blocks:
+                continue
+            with open(segment_path, "rb") as f:
+                for _, _, offset, size, _ in blocks:
+                    f.seek(offset)
+                    for receive_time, message in decode_records(gzip.decompress(f.read(size))):
+                        if (start_time is None or receive_time >= start_time) and (
+                            end_time is None or receive_time < end_time
+                        ):
+                            yield receive_time, message
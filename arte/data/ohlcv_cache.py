@@ -0,0 +1,92 @@
+import os
+import json
+import shutil
+import tempfile
+
+import numpy as np
+
+from arte.data.trade_resampler import OHLCV_COLUMNS, OHLCV_DTYPES
+
+CACHE_VERSION = 1
+
+
+class OhlcvCache:
+    """
+    Class OhlcvCache
+        TestDataLoader가 trade data csv를 ohlcv로 변환한 결과를 디스크에 저장하는 cache 모듈
+        (venue, symbol, date, interval) 별로 column 하나 당 .npy 파일 하나로 저장하고,
+        다시 읽을 때는 memory-map으로 열어서 csv parsing 및 groupby를 건너뜀.
+        원본 csv 파일의 mtime, size ( source ) 가 바뀌면 cache를 무효화하고 다시 변환함.
+
+    Attributes:
+        cache_path : cache 파일들이 저장되는 base 경로
+
+    Functions:
+        __init__ : Class 선언 시 cache_path 입력 필요
+        source_stat : 원본 파일의 mtime, size를 cache key로 쓸 source dict로 반환
+        load : cache된 ohlcv가 유효하면 column 별 memory-mapped array의 dict를 반환, 없으면 None
+        save : TradeResampler로 변환된 ohlcv column dict를 column 별 .npy 파일로 저장
+
+    """
+
+    def __init__(self, cache_path: str):
+        self.cache_path = cache_path
+
+    def _entry_path(self, venue: str, symbol: str, date: str, interval: int):
+        return os.path.join(self.cache_path, venue, symbol, f"{symbol}-{date}-{interval}ms")
+
+    @staticmethod
+    def source_stat(source_path: str):
+        stat = os.stat(source_path)
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    def load(self, venue: str, symbol: str, date: str, interval: int, source: dict):
+        """
+        cache가 존재하고 저장 시의 source ( 원본 csv의 mtime, size ) 가 같으면 column 별 memory-mapped array를 반환
+        """
+        entry_path = self._entry_path(venue, symbol, date, interval)
+        meta_path = os.path.join(entry_path, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+
+        if meta.get("version") != CACHE_VERSION or meta.get("source") != source:
+            return None
+
+        return {column: np.load(os.path.join(entry_path, f"{column}.npy"), mmap_mode="r") for column in meta["columns"]}
+
+    def save(self, venue: str, symbol: str, date: str, interval: int, source: dict, ohlcv_columns: dict):
+        """
+        ohlcv column dict를 column 별 .npy 파일로 저장, 임시 경로에 쓴 후 교체하여 중간에 실패해도 깨진 cache가 남지 않음
+        """
+        entry_path = self._entry_path(venue, symbol, date, interval)
+        parent_path = os.path.dirname(entry_path)
+        os.makedirs(parent_path, exist_ok=True)
+
+        columns = {"timestamp": np.asarray(ohlcv_columns["timestamp"], dtype=np.int64)}
+        for column in OHLCV_COLUMNS:
+            columns[column] = np.asarray(ohlcv_columns[column], dtype=OHLCV_DTYPES[column])
+        if "last_askbid" in ohlcv_columns:
+            columns["last_askbid"] = np.asarray(ohlcv_columns["last_askbid"], dtype=np.int8)
+
+        temp_path = tempfile.mkdtemp(dir=parent_path)
+        try:
+            for column, values in columns.items():
+                np.save(os.path.join(temp_path, f"{column}.npy"), values)
+
+            meta = {
+                "version": CACHE_VERSION,
+                "source": source,
+                "columns": list(columns.keys()),
+            }
+            with open(os.path.join(temp_path, "meta.json"), "w") as f:
+                json.dump(meta, f)
+
+            if os.path.exists(entry_path):
+                shutil.rmtree(entry_path)
+            os.replace(temp_path, entry_path)
+        except:
+            shutil.rmtree(temp_path, ignore_errors=True)
+            raise
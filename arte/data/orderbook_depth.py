@@ -0,0 +1,92 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+class OrderbookDepth:
+    """
+    Class OrderbookDepth
+        한 market, symbol의 orderbook snapshot들을 (snapshot 수, level 수) 모양의 float64 array로 가지고 있는 모듈
+        level 0이 최우선 호가이고, 각 level까지의 누적 수량, 누적 금액을 load 시점에 미리 계산해 두므로
+        FillSimulator가 매 주문마다 depth를 walk할 때 snapshot 한 줄에 대해 searchsorted 한 번만 하면 됨.
+        snapshot에 없는 level ( nan ) 은 가격, 수량 0으로 채움.
+
+    Attributes:
+        timestamps : snapshot의 ms timestamp int64 array, 오름차순
+        ask_prices, ask_sizes, bid_prices, bid_sizes : level 별 호가, 잔량 array
+        ask_cum_sizes, ask_cum_notionals, bid_cum_sizes, bid_cum_notionals : level 별 누적 잔량, 누적 금액 array
+
+    Functions:
+        __init__ : timestamps와 ask, bid의 가격, 잔량 array 입력 필요
+        from_frame : timestamp, ask_price_0, ask_size_0, bid_price_0, bid_size_0, ... column의 Dataframe으로 생성
+        load : root_data_path/{market}_orderbook/{SYMBOL}/{SYMBOL}-YYYY-MM-DD.csv 파일들로 생성
+        snapshot_index : 특정 시점 이전의 가장 최근 snapshot index를 반환, 없으면 None
+        asks, bids : snapshot의 (가격, 누적 잔량, 누적 금액) array를 반환
+
+    """
+
+    def __init__(self, timestamps, ask_prices, ask_sizes, bid_prices, bid_sizes):
+        self.timestamps = np.ascontiguousarray(timestamps, dtype=np.int64)
+        self.ask_prices, self.ask_sizes = self._clean_levels(ask_prices, ask_sizes)
+        self.bid_prices, self.bid_sizes = self._clean_levels(bid_prices, bid_sizes)
+        self.ask_cum_sizes = np.cumsum(self.ask_sizes, axis=1)
+        self.ask_cum_notionals = np.cumsum(self.ask_prices * self.ask_sizes, axis=1)
+        self.bid_cum_sizes = np.cumsum(self.bid_sizes, axis=1)
+        self.bid_cum_notionals = np.cumsum(self.bid_prices * self.bid_sizes, axis=1)
+
+    @staticmethod
+    def _clean_levels(prices, sizes):
+        prices = np.atleast_2d(np.asarray(prices, dtype=np.float64))
+        sizes = np.atleast_2d(np.asarray(sizes, dtype=np.float64))
+        missing = np.isnan(prices) | np.isnan(sizes)
+        return np.ascontiguousarray(np.where(missing, 0, prices)), np.ascontiguousarray(np.where(missing, 0, sizes))
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __repr__(self):
+        return f"OrderbookDepth({len(self)} snapshots, {self.ask_prices.shape[1]} levels)"
+
+    @classmethod
+    def from_frame(cls, orderbook_df: pd.DataFrame):
+        n_levels = sum(1 for column in orderbook_df.columns if column.startswith("ask_price_"))
+        orderbook_df = orderbook_df.sort_values("timestamp", kind="stable")
+
+        def level_columns(name):
+            return orderbook_df[[f"{name}_{level}" for level in range(n_levels)]].to_numpy(dtype=np.float64)
+
+        return cls(
+            orderbook_df["timestamp"].to_numpy(),
+            level_columns("ask_price"),
+            level_columns("ask_size"),
+            level_columns("bid_price"),
+            level_columns("bid_size"),
+        )
+
+    @classmethod
+    def load(cls, root_data_path: str, market: str, symbol: str, dates: list):
+        """
+        dates : YYYY-MM-DD 문자열 list, 파일이 없는 일자는 건너뜀
+        """
+        orderbook_dfs = []
+        for date_str in dates:
+            path = os.path.join(root_data_path, f"{market}_orderbook", symbol, f"{symbol}-{date_str}.csv")
+            if os.path.exists(path):
+                orderbook_dfs.append(pd.read_csv(path))
+        if not orderbook_dfs:
+            raise FileNotFoundError(f"no orderbook data of {market} {symbol} in {root_data_path}")
+        return cls.from_frame(pd.concat(orderbook_dfs, ignore_index=True))
+
+    def snapshot_index(self, current_time):
+        # as-of snapshot, current_time is a pd.Timestamp or ms timestamp
+        if isinstance(current_time, pd.Timestamp):
+            current_time = current_time.value // 1_000_000
+        index = int(np.searchsorted(self.timestamps, current_time, side="right")) - 1
+        return index if index >= 0 else None
+
+    def asks(self, index: int):
+        return self.ask_prices[index], self.ask_cum_sizes[index], self.ask_cum_notionals[index]
+
+    def bids(self, index: int):
+        return self.bid_prices[index], self.bid_cum_sizes[index], self.bid_cum_notionals[index]
@@ -0,0 +1,154 @@
+from collections.abc import Mapping
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from arte.data.trade_resampler import ASKBID_NAMES, OHLCV_COLUMNS, OHLCV_DTYPES
+
+ASKBID_NAME_TUPLE = tuple(ASKBID_NAMES.tolist())
+
+
+class ReplayCursor:
+    """
+    Class ReplayCursor
+        Backtest replay를 위한 array 기반 ohlcv 저장 모듈
+        market 별로 field(open, high, low, close, volume, trade_num, last_askbid) 하나 당
+        (symbol, time step) 모양의 numpy matrix 하나에 전체 기간의 ohlcv를 저장함.
+        last_askbid는 int8 code로 저장하고 TradeParser와 같은 dict에 채울 때만 "ASK", "BID", "NONE" 문자열로 바꿈.
+        매 step에서는 symbol 별 row의 memoryview를 index 하므로 row 생성이나 numpy scalar 변환 없이 값을 읽음.
+
+    Attributes:
+        symbols : replay 할 pure symbol의 list
+        start_time : 첫 번째 time step의 timestamp
+        interval : time step 간의 간격, ms 단위
+        n_steps : 전체 time step의 수
+        markets : market 이름을 key로, {field : matrix} dict를 value로 가지는 dict
+
+    Functions:
+        add_market : market의 field 별 matrix를 할당
+        write : 특정 symbol의 ohlcv column dict를 offset 위치부터 matrix에 복사
+        time_at : counter 번째 time step의 timestamp를 반환
+        fill_prices : counter 번째 time step의 가격을 price dict에 채움
+        fill_askbids : counter 번째 time step의 last_askbid를 dict에 채움
+        to_frame : 특정 market, symbol의 ohlcv를 Dataframe으로 변환
+        frames : market의 symbol 별 ohlcv Dataframe을 필요할 때 만들어 주는 Mapping을 반환
+        share : 모든 matrix를 shared memory로 복사하고 attach에 넘길 meta dict를 반환
+        attach : share의 meta dict로 다른 process에서 같은 shared memory를 복사 없이 읽는 ReplayCursor를 생성
+
+    """
+
+    def __init__(self, symbols: list, start_time, interval: int, n_steps: int):
+        self.symbols = list(symbols)
+        self.symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.start_time = pd.Timestamp(start_time)
+        self.interval = interval
+        self.n_steps = n_steps
+        self.markets = dict()
+        self._row_views = dict()
+
+        self._start_ns = self.start_time.value
+        self._interval_ns = interval * 1_000_000
+
+    def add_market(self, market: str, with_askbid: bool = False):
+        fields = {
+            column: np.zeros((len(self.symbols), self.n_steps), dtype=OHLCV_DTYPES[column]) for column in OHLCV_COLUMNS
+        }
+        if with_askbid:
+            fields["last_askbid"] = np.zeros((len(self.symbols), self.n_steps), dtype=np.int8)
+        self._set_market(market, fields)
+
+    def _set_market(self, market: str, fields: dict):
+        self.markets[market] = fields
+        self._row_views[market] = {
+            field: [(symbol, memoryview(matrix[i])) for i, symbol in enumerate(self.symbols)]
+            for field, matrix in fields.items()
+        }
+
+    def write(self, market: str, symbol: str, offset: int, ohlcv_columns: dict):
+        symbol_idx = self.symbol_index[symbol]
+        for field, matrix in self.markets[market].items():
+            values = ohlcv_columns[field]
+            matrix[symbol_idx, offset : offset + len(values)] = values
+
+    def time_at(self, counter: int):
+        return pd.Timestamp(self._start_ns + self._interval_ns * counter)
+
+    def fill_prices(self, market: str, counter: int, price: dict, field: str = "close"):
+        for symbol, row in self._row_views[market][field]:
+            price[symbol] = row[counter]
+
+    def fill_askbids(self, market: str, counter: int, last_askbid: dict):
+        for symbol, row in self._row_views[market]["last_askbid"]:
+            last_askbid[symbol] = ASKBID_NAME_TUPLE[row[counter]]
+
+    def to_frame(self, market: str, symbol: str):
+        symbol_idx = self.symbol_index[symbol]
+        fields = self.markets[market]
+        ohlcv_df = pd.DataFrame({column: fields[column][symbol_idx] for column in OHLCV_COLUMNS})
+        if "last_askbid" in fields:
+            ohlcv_df["last_askbid"] = ASKBID_NAMES[fields["last_askbid"][symbol_idx]]
+        return ohlcv_df
+
+    def frames(self, market: str):
+        return _OhlcvFrames(self, market)
+
+    def share(self):
+        """
+        모든 market의 matrix를 shared memory block으로 복사
+        (SharedMemory list, meta dict) 를 반환하며, SharedMemory는 사용이 끝난 뒤 close, unlink 해야 함
+        """
+        blocks = []
+        meta = dict(
+            symbols=self.symbols,
+            start_time=self._start_ns,
+            interval=self.interval,
+            n_steps=self.n_steps,
+            markets=dict(),
+        )
+        for market, fields in self.markets.items():
+            meta["markets"][market] = dict()
+            for field, matrix in fields.items():
+                block = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+                np.ndarray(matrix.shape, dtype=matrix.dtype, buffer=block.buf)[:] = matrix
+                blocks.append(block)
+                meta["markets"][market][field] = (block.name, matrix.dtype.str)
+        return blocks, meta
+
+    @classmethod
+    def attach(cls, meta: dict):
+        """
+        share가 만든 shared memory를 read-only matrix로 사용하는 ReplayCursor를 반환
+        share를 호출한 process의 child process ( process pool worker 등 ) 에서 사용하며, block의 unlink는 share를 호출한 process가 담당
+        """
+        cursor = cls(meta["symbols"], pd.Timestamp(meta["start_time"]), meta["interval"], meta["n_steps"])
+        cursor._shared_blocks = []
+        shape = (len(cursor.symbols), cursor.n_steps)
+        for market, shared_fields in meta["markets"].items():
+            fields = dict()
+            for field, (name, dtype) in shared_fields.items():
+                block = shared_memory.SharedMemory(name=name)
+                cursor._shared_blocks.append(block)
+                matrix = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+                matrix.flags.writeable = False
+                fields[field] = matrix
+            cursor._set_market(market, fields)
+        return cursor
+
+
+class _OhlcvFrames(Mapping):
+    # symbol -> ohlcv Dataframe, 접근할 때마다 matrix에서 새로 만듦
+    def __init__(self, cursor: ReplayCursor, market: str):
+        self._cursor = cursor
+        self._market = market
+
+    def __getitem__(self, symbol):
+        if symbol not in self._cursor.symbol_index:
+            raise KeyError(symbol)
+        return self._cursor.to_frame(self._market, symbol)
+
+    def __iter__(self):
+        return iter(self._cursor.symbols)
+
+    def __len__(self):
+        return len(self._cursor.symbols)
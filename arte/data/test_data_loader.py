@@ -1,11 +1,16 @@
 import pandas as pd
 import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from pandas.core.frame import DataFrame
 from tqdm import tqdm
 from datetime import datetime, timedelta
 
 from arte.data.trade_parser import TradeParser
-from arte.system.utils import Grouping
+from arte.data.ohlcv_cache import OhlcvCache
+from arte.data.trade_resampler import TradeResampler, ONE_DAY_MS
+from arte.data.replay_cursor import ReplayCursor
+from arte.data.tick_store import TickStore
+from arte.data.aux_series import AuxiliarySeries
 
 
 class TestDataLoader:
@@ -17,42 +22,85 @@ class TestDataLoader:
 
     Attributes:
         root_data_path : binance, upbit, market_index.csv 등 data의 base 경로
-        upbit_ohlcv : upbit의 trade data를 입력한 interval의 ohlcv로 변환한 Dataframe
-        binance_ohlcv : binance의 trade data를 입력한 interval의 ohlcv로 변환한 Dataframe
+        upbit_ohlcv : upbit의 trade data를 입력한 interval의 ohlcv로 변환한 Dataframe ( symbol로 접근 시 cursor에서 생성 )
+        binance_ohlcv : binance의 trade data를 입력한 interval의 ohlcv로 변환한 Dataframe ( symbol로 접근 시 cursor에서 생성 )
+        cursor : 현재 chunk 기간의 ohlcv를 (symbol, time step) matrix로 가지고 있는 ReplayCursor 객체
+        streaming : True이면 전체 기간 대신 chunk_days 일 단위로 나누어 필요할 때 읽음 ( 다음 chunk는 background에서 미리 읽음 )
+        upbit_ohlcv_views : view_intervals의 interval 별 upbit ohlcv Dataframe ( key : interval, value : {symbol : Dataframe} )
+        binance_ohlcv_views : view_intervals의 interval 별 binance ohlcv Dataframe ( key : interval, value : {symbol : Dataframe} )
         upbit_trade : TradeParser 객체로 current_time에서의 각 symbol별 upbit의 price를 Dict 형태로 저장함
         binance_trade : TradeParser 객체로 current_time에서의 각 symbol별 binance의 price를 Dict 형태로 저장함
         current_time : 현재 upbit_trade, binance_trade에 들어있는 가격에 해당하는 timestamp
         exchange_rate : 현재 current_time의 USDT/KOR 환율
         exchange_rate_df : 각 일자 별 USDT/KOR 환율 정보를 가지고 있는 Dataframe
+        aux_series : 이름 별 AuxiliarySeries 객체의 dict, "exchange_rate"는 항상 포함
+        ohlcv_cache : 변환된 일자 별 ohlcv를 저장하는 OhlcvCache 객체, use_cache=False이면 None
+        tick_store : trade data를 memory-map으로 읽는 TickStore 객체, tick_store_path를 입력하지 않으면 None
 
     Functions:
-        __init__ : Class 선언 시 root_data_path 입력 필요
+        __init__ : Class 선언 시 root_data_path 입력 필요, cache_path, use_cache로 ohlcv cache, tick_store_path로 tick store 설정 가능
         init_test_data_loader : symbol의 list, start_date, end_date, ohlcv를 input으로 받아 trade data를 읽어 ohlcv로 변환
+        load_oneday_ohlcv : 특정 symbol의 하루치 ohlcv를 cache 또는 trade data에서 읽어옴
+        load_trade_range : tick store에서 특정 symbol의 시간 범위 trade를 복사 없이 읽어옴
         load_next : upbit_trade, binance_trade에 current_time의 가격정보 업데이트
         load_next_by_counter : upbit_trade, binance_trade에 current_time의 가격정보 업데이트 ( tqdm 사용 시 )
+        get_view_counter : current_time에 해당하는 view_interval ohlcv의 index를 반환
+        iter_chunks : chunk_days 일 단위의 ohlcv chunk를 순서대로 yield 하는 generator
+        add_aux_series : funding rate 등 보조 시계열 csv를 replay 시간 grid에 맞춰 미리 읽어 둠
+        get_aux_value : current_time에서의 보조 시계열 값을 반환
 
 
     """
 
-    def __init__(self, root_data_path: str):
+    def __init__(
+        self, root_data_path: str, cache_path: str = None, use_cache: bool = True, tick_store_path: str = None
+    ):
         """
         root_data_path를 input으로 받음, root_data_path는 binance, upbit, market_index.csv 등 data의 base 경로
+        cache_path : 변환된 ohlcv를 저장할 경로, None이면 root_data_path/ohlcv_cache 사용
+        use_cache : False이면 cache를 사용하지 않고 항상 trade data csv를 다시 변환
+        tick_store_path : TickStore로 ingest 된 trade data 경로, 입력하면 저장된 일자는 csv 대신 tick store에서 읽음
         """
         self.root_data_path = root_data_path
+        self._init_args = (root_data_path, cache_path, use_cache, tick_store_path)
+        self.ohlcv_cache = None
+        if use_cache:
+            if cache_path is None:
+                cache_path = os.path.join(root_data_path, "ohlcv_cache")
+            self.ohlcv_cache = OhlcvCache(cache_path)
+        self.tick_store = TickStore(tick_store_path) if tick_store_path else None
         self.upbit_ohlcv = dict()
         self.binance_ohlcv = dict()
 
-        self.upbit_ohlcv_list = dict()
-        self.binance_ohlcv_list = dict()
-
-        self.grouping = Grouping()
-
-    def init_test_data_loader(self, symbols: list, start_date: str, end_date: str, ohlcv_interval: int = 250):
+        self.upbit_ohlcv_views = dict()
+        self.binance_ohlcv_views = dict()
+
+        self.resampler = TradeResampler()
+
+    def init_test_data_loader(
+        self,
+        symbols: list,
+        start_date: str,
+        end_date: str,
+        ohlcv_interval: int = 250,
+        view_intervals: list = None,
+        streaming: bool = False,
+        chunk_days: int = 1,
+        n_workers: int = 1,
+        exchange_rate_path: str = None,
+        exchange_rate_resolution: int = ONE_DAY_MS,
+    ):
         """
         symbols : 데이터를 받을 symbol의 list ( ex : ["BTC", "EOS", "ETH"] )
         start_date : 데이터를 읽어 올 시작 일자 ( ex : "2021-10-03" )
         end_date : 데이터를 읽어 올 끝 일자 ( ex : "2021-10-03" )
         ohlcv_inverval : ohlcv로 가공 할 interval, ms 단위 ( ex : 250 )
+        view_intervals : ohlcv_interval 외에 같은 trade data로 함께 가공 할 interval의 list, ms 단위 ( ex : [1000, 60000] )
+        streaming : True이면 전체 기간을 한 번에 읽지 않고 chunk_days 일 단위로 읽어 memory 사용량을 일정하게 유지
+        chunk_days : streaming 시 한 번에 읽을 일 수, streaming 시에는 upbit_ohlcv, binance_ohlcv, view들도 현재 chunk의 데이터만 가짐
+        n_workers : 1보다 크면 (market, symbol, 일자) 별 trade data 읽기 및 ohlcv 변환을 n_workers 개의 process로 나누어 실행
+        exchange_rate_path : USDT/KOR 환율 csv 경로, None이면 root_data_path/market_index.csv 사용
+        exchange_rate_resolution : 환율 값이 바뀔 수 있는 최소 간격, ms 단위 ( 일 단위 환율은 기본값, 분 단위 환율은 60000 )
 
         이 함수가 실행 된 후에
         current_time,
@@ -66,149 +114,262 @@ class TestDataLoader:
         self.symbols = [symbol.upper() for symbol in symbols]
         self.start_date = datetime.strptime(start_date, "%Y-%m-%d")
         self.end_date = datetime.strptime(end_date, "%Y-%m-%d")
-        self.freq = str(ohlcv_interval) + "ms"
         self.ohlcv_interval = ohlcv_interval
+        self.view_intervals = sorted(set(view_intervals or []) - {ohlcv_interval})
+        self.ohlcv_intervals = [ohlcv_interval] + self.view_intervals
+        self.n_workers = n_workers
 
         self.upbit_trade = TradeParser(symbols=self.symbols)
         self.binance_trade = TradeParser(symbols=self.symbols)
 
         self.upbit_last_askbid = {symbol: None for symbol in self.symbols}
 
-        self.init_upbit_test_loader()
-        self.init_binance_test_loader()
-
         self.start_time = pd.to_datetime(start_date)
         self.current_time = pd.to_datetime(start_date)
         self.end_current_time = pd.to_datetime(end_date) + timedelta(days=1)
         self.count = 0
 
-        for symbol in tqdm(self.symbols, ncols=100):
-            self.upbit_ohlcv_list[symbol] = self.upbit_ohlcv[symbol].to_dict("records")
-            self.binance_ohlcv_list[symbol] = self.binance_ohlcv[symbol].to_dict("records")
+        self.steps_per_day = -(-ONE_DAY_MS // self.ohlcv_interval)
+        n_days = (self.end_date - self.start_date).days + 1
+        self.streaming = streaming
+        self.chunk_days = chunk_days if streaming else n_days
+        self.steps_per_chunk = self.steps_per_day * self.chunk_days
+        self.n_chunks = -(-n_days // self.chunk_days)
+
+        self.chunk_index = None
+        self._chunk_iter = None
+        if self.streaming:
+            self._chunk_iter = self.iter_chunks()
+            self._set_chunk(next(self._chunk_iter))
+        else:
+            self._set_chunk(self._load_chunk(0))
 
-        self.exchange_rate_df = pd.read_csv(os.path.join(self.root_data_path, "market_index.csv"), index_col=0)
+        if exchange_rate_path is None:
+            exchange_rate_path = os.path.join(self.root_data_path, "market_index.csv")
+        self.exchange_rate_df = pd.read_csv(exchange_rate_path, index_col=0)
+        self.aux_series = dict()
+        self.add_aux_series("exchange_rate", self.exchange_rate_df["value"], resolution_ms=exchange_rate_resolution)
         self.load_exchange_rate()
         print("Complete Data Loading")
 
-    def init_upbit_test_loader(self):
+    def init_upbit_test_loader(self, chunk: dict, converted_ohlcvs: dict = None):
         """
-        start_date에서부터 end_date 까지의 ohlcv 데이터를 병합
+        chunk의 start_date에서부터 end_date 까지의 upbit ohlcv 데이터를 cursor에 병합
         """
+        chunk["cursor"].add_market("upbit", with_askbid=True)
+        self._init_market_test_loader(
+            chunk, chunk["upbit_ohlcv_views"], is_upbit=True, converted_ohlcvs=converted_ohlcvs
+        )
 
-        for symbol in tqdm(self.symbols, ncols=100):
-            ohlcv_list = []
-
-            current_date = self.start_date
-            while current_date <= self.end_date:
-                trade_df = self.load_trade_data(symbol, current_date, is_upbit=True)
-                oneday_ohlcv = self.upbit_convert_to_ohlcv(trade_df, current_date)
-                ohlcv_list.append(oneday_ohlcv)
-                current_date += timedelta(days=1)
-
-            self.upbit_ohlcv[symbol] = pd.concat(ohlcv_list)
-            self.upbit_ohlcv[symbol].reset_index(drop=True, inplace=True)
-
-    def upbit_convert_to_ohlcv(self, upbit_trade_df: DataFrame, current_date: datetime):
+    def init_binance_test_loader(self, chunk: dict, converted_ohlcvs: dict = None):
         """
-        current_date의 upbit trade 데이터를 ohlcv 데이터로 가공.
+        chunk의 start_date에서부터 end_date 까지의 binance ohlcv 데이터를 cursor에 병합
         """
-        gp = self.grouping.make_group(upbit_trade_df, freq=self.freq)
-        temp_upbit_ohlcv = gp["price"].ohlc()
-        temp_upbit_ohlcv["volume"] = gp["quantity"].sum()
-        temp_upbit_ohlcv["trade_num"] = gp["trade_num"].sum()
-        temp_upbit_ohlcv["last_askbid"] = gp["ask_bid"].nth(-1)
-        temp_upbit_ohlcv["last_askbid"].ffill(inplace=True)
-
-        temp_upbit_ohlcv.fillna(
-            dict.fromkeys(temp_upbit_ohlcv.columns.tolist(), temp_upbit_ohlcv.close.ffill()), inplace=True,
+        chunk["cursor"].add_market("binance_spot")
+        self._init_market_test_loader(
+            chunk, chunk["binance_ohlcv_views"], is_upbit=False, converted_ohlcvs=converted_ohlcvs
         )
-        start_stamp = pd.to_datetime(current_date)
-        end_stamp = temp_upbit_ohlcv.index[0]
-        temp = temp_upbit_ohlcv.iloc[0]["open"]
 
-        while start_stamp < end_stamp:
-            temp_upbit_ohlcv.loc[start_stamp] = [temp, temp, temp, temp, 0.0, 0, "NONE"]
-            start_stamp += timedelta(milliseconds=self.ohlcv_interval)
-
-        temp_upbit_ohlcv.sort_index(inplace=True)
-
-        start_stamp = temp_upbit_ohlcv.index[-1] + timedelta(milliseconds=self.ohlcv_interval)
-        end_stamp = pd.to_datetime(current_date) + timedelta(days=1)
-        temp = temp_upbit_ohlcv.iloc[-1]["close"]
-
-        while start_stamp < end_stamp:
-            temp_upbit_ohlcv.loc[start_stamp] = [temp, temp, temp, temp, 0.0, 0, "NONE"]
-            start_stamp += timedelta(milliseconds=self.ohlcv_interval)
+    def _init_market_test_loader(self, chunk: dict, ohlcv_views: dict, is_upbit: bool, converted_ohlcvs: dict = None):
+        market_path = self.get_market_path(is_upbit)
+        converted_ohlcvs = converted_ohlcvs or dict()
+        for interval in self.view_intervals:
+            ohlcv_views[interval] = dict()
+
+        for symbol in tqdm(self.symbols, ncols=100, disable=self.streaming):
+            view_lists = {interval: [] for interval in self.view_intervals}
+
+            current_date = chunk["start_date"]
+            offset = 0
+            while current_date <= chunk["end_date"]:
+                oneday_ohlcvs = converted_ohlcvs.get((is_upbit, symbol, current_date))
+                if oneday_ohlcvs is None:
+                    oneday_ohlcvs = self.load_oneday_ohlcv(symbol, current_date, is_upbit=is_upbit)
+                chunk["cursor"].write(market_path, symbol, offset, oneday_ohlcvs[self.ohlcv_interval])
+                for interval in self.view_intervals:
+                    view_lists[interval].append(self.resampler.to_frame(oneday_ohlcvs[interval]))
+                offset += self.steps_per_day
+                current_date += timedelta(days=1)
 
-        return temp_upbit_ohlcv
+            for interval, view_list in view_lists.items():
+                merged_ohlcv = pd.concat(view_list)
+                merged_ohlcv.reset_index(drop=True, inplace=True)
+                ohlcv_views[interval][symbol] = merged_ohlcv
 
-    def init_binance_test_loader(self):
+    def _load_chunk(self, chunk_index: int):
         """
-        start_date에서부터 end_date 까지의 ohlcv 데이터를 병합
+        chunk_index 번째 chunk ( chunk_days 일 ) 의 ohlcv를 읽어 새 ReplayCursor에 담아 반환
         """
-        for symbol in tqdm(self.symbols, ncols=100):
-            ohlcv_list = []
-
-            current_date = self.start_date
-            while current_date <= self.end_date:
-                trade_df = self.load_trade_data(symbol, current_date, is_upbit=False)
-                oneday_ohlcv = self.binance_convert_to_ohlcv(trade_df, current_date)
-                ohlcv_list.append(oneday_ohlcv)
-                current_date += timedelta(days=1)
+        chunk_start_date = self.start_date + timedelta(days=chunk_index * self.chunk_days)
+        chunk_end_date = min(chunk_start_date + timedelta(days=self.chunk_days - 1), self.end_date)
+        n_days = (chunk_end_date - chunk_start_date).days + 1
+
+        chunk = {
+            "index": chunk_index,
+            "start_date": chunk_start_date,
+            "end_date": chunk_end_date,
+            "cursor": ReplayCursor(
+                self.symbols, pd.to_datetime(chunk_start_date), self.ohlcv_interval, self.steps_per_day * n_days
+            ),
+            "upbit_ohlcv_views": dict(),
+            "binance_ohlcv_views": dict(),
+        }
+        converted_ohlcvs = None
+        if self.n_workers > 1:
+            dates = [chunk_start_date + timedelta(days=i) for i in range(n_days)]
+            converted_ohlcvs = self._convert_in_parallel(dates)
+        self.init_upbit_test_loader(chunk, converted_ohlcvs)
+        self.init_binance_test_loader(chunk, converted_ohlcvs)
+        return chunk
+
+    def _convert_in_parallel(self, dates: list):
+        """
+        (market, symbol, 일자) 별 trade data 읽기 및 ohlcv 변환을 process pool에서 실행
+        cache를 사용하면 worker가 cache에 저장한 결과를 이후 memory-map으로 읽으므로 결과를 process 간에 전달하지 않음
+        """
+        tasks = [(is_upbit, symbol, date) for is_upbit in (True, False) for symbol in self.symbols for date in dates]
+        with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+            results = executor.map(
+                _load_oneday_ohlcv_task,
+                [self._init_args] * len(tasks),
+                [self.ohlcv_intervals] * len(tasks),
+                [symbol for _, symbol, _ in tasks],
+                [date for _, _, date in tasks],
+                [is_upbit for is_upbit, _, _ in tasks],
+            )
+            converted_ohlcvs = {task: result for task, result in zip(tasks, results) if result is not None}
+        return converted_ohlcvs
+
+    def iter_chunks(self, start_chunk_index: int = 0):
+        """
+        start_chunk_index 번째부터 마지막 chunk까지 순서대로 yield 하는 generator
+        현재 chunk를 사용하는 동안 다음 chunk를 background thread에서 미리 읽어 둠
+        """
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self._load_chunk, start_chunk_index)
+            for chunk_index in range(start_chunk_index, self.n_chunks):
+                chunk = future.result()
+                if chunk_index + 1 < self.n_chunks:
+                    future = executor.submit(self._load_chunk, chunk_index + 1)
+                yield chunk
+
+    def _set_chunk(self, chunk: dict):
+        self.chunk_index = chunk["index"]
+        self.chunk_offset = chunk["index"] * self.steps_per_chunk
+        self.cursor = chunk["cursor"]
+        self.chunk_start_time = self.cursor.start_time
+        self.upbit_ohlcv = self.cursor.frames("upbit")
+        self.binance_ohlcv = self.cursor.frames("binance_spot")
+        self.upbit_ohlcv_views = chunk["upbit_ohlcv_views"]
+        self.binance_ohlcv_views = chunk["binance_ohlcv_views"]
+
+    def _move_to_chunk(self, chunk_index: int):
+        if not 0 <= chunk_index < self.n_chunks:
+            raise IndexError(f"chunk index {chunk_index} is out of range")
+
+        if self.streaming and chunk_index == self.chunk_index + 1:
+            chunk = next(self._chunk_iter)
+        else:
+            # 순서를 건너뛰는 경우 해당 chunk부터 다시 읽기 시작
+            if self._chunk_iter is not None:
+                self._chunk_iter.close()
+            self._chunk_iter = self.iter_chunks(chunk_index)
+            chunk = next(self._chunk_iter)
+        self._set_chunk(chunk)
+
+    def _cursor_counter(self, counter: int):
+        """
+        전체 기간 기준의 counter를 현재 chunk cursor 기준의 counter로 변환, 필요하면 chunk를 이동
+        """
+        if counter // self.steps_per_chunk != self.chunk_index:
+            self._move_to_chunk(counter // self.steps_per_chunk)
+        return counter - self.chunk_offset
 
-            self.binance_ohlcv[symbol] = pd.concat(ohlcv_list)
-            self.binance_ohlcv[symbol].reset_index(drop=True, inplace=True)
+    def upbit_convert_to_ohlcv(self, upbit_trade_df: DataFrame, current_date: datetime):
+        """
+        current_date의 upbit trade 데이터를 ohlcv 데이터로 가공.
+        """
+        ohlcv_columns = self.resampler.resample(upbit_trade_df, current_date, [self.ohlcv_interval])
+        return self.resampler.to_frame(ohlcv_columns[self.ohlcv_interval])
 
     def binance_convert_to_ohlcv(self, binance_trade_df: DataFrame, current_date: datetime):
         """
         current_date의 binance trade 데이터를 ohlcv 데이터로 가공.
         """
-        gp = self.grouping.make_group(binance_trade_df, freq=self.freq)
-        temp_binance_ohlcv = gp["price"].ohlc()
-        temp_binance_ohlcv["volume"] = gp["quantity"].sum()
-        temp_binance_ohlcv["trade_num"] = gp["trade_num"].sum()
-
-        temp_binance_ohlcv.fillna(
-            dict.fromkeys(temp_binance_ohlcv.columns.tolist(), temp_binance_ohlcv.close.ffill()), inplace=True,
-        )
+        ohlcv_columns = self.resampler.resample(binance_trade_df, current_date, [self.ohlcv_interval])
+        return self.resampler.to_frame(ohlcv_columns[self.ohlcv_interval])
 
-        start_stamp = pd.to_datetime(current_date)
-        end_stamp = temp_binance_ohlcv.index[0]
-        temp = temp_binance_ohlcv.iloc[0]["open"]
-
-        while start_stamp < end_stamp:
-            temp_binance_ohlcv.loc[start_stamp] = [temp, temp, temp, temp, 0.0, 0]
-            start_stamp += timedelta(milliseconds=self.ohlcv_interval)
-
-        temp_binance_ohlcv.sort_index(inplace=True)
-
-        start_stamp = temp_binance_ohlcv.index[-1] + timedelta(milliseconds=self.ohlcv_interval)
-        end_stamp = pd.to_datetime(current_date) + timedelta(days=1)
-        temp = temp_binance_ohlcv.iloc[-1]["close"]
-
-        while start_stamp < end_stamp:
-            temp_binance_ohlcv.loc[start_stamp] = [temp, temp, temp, temp, 0.0, 0]
-            start_stamp += timedelta(milliseconds=self.ohlcv_interval)
-
-        return temp_binance_ohlcv
-
-    def load_trade_data(self, symbol: str, current_date: datetime, is_upbit: bool):
+    def load_oneday_ohlcv(self, symbol: str, current_date: datetime, is_upbit: bool):
         """
-        특정 symbol의 current_data의 trade data csv를 읽어오는 함수
+        특정 symbol의 current_date의 ohlcv_intervals 별 ohlcv column dict를 반환하는 함수
+        cache가 유효한 interval은 cache에서 읽고, 나머지 interval은 trade data를 한 번만 읽어 함께 변환한 후 cache에 저장
+        trade data는 tick store에 해당 일자가 있으면 tick store에서, 없으면 csv에서 읽음
         """
+        market_path = self.get_market_path(is_upbit)
+        date_str = current_date.strftime("%Y-%m-%d")
+        use_tick_store = self.tick_store is not None and self.tick_store.has_day(market_path, symbol, date_str)
+
+        source = None
+        oneday_ohlcvs = dict()
+        if self.ohlcv_cache is not None:
+            if use_tick_store:
+                source = self.tick_store.get_index(market_path, symbol)["sources"][date_str]
+            else:
+                source = self.ohlcv_cache.source_stat(self.get_trade_data_path(symbol, current_date, is_upbit))
+            for interval in self.ohlcv_intervals:
+                cached_columns = self.ohlcv_cache.load(market_path, symbol, date_str, interval, source)
+                if cached_columns is not None:
+                    oneday_ohlcvs[interval] = cached_columns
+
+        missing_intervals = [interval for interval in self.ohlcv_intervals if interval not in oneday_ohlcvs]
+        if missing_intervals:
+            if use_tick_store:
+                trade_columns = self.tick_store.load_day(market_path, symbol, date_str)
+                converted_ohlcvs = self.resampler.resample_columns(
+                    trade_columns, current_date, missing_intervals, with_askbid=is_upbit
+                )
+            else:
+                trade_df = self.load_trade_data(symbol, current_date, is_upbit=is_upbit)
+                converted_ohlcvs = self.resampler.resample(trade_df, current_date, missing_intervals)
+            for interval, ohlcv_columns in converted_ohlcvs.items():
+                if self.ohlcv_cache is not None:
+                    self.ohlcv_cache.save(market_path, symbol, date_str, interval, source, ohlcv_columns)
+                oneday_ohlcvs[interval] = ohlcv_columns
+
+        return {interval: oneday_ohlcvs[interval] for interval in self.ohlcv_intervals}
+
+    def load_trade_range(self, symbol: str, start_time, end_time, is_upbit: bool):
+        """
+        tick store에서 timestamp가 [start_time, end_time) 범위인 trade를 column 별 memory-mapped array dict로 반환
+        start_time, end_time : datetime 또는 pd.Timestamp
+        """
+        if self.tick_store is None:
+            raise ValueError("tick_store_path is required to load trade range")
+        start_ms = pd.Timestamp(start_time).value // 1_000_000
+        end_ms = pd.Timestamp(end_time).value // 1_000_000
+        return self.tick_store.load_range(self.get_market_path(is_upbit), symbol, start_ms, end_ms)
 
-        if is_upbit:
-            market_path = "upbit"
-        else:
-            market_path = "binance_spot"
+    @staticmethod
+    def get_market_path(is_upbit: bool):
+        return "upbit" if is_upbit else "binance_spot"
 
-        file_path = os.path.join(
+    def get_trade_data_path(self, symbol: str, current_date: datetime, is_upbit: bool):
+        """
+        특정 symbol의 current_date의 trade data csv 경로를 반환하는 함수
+        """
+        return os.path.join(
             self.root_data_path,
-            market_path,
+            self.get_market_path(is_upbit),
             symbol,
             f"{symbol}-"
             + "{0:04d}-{1:02d}-{2:02d}.csv".format(current_date.year, current_date.month, current_date.day),
         )
+
+    def load_trade_data(self, symbol: str, current_date: datetime, is_upbit: bool):
+        """
+        특정 symbol의 current_data의 trade data csv를 읽어오는 함수
+        """
+        file_path = self.get_trade_data_path(symbol, current_date, is_upbit)
         try:
             output_df = pd.read_csv(file_path)
 
@@ -226,10 +387,9 @@ class TestDataLoader:
         """
         self.load_exchange_rate()
         if self.current_time < self.end_current_time:
-            for symbol in self.symbols:
-
-                self.upbit_trade.price[symbol] = self.upbit_ohlcv_list[symbol][self.count]["close"]
-                self.binance_trade.price[symbol] = self.binance_ohlcv_list[symbol][self.count]["close"]
+            cursor_counter = self._cursor_counter(self.count)
+            self.cursor.fill_prices("upbit", cursor_counter, self.upbit_trade.price)
+            self.cursor.fill_prices("binance_spot", cursor_counter, self.binance_trade.price)
 
             self.count += 1
             self.current_time += timedelta(milliseconds=self.ohlcv_interval)
@@ -248,24 +408,59 @@ class TestDataLoader:
         current_time을 한 timedelta 이후로 미루는 함수
         tqdm 사용 시 사용
         """
+        cursor_counter = self._cursor_counter(counter)
+        self.cursor.fill_prices("upbit", cursor_counter, self.upbit_trade.price)
+        self.cursor.fill_askbids("upbit", cursor_counter, self.upbit_last_askbid)
+        self.cursor.fill_prices("binance_spot", cursor_counter, self.binance_trade.price)
+
+        self.current_time = self.cursor.time_at(cursor_counter)
         self.load_exchange_rate()
-        for symbol in self.symbols:
-            self.upbit_trade.price[symbol] = self.upbit_ohlcv_list[symbol][counter]["close"]
-            self.upbit_last_askbid[symbol] = self.upbit_ohlcv_list[symbol][counter]["last_askbid"]
-            self.binance_trade.price[symbol] = self.binance_ohlcv_list[symbol][counter]["close"]
 
-        self.current_time = self.start_time + timedelta(milliseconds=self.ohlcv_interval) * counter
+    def get_view_counter(self, interval: int):
+        """
+        current_time이 포함된 view_interval ohlcv의 index를 반환하는 함수
+        upbit_ohlcv_views[interval][symbol].iloc[index]로 해당 시점의 bar를 얻을 수 있음 ( streaming 시에는 현재 chunk 기준 index )
+        """
+        return int((self.current_time - self.chunk_start_time) / timedelta(milliseconds=interval))
+
+    def add_aux_series(self, name: str, source, value_column: str = "value", resolution_ms: int = ONE_DAY_MS):
+        """
+        name : series 이름 ( ex : "funding_rate" )
+        source : 첫 column이 timestamp ( 또는 날짜 ) 인 csv 경로, 또는 그런 index를 가진 pd.Series
+        value_column : source가 csv인 경우 값으로 사용할 column
+        resolution_ms : 값이 바뀔 수 있는 최소 간격, ms 단위
+
+        start_date ~ end_date 기간을 resolution_ms 간격으로 미리 계산해 aux_series[name]에 저장
+        """
+        series = AuxiliarySeries(name, self.start_time, self.end_current_time, resolution_ms=resolution_ms)
+        if isinstance(source, pd.Series):
+            series.load_series(source)
+        else:
+            series.load_csv(source, value_column=value_column)
+        self.aux_series[name] = series
+        return series
+
+    def get_aux_value(self, name: str):
+        """
+        current_time 시점의 aux_series[name] 값을 반환
+        """
+        return self.aux_series[name].get(self.current_time)
 
     def load_exchange_rate(self):
         """
-        일자 별 알맞은 환율(usdt/kor)을 불러오는 함수
+        current_time에 알맞은 환율(usdt/kor)을 불러오는 함수
         """
-        temp_time = self.current_time
+        self.exchange_rate = self.aux_series["exchange_rate"].get(self.current_time)
+
 
-        if temp_time.hour + temp_time.minute + temp_time.second + temp_time.microsecond == 0:
-            while temp_time.strftime("%Y-%m-%d") not in self.exchange_rate_df.index:
-                temp_time -= timedelta(days=1)
-            self.exchange_rate = float(self.exchange_rate_df.loc[temp_time.strftime("%Y-%m-%d")].value.replace(",", ""))
+def _load_oneday_ohlcv_task(
+    init_args: tuple, ohlcv_intervals: list, symbol: str, current_date: datetime, is_upbit: bool
+):
+    # process pool worker : TestDataLoader.load_oneday_ohlcv를 실행, cache를 사용하면 결과 대신 None을 반환
+    data_loader = TestDataLoader(*init_args)
+    data_loader.ohlcv_intervals = ohlcv_intervals
+    oneday_ohlcvs = data_loader.load_oneday_ohlcv(symbol, current_date, is_upbit)
+    return None if data_loader.ohlcv_cache is not None else oneday_ohlcvs
 
 
 if __name__ == "__main__":
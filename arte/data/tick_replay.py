@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+from arte.data.trade_parser import TradeParser
+from arte.data.tick_store import TickStore, VENUE_CODES
+from arte.data.replay_cursor import ASKBID_NAME_TUPLE
+
+ONE_HOUR_MS = 60 * 60 * 1000
+
+
+class TickReplay:
+    """
+    Class TickReplay
+        TickStore에 저장된 upbit, binance의 raw trade를 거래소 timestamp 순으로 합쳐 하나씩 재생하는 모듈
+        TestDataLoader가 ohlcv_interval 마다 close 가격만 보여주는 것과 달리 interval 안의 두 거래소 trade 순서를 그대로 재현함.
+
+        window_ms 단위로 (market, symbol) 별 정렬된 trade slice를 memory-map으로 읽은 뒤 하나로 합치는데,
+        각 slice가 이미 정렬되어 있으므로 numpy의 stable sort가 정렬된 run들을 합치는 k-way merge로 동작함.
+        같은 timestamp의 trade는 markets, symbols에 입력한 순서를 따름.
+
+        매 trade마다 TestDataLoader와 같은 이름의 upbit_trade, binance_trade ( TradeParser ), upbit_last_askbid를 갱신하고
+        callback을 호출하므로, 기존 전략의 trade manager update 코드를 그대로 사용 가능.
+
+    Attributes:
+        symbols : replay 할 pure symbol의 list
+        upbit_trade : TradeParser 객체, 마지막 upbit trade의 price
+        binance_trade : TradeParser 객체, 마지막 binance trade의 price
+        upbit_last_askbid : symbol 별 마지막 upbit trade의 ask_bid ( "ASK", "BID", "NONE" )
+        current_timestamp : 마지막으로 재생한 trade의 timestamp, ms 단위 int
+        current_time : current_timestamp의 pd.Timestamp
+        event_count : 지금까지 재생한 trade의 수
+
+    Functions:
+        __init__ : TickStore, symbols, start_date, end_date 입력 필요
+        iter_windows : window_ms 단위로 합쳐진 trade column dict를 yield
+        run : 모든 trade를 순서대로 재생하며 callback 호출
+
+    """
+
+    def __init__(
+        self,
+        tick_store: TickStore,
+        symbols: list,
+        start_date: str,
+        end_date: str,
+        markets: list = ("upbit", "binance_spot"),
+        window_ms: int = ONE_HOUR_MS,
+    ):
+        self.tick_store = tick_store
+        self.symbols = [symbol.upper() for symbol in symbols]
+        self.markets = list(markets)
+        self.window_ms = window_ms
+        self.start_ms = pd.Timestamp(start_date).value // 1_000_000
+        self.end_ms = (pd.Timestamp(end_date) + pd.Timedelta(days=1)).value // 1_000_000
+
+        self.upbit_trade = TradeParser(symbols=self.symbols)
+        self.binance_trade = TradeParser(symbols=self.symbols)
+        self.upbit_last_askbid = {symbol: None for symbol in self.symbols}
+        self.current_timestamp = None
+        self.event_count = 0
+
+    @property
+    def current_time(self):
+        return pd.Timestamp(self.current_timestamp, unit="ms")
+
+    def iter_windows(self):
+        """
+        [start_date, end_date] 기간을 window_ms 단위로 나누어, 각 window의 trade를 timestamp 순으로 합친
+        timestamp, venue, symbol_index, price, quantity, ask_bid array dict를 yield
+        """
+        for window_start in range(self.start_ms, self.end_ms, self.window_ms):
+            window_end = min(window_start + self.window_ms, self.end_ms)
+
+            runs = []
+            for market in self.markets:
+                for symbol_idx, symbol in enumerate(self.symbols):
+                    trade_columns = self.tick_store.load_range(market, symbol, window_start, window_end)
+                    if len(trade_columns["timestamp"]):
+                        runs.append((symbol_idx, trade_columns))
+            if not runs:
+                continue
+
+            timestamps = np.concatenate([trade_columns["timestamp"] for _, trade_columns in runs])
+            order = np.argsort(timestamps, kind="stable")
+            merged = {"timestamp": timestamps[order]}
+            for column in ("venue", "price", "quantity", "ask_bid"):
+                merged[column] = np.concatenate([trade_columns[column] for _, trade_columns in runs])[order]
+            merged["symbol_index"] = np.concatenate(
+                [
+                    np.full(len(trade_columns["timestamp"]), symbol_idx, dtype=np.int32)
+                    for symbol_idx, trade_columns in runs
+                ]
+            )[order]
+            yield merged
+
+    def run(self, callback=None):
+        """
+        모든 trade를 timestamp 순으로 재생
+        callback : trade 하나를 반영할 때마다 callback(market, symbol, price, quantity) 형태로 호출, None이면 가격만 갱신
+        """
+        upbit_code = VENUE_CODES["upbit"]
+        upbit_price = self.upbit_trade.price
+        binance_price = self.binance_trade.price
+        upbit_last_askbid = self.upbit_last_askbid
+        symbols = self.symbols
+        market_names = {code: market for market, code in VENUE_CODES.items()}
+
+        for merged in self.iter_windows():
+            for timestamp, venue, symbol_idx, price, quantity, ask_bid in zip(
+                merged["timestamp"].tolist(),
+                merged["venue"].tolist(),
+                merged["symbol_index"].tolist(),
+                merged["price"].tolist(),
+                merged["quantity"].tolist(),
+                merged["ask_bid"].tolist(),
+            ):
+                symbol = symbols[symbol_idx]
+                if venue == upbit_code:
+                    upbit_price[symbol] = price
+                    upbit_last_askbid[symbol] = ASKBID_NAME_TUPLE[ask_bid]
+                else:
+                    binance_price[symbol] = price
+                self.current_timestamp = timestamp
+
+                if callback is not None:
+                    callback(market_names[venue], symbol, price, quantity)
+            self.event_count += len(merged["timestamp"])
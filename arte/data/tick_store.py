@@ -0,0 +1,187 @@
+import os
+import json
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from arte.data.trade_resampler import ASKBID_CODES
+
+TICK_COLUMNS = ["timestamp", "price", "quantity", "ask_bid", "venue"]
+TICK_DTYPES = {
+    "timestamp": np.int64,
+    "price": np.float64,
+    "quantity": np.float64,
+    "ask_bid": np.int8,
+    "venue": np.int8,
+}
+VENUE_CODES = {"upbit": 0, "binance_spot": 1}
+
+
+class TickStore:
+    """
+    Class TickStore
+        root_data_path/{market}/{SYMBOL}/{SYMBOL}-YYYY-MM-DD.csv 형태의 trade data를
+        (market, symbol) 별 append-only column 파일로 저장하고 memory-map으로 읽는 모듈
+
+        store_path/{market}/{SYMBOL}/ 아래에
+            timestamp.bin, price.bin, quantity.bin, ask_bid.bin, venue.bin : column 별 raw binary 파일
+            index.json : 일자 별 [start, end) row offset, 원본 csv의 mtime/size, 전체 row 수
+        를 저장함. 일자는 오름차순으로만 추가되며 각 일자 안의 trade는 timestamp 순으로 정렬하여 저장하므로
+        파일 전체가 timestamp 순으로 정렬되어 있음.
+
+    Attributes:
+        store_path : column 파일들이 저장되는 base 경로
+
+    Functions:
+        __init__ : Class 선언 시 store_path 입력 필요
+        ingest_day : 하루치 trade data csv를 column 파일 끝에 추가
+        ingest_symbol : root_data_path에 있는 특정 market, symbol의 csv 중 저장되지 않은 일자를 모두 추가
+        get_index : 특정 market, symbol의 index dict를 반환
+        has_day : 특정 일자가 저장되어 있는지 확인
+        load_day : 특정 일자의 column 별 memory-mapped array slice를 반환
+        load_range : [start_ms, end_ms) 시간 범위의 column 별 memory-mapped array slice를 반환
+
+    """
+
+    def __init__(self, store_path: str):
+        self.store_path = store_path
+        self._index_cache = dict()
+
+    def _symbol_path(self, market: str, symbol: str):
+        return os.path.join(self.store_path, market, symbol)
+
+    def get_index(self, market: str, symbol: str):
+        key = (market, symbol)
+        if key not in self._index_cache:
+            index_path = os.path.join(self._symbol_path(market, symbol), "index.json")
+            if os.path.exists(index_path):
+                with open(index_path, "r") as f:
+                    self._index_cache[key] = json.load(f)
+            else:
+                self._index_cache[key] = {"rows": 0, "dates": {}, "sources": {}}
+        return self._index_cache[key]
+
+    def _write_index(self, market: str, symbol: str, index: dict):
+        symbol_path = self._symbol_path(market, symbol)
+        temp_path = os.path.join(symbol_path, "index.json.tmp")
+        with open(temp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(temp_path, os.path.join(symbol_path, "index.json"))
+        self._index_cache[(market, symbol)] = index
+
+    def has_day(self, market: str, symbol: str, date: str):
+        return date in self.get_index(market, symbol)["dates"]
+
+    def ingest_day(self, market: str, symbol: str, date: str, csv_path: str):
+        """
+        date의 trade data csv를 읽어 column 파일 끝에 추가하고 index를 갱신
+        이미 저장된 마지막 일자보다 이전 일자는 추가할 수 없음
+        """
+        index = self.get_index(market, symbol)
+        if date in index["dates"]:
+            return
+        if index["dates"] and date < max(index["dates"]):
+            raise ValueError(
+                f"{market}/{symbol} already has data after {date}, rebuild it with ingest_symbol(..., rebuild=True)"
+            )
+
+        trade_df = pd.read_csv(csv_path)
+        timestamps = trade_df["timestamp"].to_numpy(dtype=np.int64)
+        order = np.argsort(timestamps, kind="stable")
+        columns = {
+            "timestamp": timestamps[order],
+            "price": trade_df["price"].to_numpy(dtype=np.float64)[order],
+            "quantity": trade_df["quantity"].to_numpy(dtype=np.float64)[order],
+            "venue": np.full(len(trade_df), VENUE_CODES[market], dtype=np.int8),
+        }
+        if "ask_bid" in trade_df.columns:
+            columns["ask_bid"] = trade_df["ask_bid"].map(ASKBID_CODES).fillna(0).to_numpy(dtype=np.int8)[order]
+        else:
+            columns["ask_bid"] = np.zeros(len(trade_df), dtype=np.int8)
+
+        symbol_path = self._symbol_path(market, symbol)
+        os.makedirs(symbol_path, exist_ok=True)
+        start = index["rows"]
+        for column in TICK_COLUMNS:
+            column_path = os.path.join(symbol_path, f"{column}.bin")
+            with open(column_path, "ab") as f:
+                # index에 반영되지 않은 이전 쓰기 ( 중간에 실패한 ingest ) 는 잘라냄
+                f.truncate(start * np.dtype(TICK_DTYPES[column]).itemsize)
+                f.write(np.ascontiguousarray(columns[column], dtype=TICK_DTYPES[column]).tobytes())
+
+        stat = os.stat(csv_path)
+        new_index = {
+            "rows": start + len(trade_df),
+            "dates": dict(index["dates"]),
+            "sources": dict(index["sources"]),
+        }
+        new_index["dates"][date] = [start, start + len(trade_df)]
+        new_index["sources"][date] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        self._write_index(market, symbol, new_index)
+
+    def ingest_symbol(self, root_data_path: str, market: str, symbol: str, rebuild: bool = False):
+        """
+        root_data_path/market/symbol 아래의 csv 중 저장되지 않은 일자를 오름차순으로 추가
+        rebuild가 True이면 기존 column 파일을 지우고 처음부터 다시 저장
+        """
+        if rebuild:
+            symbol_path = self._symbol_path(market, symbol)
+            for fname in [f"{column}.bin" for column in TICK_COLUMNS] + ["index.json"]:
+                fpath = os.path.join(symbol_path, fname)
+                if os.path.exists(fpath):
+                    os.remove(fpath)
+            self._index_cache.pop((market, symbol), None)
+
+        csv_dir = os.path.join(root_data_path, market, symbol)
+        dates = sorted(fname[len(symbol) + 1 : -4] for fname in os.listdir(csv_dir) if fname.endswith(".csv"))
+        ingested = []
+        for date in dates:
+            if not self.has_day(market, symbol, date):
+                self.ingest_day(market, symbol, date, os.path.join(csv_dir, f"{symbol}-{date}.csv"))
+                ingested.append(date)
+        return ingested
+
+    def _open_columns(self, market: str, symbol: str):
+        rows = self.get_index(market, symbol)["rows"]
+        symbol_path = self._symbol_path(market, symbol)
+        if rows == 0:
+            return {column: np.empty(0, dtype=TICK_DTYPES[column]) for column in TICK_COLUMNS}
+        return {
+            column: np.memmap(
+                os.path.join(symbol_path, f"{column}.bin"), dtype=TICK_DTYPES[column], mode="r", shape=(rows,)
+            )
+            for column in TICK_COLUMNS
+        }
+
+    def load_day(self, market: str, symbol: str, date: str):
+        """
+        date의 trade를 column 별 memory-mapped array slice dict로 반환 ( 복사 없음 )
+        """
+        start, end = self.get_index(market, symbol)["dates"][date]
+        return {column: values[start:end] for column, values in self._open_columns(market, symbol).items()}
+
+    def load_range(self, market: str, symbol: str, start_ms: int, end_ms: int):
+        """
+        timestamp가 [start_ms, end_ms) 범위인 trade를 column 별 memory-mapped array slice dict로 반환 ( 복사 없음 )
+        """
+        columns = self._open_columns(market, symbol)
+        start, end = np.searchsorted(columns["timestamp"], [start_ms, end_ms])
+        return {column: values[start:end] for column, values in columns.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest trade data csv files into a memory-mapped tick store")
+    parser.add_argument("root_data_path")
+    parser.add_argument("store_path")
+    parser.add_argument("--markets", nargs="+", default=["upbit", "binance_spot"])
+    parser.add_argument("--symbols", nargs="*", default=None, help="default: every symbol directory of each market")
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+
+    store = TickStore(args.store_path)
+    for market in args.markets:
+        symbols = args.symbols or sorted(os.listdir(os.path.join(args.root_data_path, market)))
+        for symbol in symbols:
+            ingested = store.ingest_symbol(args.root_data_path, market, symbol.upper(), rebuild=args.rebuild)
+            print(f"{market}/{symbol.upper()} : {len(ingested)} days ingested")
@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+from pandas.core.frame import DataFrame
+
+ASKBID_CODES = {"NONE": 0, "ASK": 1, "BID": 2}
+ASKBID_NAMES = np.array(["NONE", "ASK", "BID"], dtype=object)
+
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume", "trade_num"]
+OHLCV_DTYPES = {
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "volume": np.float64,
+    "trade_num": np.int64,
+}
+
+ONE_DAY_MS = 24 * 60 * 60 * 1000
+
+
+class TradeResampler:
+    """
+    Class TradeResampler
+        하루치 trade data를 고정된 interval의 ohlcv로 변환하는 모듈
+        trade를 한 번만 읽고 numpy의 reduceat으로 interval 별 open, high, low, close, volume, trade_num, last_askbid를 계산함.
+        결과는 하루 전체 (00:00 ~ 24:00)의 grid를 채우며, 거래가 없는 구간은 아래와 같이 채움.
+            - 첫 거래 이전 : 첫 거래 구간의 open 가격, last_askbid는 "NONE"
+            - 거래 사이 : 직전 구간의 close 가격, last_askbid는 직전 값
+            - 마지막 거래 이후 : 마지막 구간의 close 가격, last_askbid는 "NONE"
+
+    Functions:
+        resample : 하루치 trade data를 여러 interval의 ohlcv column dict로 변환
+        resample_columns : TickStore에서 읽은 timestamp 순 trade column dict를 여러 interval의 ohlcv column dict로 변환
+        resample_arrays : numpy array로 주어진 trade data를 하나의 interval의 ohlcv column dict로 변환
+        to_frame : ohlcv column dict를 datetime index의 Dataframe으로 변환
+
+    """
+
+    def resample(self, trade_df: DataFrame, current_date, intervals: list):
+        """
+        trade_df : timestamp(ms), price, quantity, (ask_bid) column을 가진 하루치 trade data
+        current_date : trade_df의 일자
+        intervals : ms 단위 interval의 list ( ex : [250, 1000, 60000] )
+
+        interval을 key로, ohlcv column dict를 value로 하는 dict를 반환
+        """
+        timestamps = trade_df["timestamp"].to_numpy(dtype=np.int64)
+        prices = trade_df["price"].to_numpy(dtype=np.float64)
+        quantities = trade_df["quantity"].to_numpy(dtype=np.float64)
+        askbids = None
+        if "ask_bid" in trade_df.columns:
+            askbids = trade_df["ask_bid"].map(ASKBID_CODES).fillna(0).to_numpy(dtype=np.int8)
+
+        if len(timestamps) > 1 and np.any(timestamps[1:] < timestamps[:-1]):
+            order = np.argsort(timestamps, kind="stable")
+            timestamps = timestamps[order]
+            prices = prices[order]
+            quantities = quantities[order]
+            if askbids is not None:
+                askbids = askbids[order]
+
+        day_start = pd.Timestamp(current_date).value // 1_000_000
+        return {
+            interval: self.resample_arrays(timestamps, prices, quantities, askbids, day_start, interval)
+            for interval in intervals
+        }
+
+    def resample_columns(self, trade_columns: dict, current_date, intervals: list, with_askbid: bool):
+        """
+        trade_columns : timestamp 순으로 정렬된 timestamp, price, quantity, ask_bid(int8 code) array dict
+        with_askbid : False이면 last_askbid column을 만들지 않음 ( binance )
+        """
+        askbids = trade_columns["ask_bid"] if with_askbid else None
+        day_start = pd.Timestamp(current_date).value // 1_000_000
+        return {
+            interval: self.resample_arrays(
+                trade_columns["timestamp"],
+                trade_columns["price"],
+                trade_columns["quantity"],
+                askbids,
+                day_start,
+                interval,
+            )
+            for interval in intervals
+        }
+
+    @staticmethod
+    def resample_arrays(timestamps, prices, quantities, askbids, day_start: int, interval: int):
+        """
+        timestamp 순으로 정렬된 trade array를 day_start(ms)부터 하루 동안의 interval(ms) grid로 변환
+        askbids가 None이면 last_askbid column을 만들지 않음
+        """
+        n_bins = -(-ONE_DAY_MS // interval)
+        bins = (timestamps - day_start) // interval
+        in_day = (bins >= 0) & (bins < n_bins)
+        if not in_day.all():
+            bins = bins[in_day]
+            prices = prices[in_day]
+            quantities = quantities[in_day]
+            if askbids is not None:
+                askbids = askbids[in_day]
+
+        if len(bins) == 0:
+            raise ValueError("There is no trade to resample in the given day")
+        columns = {"timestamp": day_start + np.arange(n_bins, dtype=np.int64) * interval}
+
+        # 같은 bin에 속한 trade 구간의 시작, 끝 index
+        starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+        ends = np.r_[starts[1:], len(bins)] - 1
+        filled_bins = bins[starts]
+
+        # 거래가 있는 bin의 index를 앞으로 전파하여 forward-fill에 사용
+        has_trade = np.zeros(n_bins, dtype=bool)
+        has_trade[filled_bins] = True
+        last_filled = np.maximum.accumulate(np.where(has_trade, np.arange(n_bins), -1))
+        first_bin = filled_bins[0]
+        last_bin = filled_bins[-1]
+
+        bar_close = np.empty(n_bins, dtype=np.float64)
+        bar_close[filled_bins] = prices[ends]
+        close = bar_close[np.maximum(last_filled, 0)]
+        close[:first_bin] = prices[0]
+
+        for column, values in (
+            ("open", prices[starts]),
+            ("high", np.maximum.reduceat(prices, starts)),
+            ("low", np.minimum.reduceat(prices, starts)),
+        ):
+            full = close.copy()
+            full[filled_bins] = values
+            columns[column] = full
+        columns["close"] = close
+
+        volume = np.zeros(n_bins, dtype=np.float64)
+        volume[filled_bins] = np.add.reduceat(quantities, starts)
+        columns["volume"] = volume
+
+        trade_num = np.zeros(n_bins, dtype=np.int64)
+        trade_num[filled_bins] = ends - starts + 1
+        columns["trade_num"] = trade_num
+
+        if askbids is not None:
+            last_askbid = np.zeros(n_bins, dtype=np.int8)
+            last_askbid[filled_bins] = askbids[ends]
+            last_askbid[first_bin : last_bin + 1] = last_askbid[last_filled[first_bin : last_bin + 1]]
+            columns["last_askbid"] = last_askbid
+
+        return columns
+
+    @staticmethod
+    def to_frame(columns: dict):
+        """
+        ohlcv column dict를 datetime index의 ohlcv Dataframe으로 변환
+        """
+        ohlcv_df = pd.DataFrame(
+            {column: columns[column] for column in OHLCV_COLUMNS},
+            index=pd.DatetimeIndex(np.asarray(columns["timestamp"]).astype("datetime64[ms]")),
+        )
+        if "last_askbid" in columns:
+            ohlcv_df["last_askbid"] = ASKBID_NAMES[columns["last_askbid"]]
+        return ohlcv_df
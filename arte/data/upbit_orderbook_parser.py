@@ -7,13 +7,18 @@ class UpbitOrderbookParser:
     def update_upbit_orderbook(self, event):
         # askl = [[ask.price, ask.qty] for ask in event.asks]
         # bidl = [[bid.price, bid.qty] for bid in event.asks]
-        askl = [event.asks[0].price, event.asks[0].qty]
-        bidl = [event.bids[0].price, event.bids[0].qty]
+        askl = [event.ask_prices[0], event.ask_sizes[0]]
+        bidl = [event.bid_prices[0], event.bid_sizes[0]]
         self._orderbook[event.code[4:]] = {
             "ask_list": askl,
             "bid_list": bidl,
             "total_ask_size": event.total_ask_size,
             "total_bid_size": event.total_bid_size,
+            # every orderbook unit as the flat level lists of the event, level 0 is the best price
+            "ask_prices": event.ask_prices,
+            "ask_sizes": event.ask_sizes,
+            "bid_prices": event.bid_prices,
+            "bid_sizes": event.bid_sizes,
         }
 
     def __getitem__(self, key):
@@ -1,4 +1,3 @@
-import math
 import time
 import secrets
 import traceback
@@ -7,6 +6,7 @@ from binance_f.constant.test import *
 from binance_f.base.printobject import *
 from binance_f.model.constant import *
 from arte.system.utils import symbolize_binance
+from arte.system.trading_rules import TRADING_RULES
 
 
 def get_timestamp():
@@ -21,14 +21,8 @@ class BinanceOrderHandler:
     def __init__(self, request_client, account):
         self.request_client = request_client
         self.account = account
-        self._quantity_precisions = dict()
-        self._initialize_quantity_precision()
-
-    def _initialize_quantity_precision(self):
-        ex_info_per_symbol = self.request_client.get_exchange_information().symbols
-        for ex in ex_info_per_symbol:
-            if ex.quoteAsset == "USDT":
-                self._quantity_precisions[ex.baseAsset] = ex.quantityPrecision
+        # exchange information is requested once and shared by all handlers
+        TRADING_RULES.load_binance(self.request_client)
 
     def _limit(self, symbol: str, order_side: OrderSide, position_side: PositionSide, price: float, quantity: float):
         result = self.request_client.post_order(
@@ -81,7 +75,7 @@ class BinanceOrderHandler:
                     order_side,
                     position_side,
                     price,
-                    self._usdt_to_quantity(usdt, price, unit_float=self._quantity_precisions[symbol]),
+                    self._usdt_to_quantity(symbol, usdt, price),
                 )
             else:
                 raise ValueError(
@@ -100,7 +94,7 @@ class BinanceOrderHandler:
                     symbol,
                     order_side,
                     position_side,
-                    self._usdt_to_quantity(usdt, price, unit_float=self._quantity_precisions[symbol]),
+                    self._usdt_to_quantity(symbol, usdt, price),
                 )
             else:
                 raise ValueError(
@@ -117,9 +111,7 @@ class BinanceOrderHandler:
                 order_side,
                 position_side,
                 price,
-                self._asset_ratio_to_quantity(
-                    symbol, position_side, ratio, unit_float=self._quantity_precisions[symbol]
-                ),
+                self._asset_ratio_to_quantity(symbol, position_side, ratio),
             )
         else:
             raise ValueError(f"Cannot execute SELL_{position_side}, you don't have any {position_side} position.")
@@ -130,19 +122,20 @@ class BinanceOrderHandler:
                 symbol,
                 order_side,
                 position_side,
-                self._asset_ratio_to_quantity(
-                    symbol, position_side, ratio, unit_float=self._quantity_precisions[symbol]
-                ),
+                self._asset_ratio_to_quantity(symbol, position_side, ratio),
             )
         else:
             raise ValueError(f"Cannot execute SELL_{position_side}, you don't have any {position_side} position.")
 
-    def _usdt_to_quantity(self, usdt, price, unit_float=3):
-        return math.floor((usdt / price) * (10 ** unit_float)) / (10 ** unit_float)
+    def _symbol_rules(self, symbol: str):
+        return TRADING_RULES.get("binance", symbolize_binance(symbol, upper=True))
+
+    def _usdt_to_quantity(self, symbol: str, usdt, price):
+        return self._symbol_rules(symbol).floor_quantity(usdt / price)
 
-    def _asset_ratio_to_quantity(self, symbol: str, position_side: PositionSide, ratio, unit_float=3):
+    def _asset_ratio_to_quantity(self, symbol: str, position_side: PositionSide, ratio):
         asset_quantity = abs(self.account[symbol][position_side])
-        return math.floor((asset_quantity * ratio) * (10 ** unit_float)) / (10 ** unit_float)
+        return self._symbol_rules(symbol).floor_quantity(asset_quantity * ratio)
 
     def _generate_order_id(self, symbol: str):
         _id = symbol + str(get_timestamp()) + f"-{secrets.token_hex(4)}"
@@ -54,7 +54,7 @@ class BinanceOrderRecorder:
 
     def event_to_order_dict(self, event):
         # orderUpdate event to dict(event_dict)
-        event_dict = dict(item for item in event.__dict__.items())
+        event_dict = event.to_dict()
         order_dict = {}
 
         # get basic data from orderUpdate event
@@ -75,27 +75,27 @@ class BinanceOrderRecorder:
 
         # calc PNL and Profit when
         if event.orderStatus == "FILLED":
-            self.realized_pnl.proceeding(event)
+            position = self.realized_pnl.proceeding(event)
 
-            order_dict["USDT_Qty"] = round(self.realized_pnl.pnl_dict[event.symbol]["USDT_Qty"], 4)
+            order_dict["USDT_Qty"] = round(position.USDT_Qty, 4)
 
             # PNL calc
-            order_dict["realized_pnl"] = round(self.realized_pnl.pnl_dict[event.symbol]["realized_pnl"], 8)
-            order_dict["total_realized_pnl"] = round(self.realized_pnl.pnl_dict[event.symbol]["total_realized_pnl"], 8)
-            order_dict["ROE_pnl"] = round(self.realized_pnl.pnl_dict[event.symbol]["realized_pnl_rate"] * 100, 8)
-            order_dict["win_rate_pnl"] = round(self.realized_pnl.pnl_dict[event.symbol]["winrate_pnl"], 8)
+            order_dict["realized_pnl"] = round(position.realized_pnl, 8)
+            order_dict["total_realized_pnl"] = round(position.total_realized_pnl, 8)
+            order_dict["ROE_pnl"] = round(position.realized_pnl_rate * 100, 8)
+            order_dict["win_rate_pnl"] = round(position.winrate_pnl, 8)
 
             # Profit calc incl commission
-            order_dict["real_profit"] = round(self.realized_pnl.pnl_dict[event.symbol]["real_profit"], 8)
-            order_dict["total_real_profit"] = round(self.realized_pnl.pnl_dict[event.symbol]["total_real_profit"], 8)
-            order_dict["ROE_profit"] = round(self.realized_pnl.pnl_dict[event.symbol]["real_profit_rate"] * 100, 8)
-            order_dict["win_rate_profit"] = round(self.realized_pnl.pnl_dict[event.symbol]["winrate_profit"], 8)
+            order_dict["real_profit"] = round(position.real_profit, 8)
+            order_dict["total_real_profit"] = round(position.total_real_profit, 8)
+            order_dict["ROE_profit"] = round(position.real_profit_rate * 100, 8)
+            order_dict["win_rate_profit"] = round(position.winrate_profit, 8)
 
             # strategy_name
             order_dict["strategy_name"] = self.current_strategy_name
 
             # reset if all sold
-            if self.realized_pnl.pnl_dict[event.symbol]["quantity"] == 0:
+            if position.quantity == 0:
                 self.realized_pnl.close_position(event.symbol)
 
         # update_csv
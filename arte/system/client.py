@@ -4,7 +4,7 @@ from upbit.client import Upbit
 
 
 class Client:
-    def __init__(self, mode: str, api_key: str, secret_key: str, req_only: bool = False):
+    def __init__(self, mode: str, api_key: str, secret_key: str, req_only: bool = False, capture=None):
         if mode == "TEST":
             _g_api_key = api_key
             _g_secret_key = secret_key
@@ -24,6 +24,7 @@ class Client:
                 uri=uri,
                 receive_limit_ms=3600 * 1000,
                 connection_delay_failure=1,
+                capture=capture,
             )
 
         # For temporary use
@@ -0,0 +1,299 @@
+"""
+체결 ( fill ) 으로 symbol 별 position의 PNL, Profit을 계산합니다.
+"""
+import numpy as np
+import pandas as pd
+
+from binance_f.model.constant import *
+
+# a close leaving less than this fraction of its quantity flattens the position ( float dust of the fills )
+QUANTITY_TOLERANCE = 1e-9
+
+PNL_FIELDS = [
+    "position_side",
+    "avg_price",
+    "quantity",
+    "realized_pnl",
+    "realized_pnl_rate",
+    "total_realized_pnl",
+    "winrate_pnl",
+    "win_count",
+    "total_count",
+    "current_commission",
+    "real_profit",
+    "real_profit_rate",
+    "total_real_profit",
+    "winrate_profit",
+    "win_count_profit",
+    "USDT_Qty",
+    "USDT_Qty_before",
+]
+
+
+class Position:
+    """
+    Class Position
+        한 symbol의 position 상태와 PNL, Profit 통계를 가지고 있는 __slots__ 객체
+        attribute 이름은 PNL_FIELDS, 이전 pnl_dict의 key와 같음.
+
+    """
+
+    __slots__ = PNL_FIELDS
+
+    def __init__(self):
+        self.position_side = None
+        self.avg_price = 0
+        self.quantity = 0
+        self.realized_pnl = 0
+        self.realized_pnl_rate = 0
+        self.total_realized_pnl = 0
+        self.winrate_pnl = 0
+        self.win_count = 0
+        self.total_count = 0
+        self.current_commission = 0
+        self.real_profit = 0
+        self.real_profit_rate = 0
+        self.total_real_profit = 0
+        self.winrate_profit = 0
+        self.win_count_profit = 0
+        self.USDT_Qty = 0
+        self.USDT_Qty_before = 0
+
+    def __repr__(self):
+        return str({field: getattr(self, field) for field in PNL_FIELDS})
+
+
+class PositionPnlEngine:
+    """
+    Class PositionPnlEngine
+        체결 마다 symbol 별 Position을 갱신하는 PNL 계산 모듈, 실거래의 RealizedPnl과 backtest의 TestRealizedPnl이 공통으로 사용
+        LONG BUY, SHORT SELL은 position open, LONG SELL, SHORT BUY는 position close로 같은 식을 사용하고
+        SHORT은 PNL의 부호와 close 시의 USDT_Qty 계산만 다름.
+        position 전체가 close 되면 ( quantity == 0 ) recorder가 record를 남긴 뒤 close_position을 호출함.
+
+    Attributes:
+        positions : symbol 별 Position dict
+
+    Functions:
+        fill : 체결 하나로 symbol의 Position을 갱신하고 반환
+        close_position : position 전체가 close 된 symbol의 Position을 초기화
+
+    """
+
+    def __init__(self):
+        self.positions = dict()
+
+    def fill(self, symbol, position_side, side, quantity, price, commission):
+        position = self.positions.get(symbol)
+        if position is None:
+            position = self.positions[symbol] = Position()
+        position.position_side = position_side
+
+        if (position_side == PositionSide.LONG) == (side == OrderSide.BUY):
+            # position open
+            position.USDT_Qty = quantity * price - commission
+            if position_side == PositionSide.SHORT:
+                position.USDT_Qty_before = position.USDT_Qty
+            position.avg_price = (position.avg_price * position.quantity + price * quantity) / (
+                position.quantity + quantity
+            )
+            position.quantity += quantity
+            position.realized_pnl = 0
+            position.realized_pnl_rate = 0
+            position.current_commission += commission
+            return position
+
+        # position close
+        if position_side == PositionSide.LONG:
+            position.USDT_Qty = quantity * price - commission
+            position.realized_pnl = (price - position.avg_price) * quantity
+        else:
+            position.USDT_Qty = position.USDT_Qty_before + position.real_profit
+            position.USDT_Qty_before = 0
+            position.realized_pnl = (position.avg_price - price) * quantity
+        usdt_qty = position.USDT_Qty
+
+        position.realized_pnl_rate = position.realized_pnl / usdt_qty if usdt_qty != 0 else 0
+        position.total_realized_pnl += position.realized_pnl
+        position.total_count += 1
+        if position.realized_pnl > 0:
+            position.win_count += 1
+        position.winrate_pnl = position.win_count / position.total_count
+
+        position.current_commission += commission
+        close_ratio = quantity / position.quantity
+        position.real_profit = position.realized_pnl - position.current_commission * close_ratio
+        position.real_profit_rate = position.real_profit / usdt_qty if usdt_qty != 0 else 0
+        position.total_real_profit += position.real_profit
+        if position.real_profit > 0:
+            position.win_count_profit += 1
+        position.winrate_profit = position.win_count_profit / position.total_count
+        position.current_commission -= position.current_commission * close_ratio
+
+        position.quantity -= quantity
+        if abs(position.quantity) <= quantity * QUANTITY_TOLERANCE:
+            position.quantity = 0
+        return position
+
+    def close_position(self, symbol: str):
+        # reset when all position closed
+        position = self.positions[symbol]
+        position.position_side = None
+        position.avg_price = 0
+        position.quantity = 0
+        position.realized_pnl = 0
+        position.realized_pnl_rate = 0
+        position.winrate_pnl = 0
+        position.current_commission = 0
+        position.real_profit = 0
+        position.real_profit_rate = 0
+        position.winrate_profit = 0
+
+
+def _group_start_positions(group_ids):
+    # position of the first element of each element's group, group_ids should be sorted
+    is_first = np.r_[True, group_ids[1:] != group_ids[:-1]]
+    return np.maximum.accumulate(np.where(is_first, np.arange(len(group_ids)), 0))
+
+
+def _cumsum_by_group(values, group_ids):
+    # summed inside each group, so long histories do not carry the rounding error of a global cumsum
+    return pd.Series(values).groupby(group_ids, sort=False).cumsum().to_numpy()
+
+
+def _previous_by_group(values, group_ids, initial=0):
+    # value of the previous element in the same group, initial for the first element
+    previous = np.r_[initial, values[:-1]]
+    return np.where(np.arange(len(values)) == _group_start_positions(group_ids), initial, previous)
+
+
+def _last_before_by_group(values, mask, group_ids, initial=0):
+    # value of the last masked element before each element in the same group, initial if none
+    positions = np.arange(len(values))
+    last = np.maximum.accumulate(np.where(mask, positions, -1))
+    last = np.r_[-1, last[:-1]]
+    found = last >= _group_start_positions(group_ids)
+    return np.where(found, values[np.maximum(last, 0)], initial)
+
+
+def _linear_recurrence_by_group(scales, offsets, group_ids):
+    # x_i = scales_i * x_(i-1) + offsets_i with x = 0 before each group
+    # a run starts at each scale != 1 or group start, inside a run x is a plain cumsum of offsets from its start value
+    # only the start values are carried in a loop over runs, so it stays stable for any number of scales
+    is_group_start = np.r_[True, group_ids[1:] != group_ids[:-1]]
+    is_run_start = is_group_start | (scales != 1)
+    run_ids = np.cumsum(is_run_start) - 1
+    run_sums = _cumsum_by_group(offsets, run_ids)
+    starts = np.flatnonzero(is_run_start)
+    ends = np.r_[starts[1:] - 1, len(scales) - 1]
+    carries = np.empty(len(starts))
+    x = 0.0
+    for k, (scale, group_start, end_sum) in enumerate(
+        zip(scales[starts].tolist(), is_group_start[starts].tolist(), run_sums[ends].tolist())
+    ):
+        carries[k] = 0.0 if group_start else scale * x
+        x = carries[k] + end_sum
+    return carries[run_ids] + run_sums
+
+
+def position_pnl_history(symbols, position_sides, sides, quantities, prices, commissions):
+    """
+    체결 array 전체의 PNL history를 PositionPnlEngine.fill을 순서대로 호출 ( quantity == 0 이면 close_position ) 한 것과 같게 한 번에 계산
+    symbols, position_sides, sides, quantities, prices, commissions : 체결 순서의 같은 길이 array
+    return : 각 체결 직후 ( close_position 전 ) Position 값의 PNL_FIELDS 별 array dict
+    """
+    symbols = np.asarray(symbols)
+    position_sides = np.asarray(position_sides)
+    sides = np.asarray(sides)
+    quantities = np.asarray(quantities, dtype=np.float64)
+    prices = np.asarray(prices, dtype=np.float64)
+    commissions = np.asarray(commissions, dtype=np.float64)
+    n_fills = len(symbols)
+    if n_fills == 0:
+        return {field: np.empty(0, dtype=object if field == "position_side" else np.float64) for field in PNL_FIELDS}
+
+    # work in symbol order, fills of a symbol keep their order
+    _, symbol_ids = np.unique(symbols, return_inverse=True)
+    order = np.argsort(symbol_ids, kind="stable")
+    symbol_ids = symbol_ids[order]
+    is_short = position_sides[order] == PositionSide.SHORT
+    is_open = is_short != (sides[order] == OrderSide.BUY)
+    is_close = ~is_open
+    qty = quantities[order]
+    price = prices[order]
+    fee = commissions[order]
+    signed_qty = np.where(is_open, qty, -qty)
+
+    # position segments end at the closes that flatten the position, state is reset after them
+    remaining = _cumsum_by_group(signed_qty, symbol_ids)
+    is_flat = is_close & (np.abs(remaining) <= qty * QUANTITY_TOLERANCE)
+    segment_ids = np.cumsum(np.r_[True, (symbol_ids[1:] != symbol_ids[:-1]) | is_flat[:-1]])
+    quantity = np.where(is_flat, 0, _cumsum_by_group(signed_qty, segment_ids))
+    quantity_before = quantity - signed_qty
+    with np.errstate(divide="ignore", invalid="ignore"):
+        close_ratio = np.where(is_close, qty / quantity_before, 0)
+
+    # cost basis ( avg_price * quantity ) and current_commission are linear recurrences in a segment
+    # the remaining ratio of the flattening close is 0, that value is not used after it
+    keep_ratio = np.where(is_close & ~is_flat, 1 - close_ratio, 1)
+    cost_basis = _linear_recurrence_by_group(keep_ratio, np.where(is_open, price * qty, 0), segment_ids)
+    commission_after = _linear_recurrence_by_group(keep_ratio, keep_ratio * fee, segment_ids)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_price_before = _previous_by_group(cost_basis, segment_ids) / quantity_before
+        avg_price = np.where(is_open, cost_basis / quantity, avg_price_before)
+    commission_mid = _previous_by_group(commission_after, segment_ids) + fee
+    current_commission = np.where(is_flat, 0, commission_after)
+
+    realized_pnl = np.where(is_close, (price - avg_price_before) * qty * np.where(is_short, -1, 1), 0)
+    real_profit = np.where(is_close, realized_pnl - commission_mid * close_ratio, 0)
+    # open fills keep real_profit and its rate of the last close in the segment
+    last_real_profit = _last_before_by_group(real_profit, is_close, segment_ids)
+    real_profit = np.where(is_close, real_profit, last_real_profit)
+
+    # short close uses USDT_Qty of the open right before it and real_profit before the close
+    open_usdt_qty = qty * price - fee
+    usdt_qty_before = _last_before_by_group(np.where(is_open, open_usdt_qty, 0), is_short, segment_ids)
+    usdt_qty = np.where(is_close & is_short, usdt_qty_before + last_real_profit, open_usdt_qty)
+    usdt_qty_before = np.where(is_short, np.where(is_open, open_usdt_qty, 0), usdt_qty_before)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        realized_pnl_rate = np.where(is_close & (usdt_qty != 0), realized_pnl / usdt_qty, 0)
+        real_profit_rate = np.where(is_close & (usdt_qty != 0), real_profit / usdt_qty, 0)
+    real_profit_rate = np.where(
+        is_close, real_profit_rate, _last_before_by_group(real_profit_rate, is_close, segment_ids)
+    )
+
+    total_count = _cumsum_by_group(is_close, symbol_ids)
+    win_count = _cumsum_by_group(is_close & (realized_pnl > 0), symbol_ids)
+    win_count_profit = _cumsum_by_group(is_close & (real_profit > 0), symbol_ids)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        winrate_pnl = np.where(is_close, win_count / total_count, 0)
+        winrate_profit = np.where(is_close, win_count_profit / total_count, 0)
+    winrate_pnl = np.where(is_close, winrate_pnl, _last_before_by_group(winrate_pnl, is_close, segment_ids))
+    winrate_profit = np.where(is_close, winrate_profit, _last_before_by_group(winrate_profit, is_close, segment_ids))
+
+    sorted_history = dict(
+        position_side=position_sides[order],
+        avg_price=avg_price,
+        quantity=quantity,
+        realized_pnl=realized_pnl,
+        realized_pnl_rate=realized_pnl_rate,
+        total_realized_pnl=_cumsum_by_group(realized_pnl, symbol_ids),
+        winrate_pnl=winrate_pnl,
+        win_count=win_count,
+        total_count=total_count,
+        current_commission=current_commission,
+        real_profit=real_profit,
+        real_profit_rate=real_profit_rate,
+        total_real_profit=_cumsum_by_group(np.where(is_close, real_profit, 0), symbol_ids),
+        winrate_profit=winrate_profit,
+        win_count_profit=win_count_profit,
+        USDT_Qty=usdt_qty,
+        USDT_Qty_before=usdt_qty_before,
+    )
+    history = dict()
+    for field in PNL_FIELDS:
+        values = np.empty(n_fills, dtype=sorted_history[field].dtype)
+        values[order] = sorted_history[field]
+        history[field] = values
+    return history
@@ -0,0 +1,188 @@
+"""
+거래소, symbol 별 호가 단위, 수량 단위, 최소 주문 금액을 관리합니다.
+"""
+import math
+import bisect
+from decimal import Decimal, ROUND_FLOOR
+
+import numpy as np
+
+# upbit KRW market tick size by price, TICK_SIZES[i] is used below TICK_BOUNDS[i]
+UPBIT_KRW_TICK_BOUNDS = [10, 100, 1000, 10000, 100000, 500000, 1000000, 2000000]
+UPBIT_KRW_TICK_SIZES = [0.01, 0.1, 1, 5, 10, 50, 100, 500, 1000]
+
+# float noise in step units ignored when flooring or ceiling to a step, 0.29 / 1e-8 = 28999999.999999996 is 29000000 steps
+# it is absolute, not relative, so a large quantity is never rounded up past a step
+_STEP_EPSILON = 1e-6
+
+
+def _step_decimals(step):
+    return max(0, -Decimal(str(step)).as_tuple().exponent)
+
+
+class SymbolRules:
+    """
+    Class SymbolRules
+        한 symbol의 호가 단위 ( tick size ), 수량 단위 ( lot size ), 최소 주문 금액 ( min notional ) 을 가지고 있는 모듈
+        tick size는 가격 구간 별 table로 가지고 있고, tick_bounds가 비어 있으면 모든 가격에 tick_sizes[0]을 사용함.
+        scalar 함수는 bisect, array 함수는 np.searchsorted로 같은 table을 찾으므로 두 결과가 같음.
+
+    Attributes:
+        tick_bounds : tick size가 바뀌는 가격의 오름차순 list
+        tick_sizes : 각 가격 구간의 tick size list, 길이는 len(tick_bounds) + 1
+        lot_size : 주문 수량의 단위
+        min_notional : 가격 * 수량의 최소값
+
+    Functions:
+        tick_size : 가격의 tick size를 반환
+        round_price : 가격을 tick size 단위로 내림 ( down ), 올림 ( up ), 반올림 ( nearest )
+        floor_quantity : 수량을 lot size 단위로 내림, float 또는 Decimal을 받아 Decimal로 정확히 내리므로 결과는 입력보다 크지 않음
+        format_quantity : lot size 단위로 내린 수량을 주문 요청용 문자열로 반환 ( Decimal 잔고를 float 변환 없이 사용 가능 )
+        is_notional_enough : 가격 * 수량이 min_notional 이상인지 반환
+        tick_sizes_of, round_prices, floor_quantities : 위 함수들의 numpy array 버전
+
+    """
+
+    def __init__(self, tick_sizes, tick_bounds=(), lot_size=1e-8, min_notional=0):
+        if len(tick_sizes) != len(tick_bounds) + 1:
+            raise ValueError("tick_sizes should have one more element than tick_bounds")
+        self.tick_bounds = list(tick_bounds)
+        self.tick_sizes = list(tick_sizes)
+        self.lot_size = lot_size
+        self.min_notional = min_notional
+        self._tick_bounds_array = np.array(self.tick_bounds, dtype=np.float64)
+        self._tick_sizes_array = np.array(self.tick_sizes, dtype=np.float64)
+        self._tick_decimals = [_step_decimals(tick_size) for tick_size in self.tick_sizes]
+        self._lot_decimals = _step_decimals(lot_size)
+        self._lot_size_decimal = Decimal(str(lot_size))
+        # lot_size = _lot_units / _lot_scale with integers, so the array version divides exactly once
+        self._lot_scale = 10**self._lot_decimals
+        self._lot_units = int(self._lot_size_decimal * self._lot_scale)
+
+    def __repr__(self):
+        return (
+            f"SymbolRules(tick_sizes={self.tick_sizes}, tick_bounds={self.tick_bounds}, "
+            f"lot_size={self.lot_size}, min_notional={self.min_notional})"
+        )
+
+    def tick_size(self, price):
+        return self.tick_sizes[bisect.bisect_right(self.tick_bounds, price)]
+
+    def round_price(self, price, direction="nearest"):
+        index = bisect.bisect_right(self.tick_bounds, price)
+        tick_size = self.tick_sizes[index]
+        ticks = price / tick_size
+        if direction == "down":
+            ticks = math.floor(ticks + _STEP_EPSILON)
+        elif direction == "up":
+            ticks = math.ceil(ticks - _STEP_EPSILON)
+        elif direction == "nearest":
+            ticks = round(ticks)
+        else:
+            raise ValueError(f"direction should be down, up or nearest, not {direction}")
+        return round(ticks * tick_size, self._tick_decimals[index])
+
+    def _floor_decimal(self, quantity):
+        # the shortest repr of a float is exact in decimal, so 0.29 stays 0.29 and nothing is rounded up
+        quantity = quantity if isinstance(quantity, Decimal) else Decimal(repr(float(quantity)))
+        return (quantity / self._lot_size_decimal).to_integral_value(ROUND_FLOOR) * self._lot_size_decimal
+
+    def floor_quantity(self, quantity):
+        return float(self._floor_decimal(quantity))
+
+    def format_quantity(self, quantity):
+        # fixed point string of lot size decimals for order requests
+        return f"{self._floor_decimal(quantity):.{self._lot_decimals}f}"
+
+    def is_notional_enough(self, price, quantity):
+        return price * quantity >= self.min_notional
+
+    def tick_sizes_of(self, prices):
+        return self._tick_sizes_array[np.searchsorted(self._tick_bounds_array, prices, side="right")]
+
+    def round_prices(self, prices, direction="nearest"):
+        prices = np.asarray(prices, dtype=np.float64)
+        tick_sizes = self.tick_sizes_of(prices)
+        ticks = prices / tick_sizes
+        if direction == "down":
+            ticks = np.floor(ticks + _STEP_EPSILON)
+        elif direction == "up":
+            ticks = np.ceil(ticks - _STEP_EPSILON)
+        elif direction == "nearest":
+            ticks = np.round(ticks)
+        else:
+            raise ValueError(f"direction should be down, up or nearest, not {direction}")
+        return np.round(ticks * tick_sizes, max(self._tick_decimals))
+
+    def floor_quantities(self, quantities):
+        quantities = np.asarray(quantities, dtype=np.float64)
+        steps = np.floor(quantities * self._lot_scale / self._lot_units + _STEP_EPSILON)
+        floored = np.asarray(steps * self._lot_units / self._lot_scale)
+        # a quantity within the epsilon below a step, or beyond the float precision of its step count,
+        # is floored exactly like floor_quantity so the result is never greater than the input
+        over = floored > quantities
+        if over.any():
+            floored[over] = [self.floor_quantity(quantity) for quantity in quantities[over]]
+        return floored[()]
+
+
+class TradingRules:
+    """
+    Class TradingRules
+        거래소 ( venue ) 별 기본 SymbolRules와 symbol 별 SymbolRules를 가지고 있는 registry
+        symbol 별 rule이 없으면 venue의 기본 rule을 사용함.
+        binance는 load_binance로 exchange information을 한 번만 받아 저장하므로
+        여러 order handler가 같은 registry ( TRADING_RULES ) 를 공유하면 요청도 한 번만 보냄.
+
+    Attributes:
+        defaults : venue 별 기본 SymbolRules dict
+        symbols : venue 별 { symbol : SymbolRules } dict
+        loaded_venues : exchange information을 받아 저장한 venue의 set
+
+    Functions:
+        get : venue, symbol의 SymbolRules를 반환
+        register : symbol의 SymbolRules를 저장
+        load_binance : binance request client의 exchange information으로 symbol 별 rule 저장 ( venue 당 한 번 )
+
+    """
+
+    def __init__(self):
+        self.defaults = {
+            "upbit": SymbolRules(UPBIT_KRW_TICK_SIZES, UPBIT_KRW_TICK_BOUNDS, lot_size=1e-8, min_notional=5000),
+            "binance": SymbolRules([0.01], lot_size=0.001, min_notional=5),
+        }
+        self.symbols = {venue: dict() for venue in self.defaults}
+        self.loaded_venues = set()
+
+    def get(self, venue: str, symbol: str = None):
+        rules = self.symbols[venue].get(symbol)
+        return rules if rules is not None else self.defaults[venue]
+
+    def register(self, venue: str, symbol: str, rules: SymbolRules):
+        self.symbols.setdefault(venue, dict())[symbol] = rules
+
+    def load_binance(self, request_client, force=False):
+        """
+        request_client : binance_f RequestClient, symbol은 exchange의 symbol ( ex : BTCUSDT ) 로 저장
+        """
+        if "binance" in self.loaded_venues and not force:
+            return
+        for ex in request_client.get_exchange_information().symbols:
+            filters = {item["filterType"]: item for item in ex.filters}
+            tick_size = float(filters["PRICE_FILTER"]["tickSize"]) if "PRICE_FILTER" in filters else None
+            lot_size = float(filters["LOT_SIZE"]["stepSize"]) if "LOT_SIZE" in filters else None
+            min_notional = filters.get("MIN_NOTIONAL", dict())
+            self.register(
+                "binance",
+                ex.symbol,
+                SymbolRules(
+                    [tick_size or 10.0**-ex.pricePrecision],
+                    lot_size=lot_size or 10.0**-ex.quantityPrecision,
+                    min_notional=float(min_notional.get("notional", min_notional.get("minNotional", 0))),
+                ),
+            )
+        self.loaded_venues.add("binance")
+
+
+# registry shared by the live handlers, backtest simulators and the vectorized backtester
+TRADING_RULES = TradingRules()
@@ -1,12 +1,13 @@
 import time
 import secrets
-from decimal import Decimal, getcontext
+from decimal import Decimal
 
 from binance_f.constant.test import *
 from binance_f.base.printobject import *
 from binance_f.model.constant import *
 
 from arte.system.utils import symbolize_upbit
+from arte.system.trading_rules import TRADING_RULES
 
 
 def get_timestamp():
@@ -56,13 +57,10 @@ class UpbitOrderHandler:
                 f"Cannot execute sell {symbol}:{self.account[symbol]}, you dont have any position or not enough size to sell."
             )
 
-    def _asset_ratio_to_quantity(self, symbol: str, ratio, unit_float=8):
-        getcontext().prec = unit_float + 1
-        asset_quantity = self.account[symbol][PositionSide.LONG]
-        full_unit_quantity = str(asset_quantity * Decimal(ratio))
-        div_float = full_unit_quantity.split(".")
-        _quantity = div_float[0] + "." + div_float[1][:unit_float]
-        return _quantity
+    def _asset_ratio_to_quantity(self, symbol: str, ratio):
+        # the account balance is a Decimal, floor it without a float round trip
+        asset_quantity = Decimal(self.account[symbol][PositionSide.LONG]) * Decimal(str(ratio))
+        return TRADING_RULES.get("upbit", symbolize_upbit(symbol)).format_quantity(asset_quantity)
 
     def _generate_order_id(self, symbol: str):
         _id = symbolize_upbit(symbol) + str(get_timestamp()) + f"-{secrets.token_hex(4)}"
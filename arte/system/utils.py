@@ -6,31 +6,49 @@ import pandas as pd
 import numpy as np
 
 
-class Timer:
-    def __init__(self):
-        pass
+class SimulatedClock:
+    """
+    Class SimulatedClock
+        replay 중인 data의 시각을 현재 시각으로 제공하는 clock
+        ReplaySubscriptionClient가 message를 전달하기 전에 set_time으로 시각을 옮기고,
+        Timer, backtest trade manager는 clock이 주어지면 wall clock 대신 이 시각을 읽음.
 
-    def start(self, start_time, target_interval):
-        self.start_time = start_time
-        self.finish_time = self.start_time + pd.Timedelta(target_interval)
+    Attributes:
+        current_ms : 현재 시각, ms 단위 unix timestamp
 
-    def check_timeup(self, current_time):
-        return True if current_time >= self.finish_time else False
+    Functions:
+        set_time : 현재 시각을 옮김, 과거로는 돌아가지 않음
+        now : 현재 시각을 pd.Timestamp로 반환
 
+    """
 
-class Grouping:
-    def __init__(self):
-        pass
+    def __init__(self, start_ms: int = 0):
+        self.current_ms = start_ms
 
-    def round_unix_date(self, ts, seconds=60, up=False):
-        return int(ts // seconds * seconds + seconds * up)
+    def set_time(self, current_ms: int):
+        if current_ms > self.current_ms:
+            self.current_ms = current_ms
 
-    def np_dt_to_unix_timestamp(self, dt):
-        return int(dt.astype("int64") / 1e9)
+    def now(self):
+        return pd.Timestamp(self.current_ms, unit="ms")
 
-    def make_group(self, df, freq="S"):
-        df["datetime"] = pd.to_datetime(df["timestamp"].apply(lambda x: x), unit="ms")
-        return df.groupby(pd.Grouper(key="datetime", freq=freq))
+
+class Timer:
+    def __init__(self, clock=None):
+        # SimulatedClock, the time read when start_time or current_time is not given
+        self.clock = clock
+
+    def _now(self):
+        return self.clock.now() if self.clock is not None else pd.Timestamp.now()
+
+    def start(self, start_time, target_interval):
+        # start_time None starts from the clock ( or wall clock ) time
+        self.start_time = start_time if start_time is not None else self._now()
+        self.finish_time = self.start_time + pd.Timedelta(target_interval)
+
+    def check_timeup(self, current_time=None):
+        current_time = current_time if current_time is not None else self._now()
+        return True if current_time >= self.finish_time else False
 
 
 def generate_intervals(start, end, periods):
@@ -49,6 +67,17 @@ def generate_intervals(start, end, periods):
     return intervals
 
 
+def warmup_start_date(start_date, dates, warmup_days):
+    # earliest date of the warm-up before start_date, only going back over consecutive dates in dates
+    warmup_start = pd.Timestamp(start_date)
+    for _ in range(warmup_days):
+        previous_date = warmup_start - pd.Timedelta("1D")
+        if previous_date.strftime("%Y-%m-%d") not in dates:
+            break
+        warmup_start = previous_date
+    return warmup_start.strftime("%Y-%m-%d")
+
+
 def random_choice():
     alphabet = string.ascii_lowercase + string.digits
     return "".join(random.choices(alphabet, k=8))
@@ -88,4 +117,3 @@ def print_important(string, line_length=50):
     print("*" * line_length)
     print("-" * padding_size + " " + string + " " + "-" * padding_size)
     print("*" * line_length)
-
@@ -2,3 +2,5 @@ from arte.test_system.binance.bt_trade_manager import BackTestBinanceTradeManage
 from arte.test_system.upbit.bt_trade_manager import BackTestUpbitTradeManager
 from arte.test_system.upbit.rtt_trade_manager import RTTUpbitTradeManager
 from arte.test_system.batch_backtester import BatchBacktester
+from arte.test_system.vectorized_backtester import VectorizedBacktester
+from arte.test_system.record_store import RecordStore
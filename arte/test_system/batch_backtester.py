@@ -1,18 +1,173 @@
 import os
 import copy
+import random
+import itertools
 from datetime import datetime
-import functools
 import multiprocessing
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import pandas as pd
+from tqdm import tqdm
 
-from arte.system.utils import generate_intervals, random_choice
+from arte.system.utils import random_choice, warmup_start_date
+from arte.data.test_data_loader import TestDataLoader
+from arte.data.replay_cursor import ReplayCursor
+from arte.data.ohlcv_cache import OhlcvCache
+from arte.test_system.result_cache import BacktestResultCache, content_hash, strategy_code_version, strategy_state
+from arte.test_system.record_store import RecordStore
+from arte.test_system.bt_order_recorder import RecordBatch
 
 TEST_DB_PATH = "./test_db"
 
+# per worker state of parameter sweeps, set by _init_sweep_worker
+_sweep_state = dict()
+
+
+def _init_sweep_worker(sweep_loop, cursor_meta, aux_series):
+    _sweep_state["sweep_loop"] = sweep_loop
+    _sweep_state["cursor"] = ReplayCursor.attach(cursor_meta)
+    _sweep_state["aux_series"] = aux_series
+
+
+def _run_sweep_task(params):
+    record = _sweep_state["sweep_loop"](_sweep_state["cursor"], _sweep_state["aux_series"], params)
+    return summarize_record(record)
+
+
+def summarize_record(record):
+    # metrics of a main loop result, market prefixed if the result is a dict of market records
+    if isinstance(record, dict):
+        metrics = dict()
+        for market, market_records in record.items():
+            metrics.update({f"{market}_{key}": value for key, value in summarize_records(market_records).items()})
+        return metrics
+    return summarize_records(record)
+
+
+def stitch_records(chunk_records, tolerance=1e-4, strict=False):
+    """
+    chunk 별 record를 하나의 serial backtest record로 합침
+    chunk_records : 시작 일자 순으로 정렬된 (chunk 시작 일자, record list) 의 list
+    strict : True이면 position handoff가 맞지 않을 때 ValueError
+    return : (합친 record list, handoff mismatch dict list)
+
+    - chunk 시작 이전 ( warm-up ) 의 record는 버림
+    - chunk 경계에서 이전 chunk가 남긴 (symbol, positionSide) 별 position과 다음 chunk가 warm-up 동안 잡은 position을 비교하고,
+      다르면 mismatch로 반환함 ( 이 때 합친 record는 serial backtest와 다름, warmup_days를 늘려야 함 )
+    - total_realized_pnl, total_real_profit, win_rate_pnl, win_rate_profit을 전체 record 기준으로 다시 계산
+    - 각 chunk의 account는 초기 잔고로 시작하므로, 잔고 비율로 주문 수량을 정하는 strategy의 차이는 맞추지 않음
+    """
+    stitched = []
+    mismatches = []
+    open_qty = dict()
+    max_order_qty = dict()
+    for chunk_start, records in chunk_records:
+        chunk_start = pd.Timestamp(chunk_start)
+        records = [record for record in records if pd.Timestamp(record["updateTime"]) >= chunk_start]
+
+        # the position opened in warm-up shows up as the largest deficit of the chunk's own position flow
+        running_qty = dict()
+        carried_qty = dict()
+        closed_positions = set()
+        for record in records:
+            # side_positionSide_type is BUY_ for opens and SELL_ for closes of both position sides
+            side, position_side = record["side_positionSide_type"].split("_")[:2]
+            position = (record["symbol"], position_side)
+            max_order_qty[position] = max(max_order_qty.get(position, 0), record["origQty"])
+            if side == "BUY":
+                running_qty[position] = running_qty.get(position, 0) + record["origQty"]
+            else:
+                running_qty[position] = running_qty.get(position, 0) - record["origQty"]
+                closed_positions.add(position)
+            carried_qty[position] = max(carried_qty.get(position, 0), -running_qty[position])
+
+        for position in set(open_qty) | set(running_qty):
+            previous_qty = open_qty.get(position, 0)
+            if position in closed_positions:
+                current_qty = carried_qty.get(position, 0)
+                if abs(previous_qty - current_qty) > tolerance * max_order_qty[position]:
+                    mismatch = dict(
+                        symbol=position[0],
+                        position_side=position[1],
+                        chunk_start=chunk_start,
+                        previous_qty=previous_qty,
+                        current_qty=current_qty,
+                    )
+                    if strict:
+                        raise ValueError(f"Position handoff mismatch, increase warmup_days : {mismatch}")
+                    mismatches.append(mismatch)
+            else:
+                # position is never closed in this chunk, so it is assumed to be held from the previous chunk
+                current_qty = previous_qty
+            open_qty[position] = max(current_qty + running_qty.get(position, 0), 0)
+        stitched += records
+
+    totals = dict()
+    for record in stitched:
+        total = totals.setdefault(
+            record["symbol"], dict(realized_pnl=0, real_profit=0, count=0, win_count=0, win_count_profit=0)
+        )
+        if record["side_positionSide_type"].startswith("SELL"):
+            total["realized_pnl"] += record["realized_pnl"]
+            total["real_profit"] += record["real_profit"]
+            total["count"] += 1
+            total["win_count"] += record["realized_pnl"] > 0
+            total["win_count_profit"] += record["real_profit"] > 0
+        record["total_realized_pnl"] = round(total["realized_pnl"], 8)
+        record["total_real_profit"] = round(total["real_profit"], 8)
+        # win rates of open orders are 0 after a full close, otherwise the running win rate
+        if record["win_rate_pnl"] or record["side_positionSide_type"].startswith("SELL"):
+            record["win_rate_pnl"] = round(total["win_count"] / max(total["count"], 1), 8)
+        if record["win_rate_profit"] or record["side_positionSide_type"].startswith("SELL"):
+            record["win_rate_profit"] = round(total["win_count_profit"] / max(total["count"], 1), 8)
+    return stitched, mismatches
+
+
+def summarize_records(records):
+    # compact metrics of BackTestOrderRecorder format records
+    records_df = records.to_frame() if isinstance(records, RecordBatch) else pd.DataFrame(records)
+    if records_df.empty:
+        return dict(
+            order_count=0,
+            close_count=0,
+            total_realized_pnl=0.0,
+            total_real_profit=0.0,
+            win_rate_pnl=0.0,
+            win_rate_profit=0.0,
+            commission=0.0,
+        )
+    closes = records_df[records_df["side_positionSide_type"].str.startswith("SELL")]
+    return dict(
+        order_count=len(records_df),
+        close_count=len(closes),
+        total_realized_pnl=float(closes["realized_pnl"].sum()),
+        total_real_profit=float(closes["real_profit"].sum()),
+        win_rate_pnl=float((closes["realized_pnl"] > 0).mean()) if len(closes) else 0.0,
+        win_rate_profit=float((closes["real_profit"] > 0).mean()) if len(closes) else 0.0,
+        commission=float(records_df["commissionAmount"].sum()),
+    )
+
+
 class BatchBacktester:
-    def __init__(self, main_loop, root_path, strategy_name, markets, symbols, start_date, end_date):
+    def __init__(
+        self,
+        main_loop,
+        root_path,
+        strategy_name,
+        markets,
+        symbols,
+        start_date,
+        end_date,
+        n_workers=None,
+        chunks_per_worker=4,
+        warmup_days=0,
+        strict_handoff=False,
+        strategy_params=None,
+        use_result_cache=False,
+        result_cache_path=None,
+        use_record_store=True,
+        record_store_path=None,
+    ):
         self.main_loop = main_loop
         self.root_path = root_path
         self.strategy_name = strategy_name
@@ -22,6 +177,24 @@ class BatchBacktester:
             [dt.strftime("%Y-%m-%d") for dt in pd.date_range(start=start_date, end=end_date, freq="D")]
         )
         self.n_cpu = multiprocessing.cpu_count()
+        self.n_workers = n_workers or self.n_cpu
+        self.chunks_per_worker = chunks_per_worker
+        # each chunk starts warmup_days earlier to warm up indicators and positions, records before the chunk are dropped
+        self.warmup_days = warmup_days
+        # position handoff mismatches at chunk boundaries are returned in the metrics, or raised if strict_handoff
+        self.strict_handoff = strict_handoff
+
+        # results of each (symbol, date chunk) task are cached by strategy code version, main loop state, parameters and
+        # input data. opt-in, the code version covers only the main loop class unless main_loop.version is bumped
+        self.strategy_params = strategy_params
+        self.result_cache = None
+        if use_result_cache:
+            self.result_cache = BacktestResultCache(result_cache_path or os.path.join(TEST_DB_PATH, "result_cache"))
+
+        # records are also written to a columnar store partitioned by strategy, run id and symbol
+        self.record_store = None
+        if use_record_store:
+            self.record_store = RecordStore(record_store_path or os.path.join(TEST_DB_PATH, "record_store"))
 
     def get_possible_date_range(self, symbol):
         symbol_dates = dict()
@@ -35,51 +208,270 @@ class BatchBacktester:
             intersect_date_range = intersect_date_range & set(_dates)
         return intersect_date_range
 
-    def start(self):
-        possible_dates_symbols = dict()
-        for symbol in self.symbols:
-            possible_dates_symbols[symbol] = self.get_possible_date_range(symbol)
+    def get_date_weights(self, symbol, dates):
+        # data volume of each date, sum of the trade data file sizes of every market
+        date_weights = dict()
+        for date in dates:
+            weight = 0
+            for market in self.markets:
+                fpath = os.path.join(self.root_path, market, symbol, f"{symbol}-{date}.csv")
+                if os.path.exists(fpath):
+                    weight += os.path.getsize(fpath)
+            date_weights[date] = max(weight, 1)
+        return date_weights
 
+    def get_date_fingerprints(self, symbol, dates):
+        # mtime, size of the trade data files of every market for each date
+        date_fingerprints = dict()
+        for date in dates:
+            date_fingerprints[date] = dict()
+            for market in self.markets:
+                fpath = os.path.join(self.root_path, market, symbol, f"{symbol}-{date}.csv")
+                date_fingerprints[date][market] = OhlcvCache.source_stat(fpath) if os.path.exists(fpath) else None
+        return date_fingerprints
+
+    @staticmethod
+    def split_date_chunks(dates, date_weights, target_weight):
+        # contiguous date chunks of about target_weight, a missing date always starts a new chunk
+        chunks = []
+        chunk_dates = []
+        chunk_weight = 0
+        for date in sorted(dates):
+            if chunk_dates and (
+                chunk_weight >= target_weight or pd.Timestamp(date) - pd.Timestamp(chunk_dates[-1]) > pd.Timedelta("1D")
+            ):
+                chunks.append(([chunk_dates[0], chunk_dates[-1]], chunk_weight))
+                chunk_dates = []
+                chunk_weight = 0
+            chunk_dates.append(date)
+            chunk_weight += date_weights[date]
+        if chunk_dates:
+            chunks.append(([chunk_dates[0], chunk_dates[-1]], chunk_weight))
+        return chunks
+
+    def build_tasks(self):
+        """
+        모든 symbol의 (symbol, date chunk) task list를 큰 task 순으로 반환
+        result cache에 같은 strategy, parameter, 입력 data로 계산된 chunk가 있으면 cached task로 따로 반환하고,
+        나머지 일자만 새 task로 나눔
+        각 task의 run_interval은 warmup_days 만큼 앞당긴 실제 실행 기간 ( 연속된 possible date 안에서만 앞당김 )
+        """
+        code_version = strategy_code_version(self.main_loop) if self.result_cache else None
+        main_loop_state = strategy_state(self.main_loop) if self.result_cache else None
+        symbol_runs = dict()
+        cached_tasks = []
         for symbol in self.symbols:
-            if not possible_dates_symbols[symbol]:
-                print(f"There is no possible dates for {symbol}. Break.")
-                break
-            else:
-                pos_dates = sorted(list(possible_dates_symbols[symbol]))
-                actual_start_date = pos_dates[0]
-                actual_end_date = pos_dates[-1]
-                periods = self.n_cpu
-                
-                intervals = generate_intervals(actual_start_date, actual_end_date, periods)
-                print(
-                    f"Start Backtest of {symbol}. date range is from {actual_start_date} to {actual_end_date}. By {periods} divided manner"
+            possible_dates = self.get_possible_date_range(symbol)
+            if not possible_dates:
+                print(f"There is no possible dates for {symbol}. Skip.")
+                continue
+            date_weights = self.get_date_weights(symbol, possible_dates)
+            run_key = None
+            date_fingerprints = None
+            if self.result_cache:
+                run_key = self.result_cache.run_key(
+                    self.strategy_name, code_version, self.strategy_params, self.markets, symbol, main_loop_state
                 )
-                print(intervals)
-                
-                base_records = []
-                additional_records = []
-                partial_start = functools.partial(self.main_loop.start, [symbol])
-                with ProcessPoolExecutor(max_workers=self.n_cpu) as executor:
-                    _records = executor.map(partial_start, intervals)
-                    for record in _records:
-                        if isinstance(record, dict):
-                            base_records += record['upbit']
-                            additional_records += record['binance']
-                        else:
-                            base_records += record
-
-                self.save_records(base_records, actual_start_date, actual_end_date)
-                if additional_records:
-                    self.save_records(additional_records, actual_start_date, actual_end_date)
-
-    def save_records(self, full_records, start_date, end_date):
+                date_fingerprints = self.get_date_fingerprints(symbol, possible_dates)
+                for interval, fingerprint in self.result_cache.find_chunks(
+                    run_key, date_fingerprints, self.warmup_days
+                ):
+                    dates = [dt.strftime("%Y-%m-%d") for dt in pd.date_range(start=interval[0], end=interval[1])]
+                    weight = sum(date_weights.pop(date) for date in dates)
+                    cached_tasks.append(
+                        dict(symbol=symbol, interval=interval, weight=weight, run_key=run_key, fingerprint=fingerprint)
+                    )
+            symbol_runs[symbol] = (possible_dates, date_weights, date_fingerprints, run_key)
+
+        total_weight = sum(sum(date_weights.values()) for _, date_weights, _, _ in symbol_runs.values())
+        target_weight = total_weight / (self.n_workers * self.chunks_per_worker)
+
+        tasks = []
+        for symbol, (possible_dates, date_weights, date_fingerprints, run_key) in symbol_runs.items():
+            for interval, weight in self.split_date_chunks(date_weights.keys(), date_weights, target_weight):
+                fingerprint = None
+                if self.result_cache:
+                    fingerprint = self.result_cache.chunk_fingerprint(interval, date_fingerprints, self.warmup_days)
+                tasks.append(
+                    dict(symbol=symbol, interval=interval, weight=weight, run_key=run_key, fingerprint=fingerprint)
+                )
+        for task in tasks:
+            possible_dates = symbol_runs[task["symbol"]][0]
+            warmup_start = warmup_start_date(task["interval"][0], possible_dates, self.warmup_days)
+            task["run_interval"] = [warmup_start, task["interval"][1]]
+        tasks.sort(key=lambda task: task["weight"], reverse=True)
+        return tasks, cached_tasks
+
+    def start(self):
+        """
+        모든 task를 실행하고 symbol 별 record를 저장, symbol 별 metrics dict를 반환
+        metrics의 handoff_mismatches는 stitch_records가 찾은 chunk 경계의 position 불일치 list ( 비어 있으면 serial과 같음 )
+        """
+        tasks, cached_tasks = self.build_tasks()
+        if not tasks and not cached_tasks:
+            return dict()
+
+        symbol_tasks = dict()
+        for task in cached_tasks + tasks:
+            symbol_tasks.setdefault(task["symbol"], []).append(task)
+        for symbol, _tasks in symbol_tasks.items():
+            intervals = [task["interval"] for task in _tasks]
+            n_cached = sum(task in cached_tasks for task in _tasks)
+            print(
+                f"Start Backtest of {symbol}. {len(intervals)} date chunks ({n_cached} cached) "
+                f"from {min(intervals)[0]} to {max(intervals)[1]}"
+            )
+        print(f"{len(tasks)} tasks of {len(symbol_tasks)} symbols on {self.n_workers} workers")
+
+        chunk_results = {symbol: [] for symbol in symbol_tasks}
+        remaining = {symbol: len(_tasks) for symbol, _tasks in symbol_tasks.items()}
+        metrics = dict()
+
+        def collect(task, record, progress):
+            symbol = task["symbol"]
+            chunk_results[symbol].append((task["interval"][0], record))
+
+            progress.set_postfix_str(f"{symbol} {task['interval'][0]}~{task['interval'][1]}")
+            progress.update(task["weight"])
+
+            remaining[symbol] -= 1
+            if remaining[symbol] == 0:
+                actual_start_date = min(task["interval"] for task in symbol_tasks[symbol])[0]
+                actual_end_date = max(task["interval"] for task in symbol_tasks[symbol])[1]
+                result_hash = None
+                if self.result_cache:
+                    result_hash = content_hash(
+                        sorted(
+                            [task["run_key"], task["interval"], task["fingerprint"]] for task in symbol_tasks[symbol]
+                        )
+                    )[:8]
+
+                # stitch chunk records in date order, reconciling positions handed off at chunk boundaries
+                symbol_results = sorted(chunk_results.pop(symbol), key=lambda result: result[0])
+                symbol_base_records, base_mismatches = stitch_records(
+                    [
+                        (chunk_start, record["upbit"] if isinstance(record, dict) else record)
+                        for chunk_start, record in symbol_results
+                    ],
+                    strict=self.strict_handoff,
+                )
+                symbol_additional_records, additional_mismatches = stitch_records(
+                    [
+                        (chunk_start, record["binance"])
+                        for chunk_start, record in symbol_results
+                        if isinstance(record, dict)
+                    ],
+                    strict=self.strict_handoff,
+                )
+                if symbol_additional_records:
+                    metrics[symbol] = summarize_record(
+                        {"upbit": symbol_base_records, "binance": symbol_additional_records}
+                    )
+                else:
+                    metrics[symbol] = summarize_record(symbol_base_records)
+                # chunk boundaries where the stitched records differ from a serial run
+                metrics[symbol]["handoff_mismatches"] = base_mismatches + additional_mismatches
+                if symbol_base_records:
+                    self.save_records(symbol_base_records, actual_start_date, actual_end_date, result_hash)
+                if symbol_additional_records:
+                    self.save_records(symbol_additional_records, actual_start_date, actual_end_date, result_hash)
+
+        with tqdm(total=sum(task["weight"] for task in cached_tasks + tasks), unit="B", unit_scale=True) as progress:
+            for task in cached_tasks:
+                collect(task, self.result_cache.load(task["run_key"], task["interval"], task["fingerprint"]), progress)
+
+            # every idle worker takes the next largest task from the pool queue until the whole batch finishes
+            if tasks:
+                with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+                    futures = {
+                        executor.submit(self.main_loop.start, [task["symbol"]], task["run_interval"]): task
+                        for task in tasks
+                    }
+                    for future in as_completed(futures):
+                        task = futures[future]
+                        record = future.result()
+                        if self.result_cache:
+                            self.result_cache.save(task["run_key"], task["interval"], task["fingerprint"], record)
+                        collect(task, record, progress)
+        return metrics
+
+    @staticmethod
+    def make_param_combinations(param_grid, n_samples=None, seed=None):
+        # every combination of param_grid values, or n_samples random combinations of them
+        keys = list(param_grid.keys())
+        combinations = [dict(zip(keys, values)) for values in itertools.product(*param_grid.values())]
+        if n_samples is not None and n_samples < len(combinations):
+            combinations = random.Random(seed).sample(combinations, n_samples)
+        return combinations
+
+    def sweep(self, sweep_loop, param_grid, n_samples=None, seed=None, ohlcv_interval=250, **loader_kwargs):
+        """
+        symbols, 기간의 market data를 한 번만 읽어 shared memory에 올리고, parameter 조합 별 backtest를 process pool에서 실행
+        sweep_loop : sweep_loop(cursor, aux_series, params) 형태로 호출되어 record list ( 또는 market 별 record list dict ) 를
+                     반환하는 pickle 가능한 함수, cursor는 TestDataLoader.cursor와 같은 read-only ReplayCursor
+        param_grid : parameter 이름을 key로, 후보 값 list를 value로 하는 dict
+        n_samples : None이면 모든 조합, 아니면 n_samples 개의 random 조합을 실행
+
+        parameter 조합 별 metrics Dataframe을 TEST_DB_PATH에 저장하고 반환
+        """
+        dates = sorted(self.wanted_date_range)
+        loader = TestDataLoader(self.root_path, **loader_kwargs)
+        loader.init_test_data_loader(self.symbols, dates[0], dates[-1], ohlcv_interval=ohlcv_interval)
+
+        combinations = self.make_param_combinations(param_grid, n_samples, seed)
+        print(f"Start parameter sweep of {len(combinations)} combinations on {self.n_workers} workers")
+
+        blocks, cursor_meta = loader.cursor.share()
+        results = [None] * len(combinations)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                initializer=_init_sweep_worker,
+                initargs=(sweep_loop, cursor_meta, loader.aux_series),
+            ) as executor:
+                futures = {executor.submit(_run_sweep_task, params): i for i, params in enumerate(combinations)}
+                for future in tqdm(as_completed(futures), total=len(futures)):
+                    results[futures[future]] = future.result()
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+        sweep_df = pd.DataFrame([dict(params, **metrics) for params, metrics in zip(combinations, results)])
+        self.save_sweep(sweep_df, dates[0], dates[-1])
+        return sweep_df
+
+    def save_sweep(self, sweep_df, start_date, end_date):
+        sweep_id = (
+            f'{self.strategy_name}-{start_date.replace("-", "")[2:]}_{end_date.replace("-", "")[2:]}_{random_choice()}'
+        )
+        dirpath = os.path.join(TEST_DB_PATH, f"{sweep_id.split('-')[0]}_{datetime.today().strftime('%Y%m%d')}")
+        if not os.path.exists(dirpath):
+            os.makedirs(dirpath)
+        sweep_df.to_csv(os.path.join(dirpath, f"SWEEP_{sweep_id}.csv"), index=False)
+
+    def save_records(self, full_records, start_date, end_date, result_hash=None):
+        # records of the same cached result are saved with the same result_hash instead of a random id
         symbol = full_records[0]["symbol"]
-        backtest_id = f'{self.strategy_name}-{start_date.replace("-", "")[2:]}_{end_date.replace("-", "")[2:]}_{random_choice()}'
+        backtest_id = (
+            f'{self.strategy_name}-{start_date.replace("-", "")[2:]}_{end_date.replace("-", "")[2:]}_'
+            f"{result_hash or random_choice()}"
+        )
         dirpath = os.path.join(TEST_DB_PATH, f"{backtest_id.split('-')[0]}_{datetime.today().strftime('%Y%m%d')}")
         if not os.path.exists(dirpath):
             os.makedirs(dirpath)
         fpath = os.path.join(dirpath, f"BT_{symbol}_{backtest_id}.csv")
+        if (
+            result_hash
+            and os.path.exists(fpath)
+            and (
+                self.record_store is None or self.record_store.list_partitions(self.strategy_name, backtest_id, symbol)
+            )
+        ):
+            return
 
         df = pd.DataFrame(full_records, columns=list(full_records[0].keys()))
-        df.sort_values(by=['updateTime'], inplace=True)
-        df.to_csv(fpath, index=False)
\ No newline at end of file
+        df.sort_values(by=["updateTime"], inplace=True)
+        df.to_csv(fpath, index=False)
+        if self.record_store is not None:
+            self.record_store.write(self.strategy_name, backtest_id, symbol, df)
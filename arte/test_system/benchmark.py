@@ -0,0 +1,361 @@
+"""
+synthetic data로 backtest 구성 요소의 처리 속도를 측정합니다.
+"""
+import os
+import io
+import gc
+import json
+import time
+import shutil
+import platform
+import argparse
+import contextlib
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    # windows
+    resource = None
+
+from arte.data.test_data_loader import TestDataLoader
+from arte.test_system.synthetic_market import SyntheticMarket
+from arte.test_system.bt_order_recorder import BackTestOrderRecorder
+from arte.test_system.record_store import RecordStore
+from arte.test_system.upbit.bt_trade_manager import BackTestUpbitTradeManager
+from arte.test_system.binance.bt_trade_manager import BackTestBinanceTradeManager
+
+TEST_DB_PATH = "./test_db"
+BENCHMARK_VERSION = 1
+
+BENCHMARK_SCALES = {
+    "small": dict(symbols=["BTC", "ETH"], n_days=1, trades_per_day=5000, ohlcv_interval=1000, order_every=600),
+    "medium": dict(
+        symbols=["BTC", "ETH", "XRP", "EOS", "ADA"],
+        n_days=2,
+        trades_per_day=20000,
+        ohlcv_interval=1000,
+        order_every=300,
+    ),
+    "large": dict(
+        symbols=["BTC", "ETH", "XRP", "EOS", "ADA", "DOT", "LINK", "TRX", "BCH", "LTC"],
+        n_days=3,
+        trades_per_day=100000,
+        ohlcv_interval=250,
+        order_every=1200,
+    ),
+}
+BENCHMARK_START_DATE = "2021-10-01"
+
+# metrics where a smaller value is better, every other metric is a throughput
+LOWER_IS_BETTER = ("seconds", "peak_rss_mb")
+
+
+def peak_rss_mb():
+    # peak resident set size of this process, None if the platform does not provide it
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on macOS
+    return max_rss / 1024**2 if platform.system() == "Darwin" else max_rss / 1024
+
+
+class BacktestBenchmark:
+    """
+    Class BacktestBenchmark
+        SyntheticMarket으로 만든 data에서 TestDataLoader, replay loop, backtest trade manager ( order handler ),
+        BackTestOrderRecorder ( TestRealizedPnl ), RecordStore를 scale 별로 실행하여 처리 속도를 측정하는 모듈
+        각 scale은 별도의 process에서 실행하므로 peak RSS가 scale 별로 측정됨.
+
+        측정 phase ( seconds 에 phase 별 소요 시간 )
+            load_cold : ohlcv cache가 없는 상태의 init_test_data_loader ( trade csv 읽기 및 ohlcv 변환 )
+            load_cached : cache가 있는 상태의 init_test_data_loader
+            replay : 모든 step의 load_next_by_counter
+            orders : replay 하며 upbit, binance trade manager로 주문한 시간 ( 주문 호출 안의 시간만 합산 )
+            record : orders에서 체결된 주문을 새 BackTestOrderRecorder에 다시 기록한 시간
+            export : record를 Dataframe으로 변환하여 csv, RecordStore에 저장한 시간
+        처리량
+            trades_per_sec : load_cold 기준 raw trade 수 / 초
+            ticks_per_sec : replay 기준 step 수 x symbol 수 x market 수 / 초
+            orders_per_sec, records_per_sec : orders, record 기준 주문 수 / 초
+
+        결과는 baseline으로 저장하고, 이후 결과를 baseline과 비교하여 threshold 이상 느려진 metric을 찾을 수 있음.
+
+    Attributes:
+        work_path : synthetic data, cache, 결과가 저장되는 base 경로
+        scales : 실행할 scale 이름의 list ( BENCHMARK_SCALES의 key )
+        seed : SyntheticMarket의 random seed
+
+    Functions:
+        __init__ : Class 선언 시 work_path, scales 입력 가능
+        prepare_data : scale의 synthetic data를 생성 ( 이미 있으면 그대로 사용 )
+        run_scale : 현재 process에서 한 scale을 실행하고 결과 dict를 반환
+        run : scale 별로 새 process에서 run_scale을 실행하고 결과 list를 반환
+        save_baseline : 결과 list를 이름을 붙여 baseline으로 저장
+        load_baseline : 저장된 baseline을 읽어 옴
+        compare : 결과 list를 baseline과 비교한 Dataframe을 반환
+
+    """
+
+    def __init__(self, work_path: str = None, scales: list = ("small", "medium"), seed: int = 0):
+        self.work_path = work_path or os.path.join(TEST_DB_PATH, "benchmark")
+        self.scales = list(scales)
+        self.seed = seed
+        for scale in self.scales:
+            if scale not in BENCHMARK_SCALES:
+                raise ValueError(f"Unknown benchmark scale {scale}, should be one of {list(BENCHMARK_SCALES)}")
+
+    def _data_path(self, scale: str):
+        return os.path.join(self.work_path, "data", f"{scale}_{self.seed}")
+
+    @staticmethod
+    def _date_range(scale: str):
+        start_date = pd.Timestamp(BENCHMARK_START_DATE)
+        end_date = start_date + pd.Timedelta(days=BENCHMARK_SCALES[scale]["n_days"] - 1)
+        return start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+
+    def prepare_data(self, scale: str, with_orderbook: bool = False):
+        config = BENCHMARK_SCALES[scale]
+        market = SyntheticMarket(
+            self._data_path(scale), config["symbols"], seed=self.seed, trades_per_day=config["trades_per_day"]
+        )
+        return market.generate(*self._date_range(scale), with_orderbook=with_orderbook)
+
+    def run_scale(self, scale: str):
+        """
+        prepare_data가 실행된 scale을 현재 process에서 실행
+        """
+        config = BENCHMARK_SCALES[scale]
+        data_path = self._data_path(scale)
+        start_date, end_date = self._date_range(scale)
+        cache_path = os.path.join(self.work_path, "ohlcv_cache", f"{scale}_{self.seed}_{os.getpid()}")
+        symbols = config["symbols"]
+        seconds = dict()
+
+        def init_loader():
+            data_loader = TestDataLoader(data_path, cache_path=cache_path)
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                data_loader.init_test_data_loader(
+                    symbols, start_date, end_date, ohlcv_interval=config["ohlcv_interval"]
+                )
+            return data_loader
+
+        try:
+            t0 = time.perf_counter()
+            init_loader()
+            seconds["load_cold"] = time.perf_counter() - t0
+
+            gc.collect()
+            t0 = time.perf_counter()
+            data_loader = init_loader()
+            seconds["load_cached"] = time.perf_counter() - t0
+        finally:
+            shutil.rmtree(cache_path, ignore_errors=True)
+
+        n_steps = data_loader.get_counter()
+        t0 = time.perf_counter()
+        for counter in range(n_steps):
+            data_loader.load_next_by_counter(counter)
+        seconds["replay"] = time.perf_counter() - t0
+
+        filled_orders, order_seconds = self._run_orders(data_loader, n_steps, config["order_every"])
+        seconds["orders"] = order_seconds
+
+        order_recorder = BackTestOrderRecorder()
+        t0 = time.perf_counter()
+        for order, order_time in filled_orders:
+            order_recorder.test_order_to_order_dict(order, order_time)
+        seconds["record"] = time.perf_counter() - t0
+
+        export_path = os.path.join(self.work_path, "export", f"{scale}_{self.seed}_{os.getpid()}")
+        try:
+            t0 = time.perf_counter()
+            records_df = order_recorder.return_records().to_frame()
+            os.makedirs(export_path, exist_ok=True)
+            records_df.to_csv(os.path.join(export_path, "records.csv"), index=False)
+            order_recorder.write_records(RecordStore(os.path.join(export_path, "record_store")), "benchmark", scale)
+            seconds["export"] = time.perf_counter() - t0
+        finally:
+            shutil.rmtree(export_path, ignore_errors=True)
+
+        n_trades = config["trades_per_day"] * config["n_days"] * len(symbols) * 2
+        n_orders = len(filled_orders)
+        return {
+            "scale": scale,
+            "n_symbols": len(symbols),
+            "n_days": config["n_days"],
+            "n_trades": n_trades,
+            "n_steps": n_steps,
+            "n_orders": n_orders,
+            "seconds": seconds,
+            "trades_per_sec": n_trades / seconds["load_cold"],
+            "ticks_per_sec": n_steps * len(symbols) * 2 / seconds["replay"],
+            "orders_per_sec": n_orders / seconds["orders"] if seconds["orders"] else None,
+            "records_per_sec": n_orders / seconds["record"] if seconds["record"] else None,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+    @staticmethod
+    def _run_orders(data_loader: TestDataLoader, n_steps: int, order_every: int):
+        """
+        매 step trade manager를 update 하고, symbol 별로 order_every step 마다 position이 없으면 buy, 있으면 sell 주문
+        체결된 (order, 주문 시간) list와 주문 호출 안에서 보낸 시간을 반환
+        """
+        upbit_tm = BackTestUpbitTradeManager(init_krw=10**12, max_order_count=1)
+        binance_tm = BackTestBinanceTradeManager(init_usdt=10**9, max_order_count=1)
+        symbols = data_loader.symbols
+        upbit_prices = data_loader.upbit_trade.price
+        binance_prices = data_loader.binance_trade.price
+        filled_orders = []
+        order_seconds = 0.0
+        holding = set()
+
+        # BackTestBinanceTradeManager prints every order
+        with contextlib.redirect_stdout(io.StringIO()):
+            for counter in range(n_steps):
+                data_loader.load_next_by_counter(counter)
+                current_time = data_loader.current_time
+                upbit_tm.update(current_time, upbit_prices, data_loader.upbit_last_askbid)
+                binance_tm.update(current_time, binance_prices)
+
+                for symbol_idx, symbol in enumerate(symbols):
+                    if (counter + symbol_idx) % order_every:
+                        continue
+                    # skip until both markets have a price
+                    if np.isnan(upbit_prices[symbol]) or np.isnan(binance_prices[symbol]):
+                        continue
+                    if data_loader.upbit_last_askbid[symbol] not in ("ASK", "BID"):
+                        continue
+
+                    t0 = time.perf_counter()
+                    if symbol not in holding:
+                        orders = [
+                            upbit_tm.buy_long_market(symbol=f"KRW-{symbol}", krw=100000),
+                            binance_tm.buy_long_market(symbol=f"{symbol}USDT", usdt=100),
+                        ]
+                    else:
+                        orders = [
+                            upbit_tm.sell_long_market(symbol=f"KRW-{symbol}", ratio=1),
+                            binance_tm.sell_long_market(symbol=f"{symbol}USDT", ratio=1),
+                        ]
+                    order_seconds += time.perf_counter() - t0
+                    holding ^= {symbol}
+                    filled_orders.extend((order, current_time) for order in orders if order)
+        return filled_orders, order_seconds
+
+    def run(self, with_orderbook: bool = False):
+        """
+        scale 별로 data를 준비한 후 새 process에서 run_scale을 실행
+        """
+        results = []
+        for scale in self.scales:
+            t0 = time.perf_counter()
+            generated = self.prepare_data(scale, with_orderbook=with_orderbook)
+            print(f"{scale} : data ready ( {generated['trades']} trades generated, {time.perf_counter() - t0:.1f}s )")
+
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                result = executor.submit(_run_scale_task, self.work_path, self.seed, scale).result()
+            results.append(result)
+            print(self.format_result(result))
+        return results
+
+    @staticmethod
+    def format_result(result: dict):
+        seconds = ", ".join(f"{phase} {value:.2f}s" for phase, value in result["seconds"].items())
+        peak_rss = "-" if result["peak_rss_mb"] is None else f"{result['peak_rss_mb']:.0f}MB"
+        return (
+            f"{result['scale']} : {result['trades_per_sec']:,.0f} trades/s, {result['ticks_per_sec']:,.0f} ticks/s, "
+            f"{result['orders_per_sec'] or 0:,.0f} orders/s, {result['records_per_sec'] or 0:,.0f} records/s, "
+            f"peak RSS {peak_rss}\n    {seconds}"
+        )
+
+    def _baseline_path(self, name: str):
+        return os.path.join(self.work_path, "baselines", f"{name}.json")
+
+    def save_baseline(self, results: list, name: str):
+        baseline = {
+            "version": BENCHMARK_VERSION,
+            "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.platform(),
+            "seed": self.seed,
+            "results": {result["scale"]: result for result in results},
+        }
+        os.makedirs(os.path.dirname(self._baseline_path(name)), exist_ok=True)
+        with open(self._baseline_path(name), "w") as f:
+            json.dump(baseline, f, indent=2)
+
+    def load_baseline(self, name: str):
+        with open(self._baseline_path(name), "r") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _flat_metrics(result: dict):
+        metrics = {f"seconds.{phase}": value for phase, value in result["seconds"].items()}
+        for key in ("trades_per_sec", "ticks_per_sec", "orders_per_sec", "records_per_sec", "peak_rss_mb"):
+            metrics[key] = result[key]
+        return metrics
+
+    def compare(self, results: list, baseline: dict, threshold: float = 0.1):
+        """
+        baseline : load_baseline의 반환값
+        threshold : 이 비율 이상 나빠진 metric은 regression을 True로 표시
+        scale, metric, baseline, current, change ( 좋아진 방향이 양수인 비율 ), regression column의 Dataframe을 반환
+        """
+        rows = []
+        for result in results:
+            baseline_result = baseline["results"].get(result["scale"])
+            if baseline_result is None:
+                continue
+            baseline_metrics = self._flat_metrics(baseline_result)
+            for metric, current in self._flat_metrics(result).items():
+                previous = baseline_metrics.get(metric)
+                if not previous or current is None:
+                    continue
+                change = (current - previous) / previous
+                if metric.startswith(LOWER_IS_BETTER):
+                    change = -change
+                rows.append(
+                    {
+                        "scale": result["scale"],
+                        "metric": metric,
+                        "baseline": previous,
+                        "current": current,
+                        "change": change,
+                        "regression": change < -threshold,
+                    }
+                )
+        return pd.DataFrame(rows, columns=["scale", "metric", "baseline", "current", "change", "regression"])
+
+
+def _run_scale_task(work_path: str, seed: int, scale: str):
+    # process pool worker : BacktestBenchmark.run_scale in a fresh process for the peak RSS of the scale
+    return BacktestBenchmark(work_path, scales=[scale], seed=seed).run_scale(scale)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark backtest throughput on synthetic market data")
+    parser.add_argument("--scales", nargs="+", default=["small", "medium"], choices=list(BENCHMARK_SCALES))
+    parser.add_argument("--work-path", default=None, help="default: ./test_db/benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--with-orderbook", action="store_true", help="also generate orderbook snapshots")
+    parser.add_argument("--save-baseline", default=None, help="save the results as a baseline with this name")
+    parser.add_argument("--compare", default=None, help="compare the results with the baseline of this name")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    benchmark = BacktestBenchmark(args.work_path, scales=args.scales, seed=args.seed)
+    results = benchmark.run(with_orderbook=args.with_orderbook)
+    if args.compare:
+        comparison = benchmark.compare(results, benchmark.load_baseline(args.compare), threshold=args.threshold)
+        with pd.option_context("display.max_rows", None, "display.max_columns", None, "display.width", 120):
+            print(comparison)
+        if comparison["regression"].any():
+            print(f"Regression over {args.threshold:.0%} : {comparison[comparison.regression].metric.tolist()}")
+    if args.save_baseline:
+        benchmark.save_baseline(results, args.save_baseline)
+        print(f"Saved baseline {args.save_baseline}")
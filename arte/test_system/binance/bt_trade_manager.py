@@ -1,7 +1,4 @@
 from functools import wraps
-from decimal import Decimal, getcontext
-
-getcontext().prec = 6
 
 from binance_f.model.constant import *
 from .test_account import TestAccount
@@ -13,6 +10,8 @@ def _process_order(method):
     @wraps(method)
     def _impl(self, **kwargs):
         print(kwargs)
+        if self.clock is not None:
+            self.test_current_time = self.clock.now()
         kwargs["symbol"] = kwargs["symbol"].upper()
         if kwargs["symbol"] not in self.symbols_state:
             self.symbols_state[kwargs["symbol"]] = self._init_symbol_state()
@@ -37,6 +36,14 @@ class BackTestBinanceTradeManager:
             self.bot = kwargs["bot"]
         if "max_order_count" in kwargs:
             self.max_order_count = kwargs["max_order_count"]
+        # FillSimulator, symbols with orderbook depth are filled by walking the depth instead of the last price
+        self.fill_simulator = None
+        if "fill_simulator" in kwargs:
+            self.fill_simulator = kwargs["fill_simulator"]
+        # SimulatedClock, orders are stamped with the replay time instead of the last update time
+        self.clock = None
+        if "clock" in kwargs:
+            self.clock = kwargs["clock"]
 
         # state manage
         self.symbols_state = dict()
@@ -44,41 +51,77 @@ class BackTestBinanceTradeManager:
     def _init_symbol_state(self):
         return dict(order_count=0, positionSize=0, positionSide=PositionSide.INVALID)
 
+    def _uses_depth(self, symbol):
+        return self.fill_simulator is not None and self.fill_simulator.has_depth(symbol[:-4])
+
+    def _depth_open(self, symbol, side, usdt, ratio):
+        # VWAP and USDT of the depth fill of an open, the USDT is less than asked for a partial fill
+        if ratio:
+            usdt = self.account["USDT"] * ratio
+        fill = self.fill_simulator.fill(symbol[:-4], self.test_current_time, side, notional=usdt)
+        return (fill.avg_price, fill.notional) if fill else (None, None)
+
+    def _depth_close(self, symbol, side, position_side, ratio):
+        # VWAP and ratio of the depth fill of a close, the ratio is the filled share of the position for a partial fill
+        held = self.account.ledger.to_float(self.account.ledger.balance((symbol, position_side)))
+        fill = self.fill_simulator.fill(symbol[:-4], self.test_current_time, side, quantity=held * ratio)
+        if fill is None:
+            return None, None
+        return fill.avg_price, fill.quantity / held if fill.is_partial else ratio
+
     @_process_order
     def buy_long_market(self, symbol, usdt=None, ratio=None):
         if self.symbols_state[symbol]["order_count"] < self.max_order_count:
-            return self.order_handler.open_long_market(
-                symbol=symbol, price=self.future_prices[symbol[:-4]], usdt=usdt, ratio=ratio
-            )
+            if self._uses_depth(symbol):
+                price, usdt = self._depth_open(symbol, OrderSide.BUY, usdt, ratio)
+                if price is None:
+                    return None
+                ratio = None
+            else:
+                price = self.future_prices[symbol[:-4]]
+            return self.order_handler.open_long_market(symbol=symbol, price=price, usdt=usdt, ratio=ratio)
 
     @_process_order
     def buy_short_market(self, symbol, usdt=None, ratio=None):
         if self.symbols_state[symbol]["order_count"] < self.max_order_count:
-            return self.order_handler.open_short_market(
-                symbol=symbol, price=self.future_prices[symbol[:-4]], usdt=usdt, ratio=ratio
-            )
+            if self._uses_depth(symbol):
+                price, usdt = self._depth_open(symbol, OrderSide.SELL, usdt, ratio)
+                if price is None:
+                    return None
+                ratio = None
+            else:
+                price = self.future_prices[symbol[:-4]]
+            return self.order_handler.open_short_market(symbol=symbol, price=price, usdt=usdt, ratio=ratio)
 
     @_process_order
     def sell_long_market(self, symbol, ratio):
-        return self.order_handler.close_long_market(symbol=symbol, price=self.future_prices[symbol[:-4]], ratio=ratio)
+        if self._uses_depth(symbol):
+            price, ratio = self._depth_close(symbol, OrderSide.SELL, PositionSide.LONG, ratio)
+            if price is None:
+                return None
+        else:
+            price = self.future_prices[symbol[:-4]]
+        return self.order_handler.close_long_market(symbol=symbol, price=price, ratio=ratio)
 
     @_process_order
     def sell_short_market(self, symbol, ratio):
-        return self.order_handler.close_short_market(symbol=symbol, price=self.future_prices[symbol[:-4]], ratio=ratio)
+        if self._uses_depth(symbol):
+            price, ratio = self._depth_close(symbol, OrderSide.BUY, PositionSide.SHORT, ratio)
+            if price is None:
+                return None
+        else:
+            price = self.future_prices[symbol[:-4]]
+        return self.order_handler.close_short_market(symbol=symbol, price=price, ratio=ratio)
 
     def _postprocess_order(self, order):
         symbol = order.symbol
         if self._is_buy_or_sell(order) == "BUY":
             self.symbols_state[symbol]["order_count"] += 1
-            self.symbols_state[symbol]["positionSize"] = float(
-                Decimal(self.symbols_state[symbol]["positionSize"] + order.origQty)
-            )
+            self.symbols_state[symbol]["positionSize"] = self.account[symbol][order.positionSide]
             self.symbols_state[symbol]["positionSide"] = order.positionSide
 
         elif self._is_buy_or_sell(order) == "SELL":
-            self.symbols_state[symbol]["positionSize"] = float(
-                Decimal(self.symbols_state[symbol]["positionSize"] - order.origQty)
-            )
+            self.symbols_state[symbol]["positionSize"] = self.account[symbol][order.positionSide]
             if self.symbols_state[symbol]["positionSize"] == 0:
                 self.symbols_state[symbol] = self._init_symbol_state()
 
@@ -1,47 +1,63 @@
 from binance_f.model.constant import PositionSide
 
+from arte.test_system.fixed_point_ledger import FixedPointLedger, VENUE_DECIMALS
+
 
 class TestAccount:
     def __init__(self, init_balance=5000):
-        self.assets = dict()
-        self.assets["USDT"] = init_balance
+        # ledger keys : "USDT" and (symbol, positionSide)
+        self.ledger = FixedPointLedger(VENUE_DECIMALS["binance"])
+        self.ledger.deposit("USDT", self.ledger.to_units(init_balance))
+        self._symbols = set()
+
+    @property
+    def assets(self):
+        scale = self.ledger.scale
+        assets = {"USDT": self.ledger.balances["USDT"] / scale}
+        for key, units in self.ledger.balances.items():
+            if key != "USDT":
+                assets.setdefault(key[0], dict())[key[1]] = units / scale
+        return assets
 
     def __getitem__(self, symbol):
-        return self.assets[symbol]
+        if symbol == "USDT":
+            return self.ledger.to_float(self.ledger.balance("USDT"))
+        if symbol not in self._symbols:
+            raise KeyError(symbol)
+        return {
+            position_side: self.ledger.to_float(self.ledger.balance((symbol, position_side)))
+            for position_side in (PositionSide.LONG, PositionSide.SHORT)
+        }
 
     def __repr__(self):
         return str(self.assets)
 
     def _initialize_position(self, symbol):
-        self.assets[symbol] = {PositionSide.LONG: 0, PositionSide.SHORT: 0}
+        self._symbols.add(symbol)
+        for position_side in (PositionSide.LONG, PositionSide.SHORT):
+            self.ledger.balances[(symbol, position_side)] = 0
 
     def deposit_usdt(self, quantity):
-        self.assets["USDT"] += quantity
+        self.ledger.deposit("USDT", self.ledger.to_units(quantity))
 
     def withdraw_usdt(self, quantity):
-        if self.assets["USDT"] >= quantity:
-            self.assets["USDT"] -= quantity
+        self.ledger.withdraw("USDT", self.ledger.to_units(quantity))
 
     def deposit(self, symbol, positionSide, quantity):
-        if symbol not in self.assets.keys():
-            self._initialize_position(symbol)
-        self.assets[symbol][positionSide] += quantity
+        self.deposit_units(symbol, positionSide, self.ledger.to_units(quantity))
 
     def withdraw(self, symbol, positionSide, quantity):
-        if self.has_asset(symbol, positionSide, quantity):
-            self.assets[symbol][positionSide] -= quantity
+        self.ledger.withdraw((symbol, positionSide), self.ledger.to_units(quantity))
 
     def has_asset(self, symbol, positionSide, quantity):
-        if symbol not in self.assets.keys():
-            return False
-        else:
-            if self.assets[symbol][positionSide] < quantity:
-                return False
-            else:
-                return True
+        return self.ledger.has_asset((symbol, positionSide), self.ledger.to_units(quantity))
+
+    def deposit_units(self, symbol, positionSide, units):
+        if symbol not in self._symbols:
+            self._initialize_position(symbol)
+        self.ledger.deposit((symbol, positionSide), units)
 
 
 if __name__ == "__main__":
     acc = TestAccount(init_balance=10000)
     print(acc)
-
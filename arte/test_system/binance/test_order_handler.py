@@ -1,7 +1,3 @@
-from decimal import Decimal, getcontext
-
-getcontext().prec = 6
-
 from functools import wraps
 
 import numpy as np
@@ -31,143 +27,112 @@ class TestOrderHandler:
         self.short_tracker = dict()
 
     def _init_short_tracker(self):
-        return {"avgPrice": Decimal(0), "quantity": Decimal(0)}
+        # ledger units of the average open price and the quantity
+        return {"avgPrice": 0, "quantity": 0}
 
     def _select_fee_rate(self):
-        return Decimal(TAKER_FEE_RATE)
+        return TAKER_FEE_RATE
 
     def _check_ratio_range(self, ratio):
         return True if 0 < ratio <= 1 else False
 
-    @_print_status
-    def open_long_market(self, symbol, price, ratio=None, usdt=None):
-        fee_rate = self._select_fee_rate()
-        price = Decimal(price)
+    def _open_market(self, symbol, price, ratio, usdt, positionSide):
+        # balances, prices and fees are ledger units ( fixed point int )
+        ledger = self.account.ledger
+        fee_rate = ledger.to_units(self._select_fee_rate())
+        price_units = ledger.to_units(price)
         if ratio:
             if self._check_ratio_range(ratio):
-                usdt_to_buy = Decimal(self.account["USDT"]) * Decimal(ratio)
+                usdt_to_buy = ledger.mul(ledger.balance("USDT"), ledger.to_units(ratio))
             else:
                 print("Warning: ratio should be in range (0,1]")
-                return None
+                return None, None, None
         elif usdt:
-            usdt_to_buy = Decimal(usdt)
-        fee = usdt_to_buy * fee_rate
+            usdt_to_buy = ledger.to_units(usdt)
+        fee = ledger.mul(usdt_to_buy, fee_rate)
         whole_cost = usdt_to_buy + fee
-        quantity = usdt_to_buy / price
-        if self.account["USDT"] > whole_cost:
-            o = Order()
-            o.symbol = symbol
-            o.origQty = float(quantity)
-            o.avgPrice = float(price)
-            o.side = OrderSide.BUY
-            o.positionSide = PositionSide.LONG
-            o.type = OrderType.MARKET
-            o.status = "FILLED"
-            o.fee = float(fee)
-
-            self.account.withdraw_usdt(whole_cost)
-            self.account.deposit(symbol, PositionSide.LONG, quantity)
-            return o
-        else:
-            return None
+        quantity = ledger.div(usdt_to_buy, price_units)
+        if not ledger.balance("USDT") > whole_cost:
+            return None, None, None
 
-    @_print_status
-    def close_long_market(self, symbol, price, ratio):
-        fee_rate = self._select_fee_rate()
+        o = Order()
+        o.symbol = symbol
+        o.origQty = ledger.to_float(quantity)
+        o.avgPrice = float(price)
+        o.side = OrderSide.BUY if positionSide == PositionSide.LONG else OrderSide.SELL
+        o.positionSide = positionSide
+        o.type = OrderType.MARKET
+        o.status = "FILLED"
+        o.fee = ledger.to_float(fee)
+
+        ledger.withdraw("USDT", whole_cost)
+        self.account.deposit_units(symbol, positionSide, quantity)
+        return o, usdt_to_buy, quantity
+
+    def _close_market(self, symbol, price, ratio, positionSide):
+        ledger = self.account.ledger
+        fee_rate = ledger.to_units(self._select_fee_rate())
         if not self._check_ratio_range(ratio):
             print("Warning: ratio should be in range (0,1]")
-            return None
-        price = Decimal(price)
-        ratio = Decimal(ratio)
-        if not (self.account[symbol][PositionSide.LONG] > 0):
+            return None, None
+        price_units = ledger.to_units(price)
+        if not (ledger.balance((symbol, positionSide)) > 0):
             print("You cannot sell, no position to sell")
-            return None
-        quantity = Decimal(self.account[symbol][PositionSide.LONG]) * ratio
-        usdt_by_sell = quantity * price
-        fee = usdt_by_sell * fee_rate
+            return None, None
+        quantity = ledger.mul(ledger.balance((symbol, positionSide)), ledger.to_units(ratio))
+        if positionSide == PositionSide.LONG:
+            sell_price = price_units
+        else:
+            sell_price = self.short_tracker[symbol]["avgPrice"] * 2 - price_units
+        usdt_by_sell = ledger.mul(quantity, sell_price)
+        fee = ledger.mul(usdt_by_sell, fee_rate)
         whole_earn = usdt_by_sell - fee
         o = Order()
         o.symbol = symbol
-        o.origQty = float(quantity)
+        o.origQty = ledger.to_float(quantity)
         o.avgPrice = float(price)
-        o.side = OrderSide.SELL
-        o.positionSide = PositionSide.LONG
+        o.side = OrderSide.SELL if positionSide == PositionSide.LONG else OrderSide.BUY
+        o.positionSide = positionSide
         o.type = OrderType.MARKET
         o.status = "FILLED"
-        o.fee = float(fee)
+        o.fee = ledger.to_float(fee)
 
-        self.account.deposit_usdt(whole_earn)
-        self.account.withdraw(symbol, PositionSide.LONG, quantity)
+        ledger.deposit("USDT", whole_earn)
+        ledger.withdraw((symbol, positionSide), quantity)
+        return o, quantity
+
+    @_print_status
+    def open_long_market(self, symbol, price, ratio=None, usdt=None):
+        o, _, _ = self._open_market(symbol, price, ratio, usdt, PositionSide.LONG)
+        return o
+
+    @_print_status
+    def close_long_market(self, symbol, price, ratio):
+        o, _ = self._close_market(symbol, price, ratio, PositionSide.LONG)
         return o
 
     @_print_status
     def open_short_market(self, symbol, price, ratio=None, usdt=None):
-        fee_rate = self._select_fee_rate()
-        price = Decimal(price)
-        if ratio:
-            if self._check_ratio_range(ratio):
-                usdt_to_buy = Decimal(self.account["USDT"]) * Decimal(ratio)
-            else:
-                print("ratio should be in range (0,1]")
-                return None
-        elif usdt:
-            usdt_to_buy = Decimal(usdt)
-        fee = usdt_to_buy * fee_rate
-        whole_cost = usdt_to_buy + fee
-        quantity = usdt_to_buy / price
-        if self.account["USDT"] > whole_cost:
-            o = Order()
-            o.symbol = symbol
-            o.origQty = float(quantity)
-            o.avgPrice = float(price)
-            o.side = OrderSide.SELL
-            o.positionSide = PositionSide.SHORT
-            o.type = OrderType.MARKET
-            o.status = "FILLED"
-            o.fee = float(fee)
-
-            self.account.withdraw_usdt(whole_cost)
-            self.account.deposit(symbol, PositionSide.SHORT, quantity)
-
-            if symbol not in self.short_tracker.keys():
-                self.short_tracker[symbol] = self._init_short_tracker()
-
-            self.short_tracker[symbol]["avgPrice"] = (
-                self.short_tracker[symbol]["avgPrice"] * self.short_tracker[symbol]["quantity"] + usdt_to_buy
-            ) / (self.short_tracker[symbol]["quantity"] + quantity)
-            self.short_tracker[symbol]["quantity"] += quantity
-            return o
-        else:
+        o, usdt_to_buy, quantity = self._open_market(symbol, price, ratio, usdt, PositionSide.SHORT)
+        if o is None:
             return None
 
+        if symbol not in self.short_tracker.keys():
+            self.short_tracker[symbol] = self._init_short_tracker()
+
+        ledger = self.account.ledger
+        tracker = self.short_tracker[symbol]
+        tracker["avgPrice"] = ledger.div(
+            ledger.mul(tracker["avgPrice"], tracker["quantity"]) + usdt_to_buy, tracker["quantity"] + quantity
+        )
+        tracker["quantity"] += quantity
+        return o
+
     @_print_status
     def close_short_market(self, symbol, price, ratio):
-        fee_rate = self._select_fee_rate()
-        if not self._check_ratio_range(ratio):
-            print("Warning: ratio should be in range (0,1]")
-            return None
-        price = Decimal(price)
-        ratio = Decimal(ratio)
-        if not (self.account[symbol][PositionSide.SHORT] > 0):
-            print("You cannot sell, no position to sell")
+        o, quantity = self._close_market(symbol, price, ratio, PositionSide.SHORT)
+        if o is None:
             return None
-        quantity = self.account[symbol][PositionSide.SHORT] * ratio
-        sell_price = self.short_tracker[symbol]["avgPrice"] * 2 - price
-        usdt_by_sell = quantity * sell_price
-        fee = usdt_by_sell * fee_rate
-        whole_earn = usdt_by_sell - fee
-        o = Order()
-        o.symbol = symbol
-        o.origQty = float(quantity)
-        o.avgPrice = float(price)
-        o.side = OrderSide.BUY
-        o.positionSide = PositionSide.SHORT
-        o.type = OrderType.MARKET
-        o.status = "FILLED"
-        o.fee = float(fee)
-
-        self.account.deposit_usdt(whole_earn)
-        self.account.withdraw(symbol, PositionSide.SHORT, quantity)
 
         # short_tracker 반영
         self.short_tracker[symbol]["quantity"] -= quantity
@@ -1,90 +1,235 @@
 """
 오더를 레코드 합니다.
 """
+import numpy as np
+import pandas as pd
+
 from arte.test_system.test_realized_pnl import TestRealizedPnl
 
 TEST_DB_PATH = "./test_db"
 
+# record columns in the order of the exported record dict
+RECORD_COLUMNS = [
+    "clientOrderId",
+    "origQty",
+    "symbol",
+    "updateTime",
+    "avgPrice",
+    "side_positionSide_type",
+    "commissionAmount",
+    "USDT_Qty",
+    "realized_pnl",
+    "total_realized_pnl",
+    "ROE_pnl",
+    "win_rate_pnl",
+    "real_profit",
+    "total_real_profit",
+    "ROE_profit",
+    "win_rate_profit",
+]
+FLOAT_COLUMNS = [
+    "origQty",
+    "avgPrice",
+    "commissionAmount",
+    "USDT_Qty",
+    "realized_pnl",
+    "total_realized_pnl",
+    "ROE_pnl",
+    "win_rate_pnl",
+    "real_profit",
+    "total_real_profit",
+    "ROE_profit",
+    "win_rate_profit",
+]
+CATEGORY_COLUMNS = ["clientOrderId", "symbol", "side_positionSide_type"]
+# decimal places applied on export, columns not listed are exported as recorded
+ROUND_DIGITS = {column: 8 for column in FLOAT_COLUMNS[4:]}
+ROUND_DIGITS["USDT_Qty"] = 4
+
+INITIAL_CAPACITY = 256
+
+
+class RecordBatch:
+    """
+    Class RecordBatch
+        BackTestOrderRecorder가 기록한 record를 column 별 numpy array로 가지고 있는 모듈
+        문자열 column은 category code ( int32 ) 와 category list로, updateTime은 int64 ns로 저장하므로
+        record dict list보다 pickle 크기가 훨씬 작아 ProcessPoolExecutor로 결과를 주고받을 때 유리함.
+        반올림은 to_frame, to_records로 내보낼 때 적용됨.
+
+        기존 record list처럼 len, index, for 문으로 record dict를 얻을 수 있음.
+
+    Attributes:
+        floats : FLOAT_COLUMNS 순서의 (record 수, column 수) float64 array ( 반올림 전 )
+        codes : CATEGORY_COLUMNS 순서의 (record 수, column 수) int32 category code array
+        categories : category column 별 code 순서의 문자열 list
+        update_times : updateTime의 int64 ns array
+
+    Functions:
+        __init__ : floats, codes, categories, update_times 입력 필요
+        to_frame : RECORD_COLUMNS 순서의 반올림 된 Dataframe을 반환
+        to_records : 반올림 된 record dict list를 반환 ( 기존 record_rows 형식 )
+        column : 반올림 전 column array를 반환
+
+    """
+
+    def __init__(self, floats: np.ndarray, codes: np.ndarray, categories: dict, update_times: np.ndarray):
+        self.floats = floats
+        self.codes = codes
+        self.categories = categories
+        self.update_times = update_times
+
+    def __len__(self):
+        return len(self.update_times)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RecordBatch(
+                self.floats[index], self.codes[index], self.categories, self.update_times[index]
+            ).to_records()
+        # a single record is built from its row only, so records[i] in a loop stays O(n)
+        index = range(len(self))[index]
+        record = dict()
+        for name in RECORD_COLUMNS:
+            if name == "updateTime":
+                record[name] = pd.Timestamp(self.update_times[index])
+            elif name in CATEGORY_COLUMNS:
+                record[name] = self.categories[name][self.codes[index, CATEGORY_COLUMNS.index(name)]]
+            else:
+                value = float(self.floats[index, FLOAT_COLUMNS.index(name)])
+                record[name] = round(value, ROUND_DIGITS[name]) if name in ROUND_DIGITS else value
+        return record
+
+    def __iter__(self):
+        return iter(self.to_records())
+
+    def __repr__(self):
+        return f"RecordBatch({len(self)} records)"
+
+    def column(self, name: str):
+        """
+        반올림 전 column array를 반환, 문자열 column은 object array
+        """
+        if name == "updateTime":
+            return pd.to_datetime(self.update_times)
+        if name in CATEGORY_COLUMNS:
+            categories = np.array(self.categories[name], dtype=object)
+            return categories[self.codes[:, CATEGORY_COLUMNS.index(name)]]
+        return self.floats[:, FLOAT_COLUMNS.index(name)]
+
+    def _export_column(self, name):
+        values = self.column(name)
+        if name == "updateTime":
+            return list(values)
+        if name in ROUND_DIGITS:
+            # python round, same result as the record dicts of the previous recorder
+            digits = ROUND_DIGITS[name]
+            return [round(value, digits) for value in values.tolist()]
+        return values.tolist()
+
+    def to_frame(self):
+        return pd.DataFrame({name: self._export_column(name) for name in RECORD_COLUMNS}, columns=RECORD_COLUMNS)
+
+    def to_records(self):
+        columns = [self._export_column(name) for name in RECORD_COLUMNS]
+        return [dict(zip(RECORD_COLUMNS, row)) for row in zip(*columns)]
 
-class BackTestOrderRecorder:
-    def __init__(self):
-        self.order_fields = [
-            "symbol",
-            "clientOrderId",
-            "updateTime",
-            "side_positionSide_type",
-            "origQty",
-            "avgPrice",
-            "USDT_Qty",
-            "commissionAmount",
-            "realized_pnl",
-            "total_realized_pnl",
-            "ROE_pnl",
-            "win_rate_pnl",
-            "real_profit",
-            "total_real_profit",
-            "ROE_profit",
-            "win_rate_profit",
-            "strategy_name",
-        ]
 
+class BackTestOrderRecorder:
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
         self.test_realized_pnl = TestRealizedPnl()
-        self.record_rows = []
 
-    def test_order_to_order_dict(self, order, test_current_time):
-        # test order class to dict(event_dict)
-        event_dict = dict(item for item in order.__dict__.items())
-        order_dict = {}
-
-        # get basic data from orderUpdate event
-        for key in event_dict.keys():
-            if key in self.order_fields:
-                order_dict[key] = event_dict[key]
+        # preallocated column buffers, doubled when full
+        self.n_records = 0
+        self._floats = np.zeros((capacity, len(FLOAT_COLUMNS)), dtype=np.float64)
+        self._codes = np.zeros((capacity, len(CATEGORY_COLUMNS)), dtype=np.int32)
+        self._update_times = np.zeros(capacity, dtype=np.int64)
+        self._category_codes = {name: dict() for name in CATEGORY_COLUMNS}
+
+    def _grow(self):
+        capacity = len(self._update_times) * 2
+        for name in ("_floats", "_codes", "_update_times"):
+            buffer = getattr(self, name)
+            grown = np.zeros((capacity,) + buffer.shape[1:], dtype=buffer.dtype)
+            grown[: len(buffer)] = buffer
+            setattr(self, name, grown)
+
+    def _category_code(self, name, value):
+        codes = self._category_codes[name]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+        return code
 
+    def test_order_to_order_dict(self, order, test_current_time):
+        # test order to a row of the column buffers, rounding is deferred to export
         # making side - positionSide - type data
+        side_positionSide_type = None
         if order.positionSide == "LONG":
-            order_dict["side_positionSide_type"] = (
-                event_dict["side"] + "_" + event_dict["positionSide"] + "_" + event_dict["type"]
-            )
+            side_positionSide_type = order.side + "_" + order.positionSide + "_" + order.type
         elif order.positionSide == "SHORT":
             if order.side == "SELL":  # open short position
-                order_dict["side_positionSide_type"] = "BUY_" + event_dict["positionSide"] + "_" + event_dict["type"]
+                side_positionSide_type = "BUY_" + order.positionSide + "_" + order.type
             elif order.side == "BUY":  # close short position
-                order_dict["side_positionSide_type"] = "SELL_" + event_dict["positionSide"] + "_" + event_dict["type"]
+                side_positionSide_type = "SELL_" + order.positionSide + "_" + order.type
 
         # commisionAmount calc
-        if order.type == "MARKET":
-            order_dict["commissionAmount"] = order.fee
-        else:
-            order_dict["commissionAmount"] = order.fee
+        commissionAmount = order.fee
 
         # calc PNL and Profit
-        self.test_realized_pnl.proceeding(order, order_dict["commissionAmount"])
-
-        # USDT qunatity calc
-        order_dict["USDT_Qty"] = round(self.test_realized_pnl.pnl_dict[order.symbol]["USDT_Qty"], 4)
-
-        # PNL calc
-        order_dict["realized_pnl"] = round(self.test_realized_pnl.pnl_dict[order.symbol]["realized_pnl"], 8)
-        order_dict["total_realized_pnl"] = round(self.test_realized_pnl.pnl_dict[order.symbol]["total_realized_pnl"], 8)
-        order_dict["ROE_pnl"] = round(self.test_realized_pnl.pnl_dict[order.symbol]["realized_pnl_rate"] * 100, 8)
-        order_dict["win_rate_pnl"] = round(self.test_realized_pnl.pnl_dict[order.symbol]["winrate_pnl"], 8)
-
-        # Profit calc incl commission
-        order_dict["real_profit"] = round(self.test_realized_pnl.pnl_dict[order.symbol]["real_profit"], 8)
-        order_dict["total_real_profit"] = round(self.test_realized_pnl.pnl_dict[order.symbol]["total_real_profit"], 8)
-        order_dict["ROE_profit"] = round(self.test_realized_pnl.pnl_dict[order.symbol]["real_profit_rate"] * 100, 8)
-        order_dict["win_rate_profit"] = round(self.test_realized_pnl.pnl_dict[order.symbol]["winrate_profit"], 8)
+        position = self.test_realized_pnl.proceeding(order, commissionAmount)
+
+        if self.n_records == len(self._update_times):
+            self._grow()
+        row = self.n_records
+        self._floats[row] = (
+            order.origQty,
+            order.avgPrice,
+            commissionAmount,
+            position.USDT_Qty,
+            position.realized_pnl,
+            position.total_realized_pnl,
+            position.realized_pnl_rate * 100,
+            position.winrate_pnl,
+            position.real_profit,
+            position.total_real_profit,
+            position.real_profit_rate * 100,
+            position.winrate_profit,
+        )
+        self._codes[row] = (
+            self._category_code("clientOrderId", order.clientOrderId),
+            self._category_code("symbol", order.symbol),
+            self._category_code("side_positionSide_type", side_positionSide_type),
+        )
+        # test current time
+        if not isinstance(test_current_time, pd.Timestamp):
+            test_current_time = pd.Timestamp(test_current_time)
+        self._update_times[row] = test_current_time.value
+        self.n_records += 1
 
         # reset if all sold
-        if self.test_realized_pnl.pnl_dict[order.symbol]["quantity"] == 0:
+        if position.quantity == 0:
             self.test_realized_pnl.close_position(order.symbol)
 
-        # test current time
-        order_dict["updateTime"] = test_current_time
-
-        # update record rows
-        self.record_rows.append(order_dict)
+    def return_batch(self):
+        # copies of the filled rows, so the batch is not changed by later orders
+        categories = {name: list(codes.keys()) for name, codes in self._category_codes.items()}
+        return RecordBatch(
+            self._floats[: self.n_records].copy(),
+            self._codes[: self.n_records].copy(),
+            categories,
+            self._update_times[: self.n_records].copy(),
+        )
 
     def return_records(self):
-        return self.record_rows
+        return self.return_batch()
+
+    @property
+    def record_rows(self):
+        return self.return_batch().to_records()
+
+    def write_records(self, record_store, strategy_name, run_id):
+        # write records to RecordStore, one partition per symbol
+        records_df = self.return_batch().to_frame()
+        for symbol, symbol_df in records_df.groupby("symbol", sort=False):
+            record_store.write(strategy_name, run_id, symbol, symbol_df.reset_index(drop=True))
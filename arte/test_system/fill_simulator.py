@@ -0,0 +1,123 @@
+"""
+orderbook depth를 walk하여 market 주문의 체결을 simulation 합니다.
+"""
+import numpy as np
+
+from binance_f.model.constant import *
+from arte.data.orderbook_depth import OrderbookDepth
+
+
+class Fill:
+    """
+    Class Fill
+        walk_depth의 결과, 여러 level에 걸친 체결의 합계
+
+    Attributes:
+        quantity : 체결 수량
+        notional : 체결 금액 ( 가격 * 수량의 합 )
+        avg_price : VWAP ( notional / quantity )
+        levels : 체결에 사용한 level 수
+        is_partial : depth 전체를 써도 주문을 다 채우지 못했으면 True
+
+    """
+
+    __slots__ = ["quantity", "notional", "avg_price", "levels", "is_partial"]
+
+    def __init__(self, quantity, notional, levels, is_partial):
+        self.quantity = quantity
+        self.notional = notional
+        self.avg_price = notional / quantity
+        self.levels = levels
+        self.is_partial = is_partial
+
+    def __repr__(self):
+        return (
+            f"Fill(quantity={self.quantity}, notional={self.notional}, avg_price={self.avg_price}, "
+            f"levels={self.levels}, is_partial={self.is_partial})"
+        )
+
+
+def walk_depth(prices, cum_sizes, cum_notionals, quantity=None, notional=None):
+    """
+    한 쪽 호가의 level 별 가격, 누적 잔량, 누적 금액으로 quantity 또는 notional 만큼 체결
+    return : Fill, 체결할 수 있는 수량이 없으면 None
+    """
+    if (quantity is None) == (notional is None):
+        raise ValueError("You have to pass either quantity or notional.")
+    n_levels = len(prices)
+    if quantity is not None:
+        level = int(np.searchsorted(cum_sizes, quantity, side="left"))
+    else:
+        level = int(np.searchsorted(cum_notionals, notional, side="left"))
+
+    if level >= n_levels:
+        # the whole depth is not enough, fill what is there
+        if n_levels == 0 or cum_sizes[-1] <= 0:
+            return None
+        return Fill(float(cum_sizes[-1]), float(cum_notionals[-1]), n_levels, True)
+
+    filled_size = float(cum_sizes[level - 1]) if level else 0.0
+    filled_notional = float(cum_notionals[level - 1]) if level else 0.0
+    price = float(prices[level])
+    if quantity is not None:
+        filled_notional += (quantity - filled_size) * price
+        filled_size = quantity
+    else:
+        filled_size += (notional - filled_notional) / price
+        filled_notional = notional
+    if filled_size <= 0:
+        return None
+    return Fill(filled_size, filled_notional, level + 1, False)
+
+
+def walk_levels(prices, sizes, quantity=None, notional=None):
+    # walk_depth of level lists ( ex : upbit orderbook_units ) without precomputed sums
+    prices = np.asarray(prices, dtype=np.float64)
+    sizes = np.asarray(sizes, dtype=np.float64)
+    return walk_depth(prices, np.cumsum(sizes), np.cumsum(prices * sizes), quantity=quantity, notional=notional)
+
+
+class FillSimulator:
+    """
+    Class FillSimulator
+        symbol 별 OrderbookDepth를 가지고, 주문 시점 이전의 가장 최근 snapshot depth를 walk하여 market 주문의 체결을 계산하는 모듈
+        BUY는 ask, SELL은 bid를 최우선 호가부터 소비하며, 여러 level에 걸치면 VWAP으로, depth가 모자라면 부분 체결로 반환함.
+        BackTestUpbitTradeManager, BackTestBinanceTradeManager에 fill_simulator로 넘기면 depth가 있는 symbol은
+        last price 대신 이 체결을 사용함.
+
+    Attributes:
+        depths : symbol 별 OrderbookDepth dict ( trade manager의 가격 dict와 같은 pure symbol key )
+
+    Functions:
+        add_depth : symbol의 OrderbookDepth를 저장
+        load : root_data_path의 orderbook 파일로 symbol들의 OrderbookDepth를 생성하여 저장
+        has_depth : symbol의 depth가 있는지 반환
+        fill : symbol, 시점, side의 체결을 quantity 또는 notional 기준으로 계산
+
+    """
+
+    def __init__(self, depths: dict = None):
+        self.depths = dict(depths) if depths else dict()
+
+    def add_depth(self, symbol: str, depth: OrderbookDepth):
+        self.depths[symbol] = depth
+
+    def load(self, root_data_path: str, market: str, symbols: list, dates: list):
+        for symbol in symbols:
+            self.add_depth(symbol, OrderbookDepth.load(root_data_path, market, symbol, dates))
+        return self
+
+    def has_depth(self, symbol: str):
+        return symbol in self.depths
+
+    def fill(self, symbol: str, current_time, side: str, quantity=None, notional=None):
+        """
+        side : OrderSide.BUY ( ask 소비 ) 또는 OrderSide.SELL ( bid 소비 )
+        return : Fill, 시점 이전 snapshot이 없거나 체결할 수 없으면 None
+        """
+        depth = self.depths[symbol]
+        index = depth.snapshot_index(current_time)
+        if index is None:
+            return None
+        levels = depth.asks(index) if side == OrderSide.BUY else depth.bids(index)
+        return walk_depth(*levels, quantity=quantity, notional=notional)
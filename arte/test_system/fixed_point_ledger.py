@@ -0,0 +1,74 @@
+"""
+backtest 계좌의 잔고를 고정 소수점 정수로 관리합니다.
+"""
+
+# decimal places of one ledger unit ( quantum ) of each venue
+VENUE_DECIMALS = {"upbit": 8, "binance": 8}
+
+
+class FixedPointLedger:
+    """
+    Class FixedPointLedger
+        backtest 계좌의 자산 별 잔고를 10 ** -decimals 단위 ( quantum ) 의 정수로 저장하는 모듈
+        잔고의 덧셈, 뺄셈은 정수 연산이므로 오차가 없고, 곱셈, 나눗셈은 결과를 quantum 단위로 반올림 ( half even ) 함.
+        Decimal의 context precision에 영향을 받지 않으며, python int를 사용하므로 잔고가 커도 overflow가 없음.
+        upbit의 Account, binance의 TestAccount가 공통으로 사용하고, order handler는 unit 단위 함수로 직접 계산함.
+
+    Attributes:
+        decimals : quantum의 소수점 자리 수
+        scale : 10 ** decimals, 1을 나타내는 unit 수
+        balances : 자산 key 별 unit 단위 잔고 dict
+
+    Functions:
+        __init__ : Class 선언 시 decimals 입력 가능 ( VENUE_DECIMALS 참고 )
+        to_units : int, float 값을 unit 단위 정수로 변환
+        to_float : unit 단위 정수를 float으로 변환
+        mul : unit 단위 두 값의 곱을 unit 단위로 반환
+        div : unit 단위 두 값의 나눗셈을 unit 단위로 반환
+        balance : 자산의 unit 단위 잔고를 반환, 없는 자산은 0
+        deposit : 자산에 unit 단위 수량을 더함
+        withdraw : 잔고가 충분하면 unit 단위 수량을 빼고 True, 부족하면 그대로 두고 False를 반환
+        has_asset : 자산이 unit 단위 수량 이상 있는지 반환
+
+    """
+
+    def __init__(self, decimals: int = 8):
+        self.decimals = decimals
+        self.scale = 10**decimals
+        self.balances = dict()
+
+    def to_units(self, value):
+        return int(round(value * self.scale))
+
+    def to_float(self, units: int):
+        return units / self.scale
+
+    def mul(self, a_units: int, b_units: int):
+        # rounded half to even like Decimal
+        quotient, remainder = divmod(a_units * b_units, self.scale)
+        if remainder * 2 > self.scale or (remainder * 2 == self.scale and quotient % 2):
+            quotient += 1
+        return quotient
+
+    def div(self, a_units: int, b_units: int):
+        if b_units < 0:
+            a_units, b_units = -a_units, -b_units
+        quotient, remainder = divmod(a_units * self.scale, b_units)
+        if remainder * 2 > b_units or (remainder * 2 == b_units and quotient % 2):
+            quotient += 1
+        return quotient
+
+    def balance(self, key):
+        return self.balances.get(key, 0)
+
+    def deposit(self, key, units: int):
+        self.balances[key] = self.balances.get(key, 0) + units
+
+    def withdraw(self, key, units: int):
+        if self.has_asset(key, units):
+            self.balances[key] -= units
+            return True
+        return False
+
+    def has_asset(self, key, units: int):
+        return key in self.balances and self.balances[key] >= units
@@ -0,0 +1,236 @@
+import os
+import json
+import shutil
+import tempfile
+import operator
+
+import numpy as np
+import pandas as pd
+
+RECORD_STORE_VERSION = 1
+PARTITION_KEYS = ["strategy", "run_id", "symbol"]
+# partition keys which are not stored as columns, their filters are matched against the partition path
+PATH_ONLY_KEYS = ["strategy", "run_id"]
+
+FILTER_OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda values, candidates: np.isin(values, list(candidates)),
+}
+
+
+def _to_column_array(values: pd.Series):
+    # numpy array which np.load can memory-map ( no object dtype )
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy(dtype="datetime64[ns]")
+    if values.dtype == object:
+        if values.map(lambda value: isinstance(value, pd.Timestamp)).all():
+            return pd.to_datetime(values).to_numpy(dtype="datetime64[ns]")
+        return values.astype(str).to_numpy(dtype=str)
+    return values.to_numpy()
+
+
+def _stat_value(value):
+    # json value of a column min / max, datetimes are kept as int ns
+    if isinstance(value, np.datetime64):
+        return int(value.astype("datetime64[ns]").astype(np.int64))
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _column_stats(values: np.ndarray):
+    # min / max of a column for partition pruning, nan is ignored
+    if values.dtype.kind == "U":
+        values = np.sort(values)
+        return {"min": str(values[0]), "max": str(values[-1])} if len(values) else {}
+    if values.dtype.kind == "f":
+        values = values[~np.isnan(values)]
+    if not len(values) or values.dtype.kind not in "biufM":
+        return {}
+    return {"min": _stat_value(values.min()), "max": _stat_value(values.max())}
+
+
+def _filter_value(value, dtype: str):
+    if np.dtype(dtype).kind == "M":
+        if isinstance(value, (list, tuple, set)):
+            return [np.datetime64(pd.Timestamp(v), "ns") for v in value]
+        return np.datetime64(pd.Timestamp(value), "ns")
+    return value
+
+
+class RecordStore:
+    """
+    Class RecordStore
+        BackTestOrderRecorder 형식의 backtest record를 (strategy, run_id, symbol) partition 별 column 파일로 저장하고
+        여러 run에 걸쳐 조회, 집계하는 모듈
+
+        store_path/{strategy}/{run_id}/{symbol}/ 아래에
+            {column}.npy : column 별 numpy 파일 ( updateTime은 datetime64[ns], 문자열은 고정 길이 unicode )
+            meta.json : row 수, column 별 dtype과 min, max
+        를 저장함.
+        query는 partition 경로와 meta.json의 min, max로 조건을 만족할 수 없는 partition을 건너뛰고 ( predicate pushdown ),
+        남은 partition에서도 조건과 결과에 필요한 column 파일만 memory-map으로 읽음.
+
+    Attributes:
+        store_path : partition 들이 저장되는 base 경로
+
+    Functions:
+        __init__ : Class 선언 시 store_path 입력 필요
+        write : 한 partition의 record를 저장 ( 같은 partition이 있으면 교체 )
+        list_partitions : partition key 조건에 맞는 partition dict의 list를 반환
+        query : 조건에 맞는 record의 필요한 column만 Dataframe으로 반환
+        aggregate : query 결과를 by column으로 묶어 집계한 Dataframe을 반환
+
+    """
+
+    def __init__(self, store_path: str):
+        self.store_path = store_path
+
+    def _partition_path(self, strategy: str, run_id: str, symbol: str):
+        return os.path.join(self.store_path, strategy, run_id, symbol)
+
+    def write(self, strategy: str, run_id: str, symbol: str, records):
+        """
+        records : BackTestOrderRecorder.record_rows 형식의 dict list 또는 Dataframe
+        임시 경로에 쓴 후 교체하여 중간에 실패해도 깨진 partition이 남지 않음
+        """
+        records_df = records if isinstance(records, pd.DataFrame) else pd.DataFrame(records)
+        partition_path = self._partition_path(strategy, run_id, symbol)
+        parent_path = os.path.dirname(partition_path)
+        os.makedirs(parent_path, exist_ok=True)
+
+        temp_path = tempfile.mkdtemp(dir=parent_path)
+        try:
+            meta = {"version": RECORD_STORE_VERSION, "rows": len(records_df), "columns": dict()}
+            for column in records_df.columns:
+                values = _to_column_array(records_df[column])
+                np.save(os.path.join(temp_path, f"{column}.npy"), values)
+                column_meta = {"dtype": values.dtype.str}
+                column_meta.update(_column_stats(values))
+                meta["columns"][column] = column_meta
+            with open(os.path.join(temp_path, "meta.json"), "w") as f:
+                json.dump(meta, f)
+
+            if os.path.exists(partition_path):
+                shutil.rmtree(partition_path)
+            os.replace(temp_path, partition_path)
+        except:
+            shutil.rmtree(temp_path, ignore_errors=True)
+            raise
+
+    def list_partitions(self, strategy=None, run_id=None, symbol=None):
+        """
+        strategy, run_id, symbol : None이면 전체, 문자열이나 문자열 list이면 해당 partition만
+        """
+        conditions = dict(strategy=strategy, run_id=run_id, symbol=symbol)
+        conditions = {key: [value] if isinstance(value, str) else value for key, value in conditions.items()}
+
+        partitions = [dict()]
+        for key in PARTITION_KEYS:
+            next_partitions = []
+            for partition in partitions:
+                level_path = os.path.join(self.store_path, *partition.values())
+                if not os.path.isdir(level_path):
+                    continue
+                for name in sorted(os.listdir(level_path)):
+                    if conditions[key] is not None and name not in conditions[key]:
+                        continue
+                    if os.path.isdir(os.path.join(level_path, name)):
+                        next_partitions.append(dict(partition, **{key: name}))
+            partitions = next_partitions
+        return [
+            partition
+            for partition in partitions
+            if os.path.exists(os.path.join(self._partition_path(**partition), "meta.json"))
+        ]
+
+    @staticmethod
+    def _partition_match(partition: dict, filters: list):
+        # filters on strategy, run_id are decided by the partition path before meta.json is read
+        return all(bool(FILTER_OPERATORS[op](np.array(partition[column]), value)) for column, op, value in filters)
+
+    @staticmethod
+    def _may_match(meta: dict, filters: list):
+        # False if min / max of meta.json shows that no row of the partition can pass the filters
+        for column, op, value in filters:
+            column_meta = meta["columns"].get(column)
+            if column_meta is None:
+                return False
+            if "min" not in column_meta:
+                continue
+            value = _filter_value(value, column_meta["dtype"])
+            if np.dtype(column_meta["dtype"]).kind == "M":
+                low = np.datetime64(column_meta["min"], "ns")
+                high = np.datetime64(column_meta["max"], "ns")
+            else:
+                low, high = column_meta["min"], column_meta["max"]
+            if op == "==" and not low <= value <= high:
+                return False
+            if op == "in" and not any(low <= v <= high for v in value):
+                return False
+            if (op == "<" and not low < value) or (op == "<=" and not low <= value):
+                return False
+            if (op == ">" and not high > value) or (op == ">=" and not high >= value):
+                return False
+        return True
+
+    def query(self, columns: list = None, filters: list = None, strategy=None, run_id=None, symbol=None):
+        """
+        columns : 반환할 column list, None이면 전체 ( partition key인 strategy, run_id도 column으로 선택 가능 )
+        filters : (column, op, value) 의 list, op는 ==, !=, <, <=, >, >=, in ( 모든 조건을 AND로 적용 )
+            strategy, run_id 조건은 partition 경로로 판단함
+        strategy, run_id, symbol : partition 조건 ( list_partitions 참고 )
+        """
+        filters = filters or []
+        path_filters = [item for item in filters if item[0] in PATH_ONLY_KEYS]
+        filters = [item for item in filters if item[0] not in PATH_ONLY_KEYS]
+        frames = []
+        for partition in self.list_partitions(strategy, run_id, symbol):
+            if not self._partition_match(partition, path_filters):
+                continue
+            partition_path = self._partition_path(**partition)
+            with open(os.path.join(partition_path, "meta.json"), "r") as f:
+                meta = json.load(f)
+            if meta["rows"] == 0 or not self._may_match(meta, filters):
+                continue
+
+            def load_column(column):
+                return np.load(os.path.join(partition_path, f"{column}.npy"), mmap_mode="r")
+
+            mask = None
+            for column, op, value in filters:
+                passed = FILTER_OPERATORS[op](
+                    load_column(column), _filter_value(value, meta["columns"][column]["dtype"])
+                )
+                mask = passed if mask is None else mask & passed
+            if mask is not None and not mask.any():
+                continue
+
+            data = dict()
+            n_rows = meta["rows"] if mask is None else int(mask.sum())
+            for column in columns or (["strategy", "run_id"] + list(meta["columns"].keys())):
+                if column in ("strategy", "run_id"):
+                    data[column] = np.full(n_rows, partition[column], dtype=object)
+                    continue
+                if column not in meta["columns"]:
+                    data[column] = np.full(n_rows, None, dtype=object)
+                    continue
+                values = load_column(column)
+                data[column] = np.asarray(values[mask] if mask is not None else values)
+            frames.append(pd.DataFrame(data))
+
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)
+
+    def aggregate(self, by: list, aggregations: dict, filters: list = None, strategy=None, run_id=None, symbol=None):
+        """
+        by : groupby 할 column list ( ex : ["strategy", "run_id", "symbol"] )
+        aggregations : column을 key로, pandas 집계 함수 이름을 value로 하는 dict ( ex : {"realized_pnl": "sum"} )
+        """
+        columns = list(dict.fromkeys(list(by) + list(aggregations.keys())))
+        records_df = self.query(columns, filters, strategy, run_id, symbol)
+        return records_df.groupby(by).agg(aggregations).reset_index()
@@ -0,0 +1,123 @@
+"""
+socket 없이 capture 파일을 SubscriptionClient의 callback으로 바로 전달하는 replay client 입니다.
+"""
+import time
+
+from binance_f import SubscriptionClient
+from binance_f.impl.utils import fast_loads
+from binance_f.impl.websocketconnection import WebsocketConnection
+from binance_f.impl.websocketrequestimpl import WebsocketRequestImpl
+from arte.system.utils import SimulatedClock, threaded
+from arte.test_system.replay_server import capture_stream, data_stream_key, subscription_keys
+
+
+class _SubscriptionRecorder:
+    # stands in for the websocket of a WebsocketConnection, keeps what the subscription handler sends
+    def __init__(self):
+        self.messages = []
+
+    def send(self, data):
+        self.messages.append(data)
+
+
+class ReplaySubscriptionClient(SubscriptionClient):
+    """
+    Class ReplaySubscriptionClient
+        SubscriptionClient의 subscribe_* 함수를 그대로 사용하지만 websocket을 열지 않고,
+        capture 파일 ( 또는 synthetic_stream ) 의 message를 구독한 connection의 WebsocketConnection.on_message로 바로 전달하는 모듈
+        live와 같은 json_parser, update_callback, error_handler를 거치므로 SocketDataManager, parser, strategy를 그대로 사용할 수 있음.
+        message는 한 번만 decode 하여 구독 key를 찾고, dict_parser가 있는 구독에는 decode 된 dict를 그대로 전달함.
+        message를 전달하기 전에 clock을 message의 수신 시각으로 옮기므로, 같은 clock을 받은 Timer와 backtest trade manager는
+        replay 시각으로 동작함. speed=None이면 기다리지 않고 최대 속도로 전달함.
+
+    Attributes:
+        capture_path : MarketDataCapture의 root_path
+        stream : capture_path 대신 사용할 (ms 시각, channel, message) iterable ( ex : synthetic_stream )
+        clock : message 수신 시각을 따라가는 SimulatedClock
+        connections : 구독 별 (channel, 구독 key set, WebsocketConnection) list
+        delivered : callback으로 전달한 message 수
+
+    Functions:
+        run : 구독한 channel의 message를 시간 순으로 전달하고 전달한 수를 반환
+        start : run을 thread에서 실행
+        unsubscribe_all : 구독 전체 취소
+        close : unsubscribe_all과 같음 ( watch dog thread가 없음 )
+
+    """
+
+    def __init__(self, capture_path: str = None, stream=None, clock: SimulatedClock = None):
+        # the live websocket watch dog and uris are not needed, only the request builder
+        self.websocket_request_impl = WebsocketRequestImpl(None)
+        self.capture = None
+        self.capture_path = capture_path
+        self.stream = stream
+        self.clock = clock if clock is not None else SimulatedClock()
+        self.connections = list()
+        self.delivered = 0
+
+    def _SubscriptionClient__create_connection(self, request, market="binance_future"):
+        connection = WebsocketConnection(None, None, None, None, request, is_upbit=market == "upbit")
+        connection.ws = _SubscriptionRecorder()
+        if request.subscription_handler is not None:
+            request.subscription_handler(connection)
+        keys = set()
+        for message in connection.ws.messages:
+            subscribed_keys, response = subscription_keys(market, message)
+            keys.update(subscribed_keys)
+            if response is not None:
+                connection.on_message(response)
+        self.connections.append((market, keys, connection))
+
+    def unsubscribe_all(self):
+        self.connections.clear()
+
+    def close(self):
+        self.unsubscribe_all()
+
+    def _stream(self, start_time, end_time):
+        if self.stream is not None:
+            for receive_time, channel, message in self.stream:
+                if (start_time is None or receive_time >= start_time) and (end_time is None or receive_time < end_time):
+                    yield receive_time, channel, message
+        else:
+            channels = sorted({channel for channel, _, _ in self.connections})
+            yield from capture_stream(self.capture_path, channels, start_time, end_time)
+
+    def run(self, start_time: int = None, end_time: int = None, speed: float = None):
+        """
+        start_time, end_time : ms 단위 수신 시각 범위, speed : 수신 시각 대비 배속, None이면 최대 속도
+        """
+        by_channel = dict()
+        for channel, keys, connection in self.connections:
+            by_channel.setdefault(channel, []).append((keys, connection))
+        clock = self.clock
+        delivered = 0
+        first_time = None
+        start_wall = time.monotonic()
+        for receive_time, channel, message in self._stream(start_time, end_time):
+            subscribers = by_channel.get(channel)
+            if not subscribers:
+                continue
+            # decoded once for the key and the dict parsers of the subscriptions
+            data = fast_loads(message)
+            key = data_stream_key(channel, data)
+            if key is None:
+                continue
+            if speed:
+                if first_time is None:
+                    first_time = receive_time
+                delay = start_wall + (receive_time - first_time) / 1000 / speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            clock.set_time(receive_time)
+            for keys, connection in subscribers:
+                if key in keys:
+                    if not connection.on_dict(data):
+                        connection.on_message(message)
+                    delivered += 1
+        self.delivered += delivered
+        return delivered
+
+    @threaded
+    def start(self, start_time: int = None, end_time: int = None, speed: float = None):
+        self.run(start_time, end_time, speed)
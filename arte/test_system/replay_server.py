@@ -0,0 +1,404 @@
+"""
+capture 또는 synthetic market data를 Upbit, Binance websocket처럼 보내는 local replay server 입니다.
+"""
+import json
+import heapq
+import asyncio
+import argparse
+import threading
+from datetime import datetime, timezone
+
+import tornado.web
+import tornado.netutil
+import tornado.websocket
+import tornado.httpserver
+
+from binance_f.impl.utils import fast_loads
+from arte.data.market_capture import CaptureReader
+from arte.test_system.synthetic_market import MARKETS
+
+CHANNELS = ("upbit", "binance_spot", "binance_future")
+
+# binance event type to its stream name suffix
+BINANCE_EVENT_STREAMS = {
+    "aggTrade": "aggTrade",
+    "trade": "trade",
+    "markPriceUpdate": "markPrice",
+    "24hrTicker": "ticker",
+    "24hrMiniTicker": "miniTicker",
+    "bookTicker": "bookTicker",
+    "forceOrder": "forceOrder",
+}
+
+
+def stream_key(channel: str, message):
+    """
+    message가 전달될 구독 key를 반환
+    upbit : "{type}:{code}" ( ex : "trade:KRW-BTC" ), binance : stream 이름 ( ex : "btcusdt@aggTrade" )
+    구독 응답, error 같이 market data가 아닌 message는 None
+    """
+    return data_stream_key(channel, fast_loads(message))
+
+
+def data_stream_key(channel: str, data):
+    """
+    stream_key의 decode 된 message 버전
+    """
+    if channel == "upbit":
+        return f"{data['type']}:{data['code']}" if "type" in data and "code" in data else None
+    if isinstance(data, list):
+        return f"!{BINANCE_EVENT_STREAMS.get(data[0]['e'], data[0]['e'])}@arr" if data else None
+    if "s" not in data and "e" not in data:
+        return None
+    event_type = data.get("e", "bookTicker")
+    if event_type == "kline":
+        return f"{data['s'].lower()}@kline_{data['k']['i']}"
+    symbol = data["o"]["s"] if event_type == "forceOrder" else data["s"]
+    return f"{symbol.lower()}@{BINANCE_EVENT_STREAMS.get(event_type, event_type)}"
+
+
+def subscription_keys(channel: str, message: str):
+    """
+    client의 구독 요청을 (추가할 key list, 응답 message 또는 None) 으로 변환
+    upbit : [{"ticket": ...}, {"type": ..., "codes": [...]}, ...]
+    binance : {"method": "SUBSCRIBE", "params": [...], "id": ...}
+    """
+    data = json.loads(message)
+    if channel == "upbit":
+        keys = [f"{item['type']}:{code}" for item in data if "type" in item for code in item.get("codes", [])]
+        return keys, None
+    if data.get("method") == "SUBSCRIBE":
+        return list(data.get("params", [])), json.dumps({"result": None, "id": data.get("id")})
+    if data.get("method") == "UNSUBSCRIBE":
+        return [], json.dumps({"result": None, "id": data.get("id")})
+    return [], None
+
+
+def capture_stream(root_path: str, channels: list = None, start_time: int = None, end_time: int = None):
+    """
+    MarketDataCapture로 저장한 channel들의 (receive_time, channel, message) 를 시간 순으로 merge
+    """
+    reader = CaptureReader(root_path)
+    channels = channels or reader.channels()
+
+    def channel_stream(channel):
+        for receive_time, message in reader.read(channel, start_time, end_time):
+            yield receive_time, channel, message
+
+    return heapq.merge(*[channel_stream(channel) for channel in channels], key=lambda item: item[0])
+
+
+def synthetic_stream(market, dates: list, markets: list = MARKETS, with_orderbook: bool = False):
+    """
+    SyntheticMarket의 trade ( upbit trade, binance aggTrade ), orderbook ( upbit ) 을 실제 websocket message 형식으로 변환
+    market : SyntheticMarket, dates : YYYY-MM-DD 문자열 list
+    """
+    stream = []
+    for market_name in markets:
+        for symbol in market.symbols:
+            for date_str in dates:
+                trade_df = market.trade_frame(market_name, symbol, date_str)
+                if market_name == "upbit":
+                    stream.extend(_upbit_trade_messages(symbol, trade_df))
+                    if with_orderbook:
+                        stream.extend(
+                            _upbit_orderbook_messages(symbol, market.orderbook_frame(market_name, symbol, date_str))
+                        )
+                else:
+                    stream.extend(_binance_agg_trade_messages(market_name, symbol, trade_df))
+    stream.sort(key=lambda item: item[0])
+    return stream
+
+
+def _upbit_trade_messages(symbol, trade_df):
+    messages = []
+    for i, (timestamp, price, quantity, ask_bid) in enumerate(
+        trade_df[["timestamp", "price", "quantity", "ask_bid"]].itertuples(index=False)
+    ):
+        timestamp = int(timestamp)
+        trade_datetime = datetime.fromtimestamp(timestamp / 1000, timezone.utc)
+        message = {
+            "type": "trade",
+            "code": f"KRW-{symbol}",
+            "trade_price": price,
+            "trade_volume": quantity,
+            "ask_bid": ask_bid,
+            "prev_closing_price": price,
+            "change": "EVEN",
+            "change_price": 0.0,
+            "trade_date": trade_datetime.strftime("%Y-%m-%d"),
+            "trade_time": trade_datetime.strftime("%H:%M:%S"),
+            "trade_timestamp": timestamp,
+            "timestamp": timestamp,
+            "sequential_id": timestamp * 1000 + i % 1000,
+            "stream_type": "REALTIME",
+        }
+        messages.append((timestamp, "upbit", json.dumps(message).encode("utf-8")))
+    return messages
+
+
+def _upbit_orderbook_messages(symbol, orderbook_df):
+    n_levels = sum(1 for column in orderbook_df.columns if column.startswith("ask_price_"))
+    messages = []
+    for row in orderbook_df.to_dict("records"):
+        units = [
+            {
+                "ask_price": row[f"ask_price_{level}"],
+                "bid_price": row[f"bid_price_{level}"],
+                "ask_size": row[f"ask_size_{level}"],
+                "bid_size": row[f"bid_size_{level}"],
+            }
+            for level in range(n_levels)
+        ]
+        timestamp = int(row["timestamp"])
+        message = {
+            "type": "orderbook",
+            "code": f"KRW-{symbol}",
+            "total_ask_size": sum(unit["ask_size"] for unit in units),
+            "total_bid_size": sum(unit["bid_size"] for unit in units),
+            "orderbook_units": units,
+            "timestamp": timestamp,
+            "stream_type": "REALTIME",
+        }
+        messages.append((timestamp, "upbit", json.dumps(message).encode("utf-8")))
+    return messages
+
+
+def _binance_agg_trade_messages(channel, symbol, trade_df):
+    messages = []
+    for i, (timestamp, price, quantity) in enumerate(
+        trade_df[["timestamp", "price", "quantity"]].itertuples(index=False)
+    ):
+        timestamp = int(timestamp)
+        message = {
+            "e": "aggTrade",
+            "E": timestamp,
+            "s": f"{symbol}USDT",
+            "a": i,
+            "p": f"{price:.8f}",
+            "q": f"{quantity:.8f}",
+            "f": i,
+            "l": i,
+            "T": timestamp,
+            "m": bool(i % 2),
+        }
+        messages.append((timestamp, channel, json.dumps(message)))
+    return messages
+
+
+class _ReplayHandler(tornado.websocket.WebSocketHandler):
+    def initialize(self, server):
+        self.server = server
+        self.channel = None
+        self.keys = set()
+
+    def check_origin(self, origin):
+        return True
+
+    def open(self, channel, _path=None):
+        self.channel = channel
+        self.server._on_open(self)
+
+    def on_message(self, message):
+        self.server._on_subscribe(self, message)
+
+    def on_close(self):
+        self.server._on_close(self)
+
+
+class ReplayServer:
+    """
+    Class ReplayServer
+        Upbit, Binance websocket을 대신하는 local websocket server
+        ws://host:port/{channel}/... 로 접속한 client의 구독 요청 ( binance_f/impl/utils/channels.py 형식 ) 을 받아
+        load한 stream에서 구독한 key의 message만 보냄. upbit message는 binary, binance message는 text frame으로 보냄.
+        tornado IOLoop를 background thread에서 돌리므로 SubscriptionClient와 같은 process에서 사용할 수 있음.
+        재생 속도는 speed = 1 ( 실제 시간 ), N ( N배속 ), None ( 최대 속도 ) 이며,
+        stream 시각에 맞춰 disconnect ( 접속 끊기 ), stall ( 일정 시간 전송 중단 ) 을 넣을 수 있음.
+
+    Attributes:
+        host, port : server 주소, port=0이면 start 시 빈 port를 할당
+        sent : client에 보낸 message 수
+        opened : 지금까지 열린 connection 수 ( 재접속 횟수 확인용 )
+        connections : 현재 열려 있는 handler set
+
+    Functions:
+        start : server thread를 시작하고 port가 열릴 때까지 대기
+        stop : 재생과 server를 종료
+        url : channel의 websocket url을 반환 ( SubscriptionClient의 uri, upbit_uri, spot_uri로 사용 )
+        load : (시각, channel, message) iterable을 구독 key와 함께 메모리에 저장
+        disconnect_at, stall_at : stream 시각에 fault를 예약
+        disconnect, stall : 즉시 fault 실행
+        wait_for_subscriptions : 구독 key 수가 n 이상이 될 때까지 대기
+        play : 재생 시작, 끝나면 결과가 set되는 concurrent.futures.Future 반환
+
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.sent = 0
+        self.opened = 0
+        self.connections = set()
+        self._stream = []
+        self._faults = []
+        self._subscribers = {channel: dict() for channel in CHANNELS}
+        self._subscribed = threading.Condition()
+        self._loop = None
+        self._stopped = None
+        self._thread = None
+        self._stall_until = 0
+
+    def start(self):
+        ready = threading.Event()
+        self._thread = threading.Thread(
+            target=lambda: asyncio.run(self._serve(ready)), name="replay-server", daemon=True
+        )
+        self._thread.start()
+        ready.wait()
+        return self
+
+    async def _serve(self, ready):
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        application = tornado.web.Application(
+            [(r"/(%s)(/.*)?" % "|".join(CHANNELS), _ReplayHandler, dict(server=self))]
+        )
+        sockets = tornado.netutil.bind_sockets(self.port, self.host)
+        self.port = sockets[0].getsockname()[1]
+        http_server = tornado.httpserver.HTTPServer(application)
+        http_server.add_sockets(sockets)
+        ready.set()
+        await self._stopped.wait()
+        http_server.stop()
+        for handler in list(self.connections):
+            handler.close()
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+            self._thread.join(5)
+
+    def url(self, channel: str):
+        return f"ws://{self.host}:{self.port}/{channel}/ws"
+
+    def load(self, stream):
+        """
+        stream : (ms 시각, channel, message) iterable ( capture_stream, synthetic_stream )
+        """
+        self._stream = []
+        for stream_time, channel, message in stream:
+            key = stream_key(channel, message)
+            if key is not None:
+                self._stream.append((stream_time, channel, key, message))
+        return len(self._stream)
+
+    def disconnect_at(self, stream_time: int, channel: str = None):
+        self._faults.append((stream_time, "disconnect", channel, None))
+        self._faults.sort(key=lambda fault: fault[0])
+
+    def stall_at(self, stream_time: int, seconds: float, channel: str = None):
+        self._faults.append((stream_time, "stall", channel, seconds))
+        self._faults.sort(key=lambda fault: fault[0])
+
+    def disconnect(self, channel: str = None):
+        # drop the tcp connection without a close frame, like a network failure
+        self._loop.call_soon_threadsafe(self._disconnect, channel)
+
+    def stall(self, seconds: float):
+        self._loop.call_soon_threadsafe(self._stall, seconds)
+
+    def wait_for_subscriptions(self, n: int, timeout: float = None):
+        with self._subscribed:
+            return self._subscribed.wait_for(lambda: self._subscription_count() >= n, timeout)
+
+    def play(self, speed: float = 1.0):
+        """
+        speed : stream 시간 대비 재생 배속, None이면 기다리지 않고 최대 속도로 전송
+        return : 재생이 끝나면 보낸 message 수가 set되는 Future
+        """
+        return asyncio.run_coroutine_threadsafe(self._play(speed), self._loop)
+
+    def _subscription_count(self):
+        return sum(len(handlers) for subscribers in self._subscribers.values() for handlers in subscribers.values())
+
+    def _on_open(self, handler):
+        self.connections.add(handler)
+        self.opened += 1
+
+    def _on_close(self, handler):
+        self.connections.discard(handler)
+        for key in handler.keys:
+            self._subscribers[handler.channel][key].discard(handler)
+        handler.keys.clear()
+
+    def _on_subscribe(self, handler, message):
+        keys, response = subscription_keys(handler.channel, message)
+        subscribers = self._subscribers[handler.channel]
+        with self._subscribed:
+            for key in keys:
+                subscribers.setdefault(key, set()).add(handler)
+                handler.keys.add(key)
+            self._subscribed.notify_all()
+        if response is not None:
+            handler.write_message(response)
+
+    def _disconnect(self, channel):
+        for handler in list(self.connections):
+            if channel is None or handler.channel == channel:
+                handler.ws_connection.stream.close()
+
+    def _stall(self, seconds):
+        self._stall_until = max(self._stall_until, self._loop.time() + seconds)
+
+    async def _play(self, speed):
+        faults = list(self._faults)
+        start_time = self._stream[0][0] if self._stream else 0
+        start_wall = self._loop.time()
+        sent = 0
+        for i, (stream_time, channel, key, message) in enumerate(self._stream):
+            while faults and faults[0][0] <= stream_time:
+                _, kind, fault_channel, seconds = faults.pop(0)
+                if kind == "disconnect":
+                    self._disconnect(fault_channel)
+                else:
+                    self._stall(seconds)
+            if self._stall_until > self._loop.time():
+                stall = self._stall_until - self._loop.time()
+                await asyncio.sleep(stall)
+                # the stream resumes where it stopped instead of catching up
+                start_wall += stall
+            if speed:
+                delay = start_wall + (stream_time - start_time) / 1000 / speed - self._loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif i % 1000 == 0:
+                await asyncio.sleep(0)
+            handlers = self._subscribers[channel].get(key)
+            if handlers:
+                binary = isinstance(message, bytes)
+                for handler in list(handlers):
+                    try:
+                        handler.write_message(message, binary=binary)
+                        sent += 1
+                    except tornado.websocket.WebSocketClosedError:
+                        pass
+        self.sent += sent
+        return sent
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay captured market data as a local Upbit / Binance websocket")
+    parser.add_argument("capture_path")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--speed", type=float, default=1.0, help="0 : as fast as possible")
+    parser.add_argument("--subscriptions", type=int, default=1, help="subscription keys to wait for before playing")
+    args = parser.parse_args()
+
+    server = ReplayServer(port=args.port).start()
+    print(f"{server.load(capture_stream(args.capture_path))} messages loaded")
+    for channel in CHANNELS:
+        print(f"{channel} : {server.url(channel)}")
+    server.wait_for_subscriptions(args.subscriptions)
+    print(f"{server.play(args.speed or None).result()} messages sent")
+    server.stop()
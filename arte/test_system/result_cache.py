@@ -0,0 +1,138 @@
+import os
+import json
+import pickle
+import hashlib
+import inspect
+import tempfile
+
+import pandas as pd
+
+from arte.system.utils import warmup_start_date
+
+RESULT_CACHE_VERSION = 2
+
+
+def content_hash(obj):
+    # sha1 of the canonical json of obj, values json cannot handle are hashed by their str
+    return hashlib.sha1(json.dumps(obj, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def strategy_code_version(main_loop):
+    # explicit main_loop.version if given, else the hash of the source code of the main loop class
+    # only that class is hashed, bump main_loop.version when strategy / indicator modules it calls are changed
+    version = getattr(main_loop, "version", None)
+    if version is not None:
+        return str(version)
+    try:
+        return content_hash(inspect.getsource(type(main_loop)))
+    except (OSError, TypeError):
+        return type(main_loop).__qualname__
+
+
+def strategy_state(main_loop):
+    # instance attributes of the main loop ( constructor arguments etc. ), hashed into the run_key
+    # values json can not handle are hashed by their str, an object whose str has its address is never reused
+    return vars(main_loop) if hasattr(main_loop, "__dict__") else None
+
+
+class BacktestResultCache:
+    """
+    Class BacktestResultCache
+        BatchBacktester가 (symbol, date chunk) task 별로 계산한 record를 content hash로 저장하는 cache 모듈
+        run_key : strategy 이름, 코드 version, main loop의 instance 상태, parameter, market, symbol의 hash
+            코드 version은 main_loop.version 또는 main loop class의 source hash 이므로,
+            main loop가 사용하는 strategy, indicator 코드를 수정하면 main_loop.version을 올려야 이전 결과를 읽지 않음
+        chunk fingerprint : warm-up을 포함한 chunk 기간 각 일자의 trade data 파일 mtime, size의 hash
+        cache_path/{run_key}/{start_date}_{end_date}_{fingerprint}.pkl 에 task의 반환값을 그대로 저장함.
+        같은 run_key로 다시 실행하면 fingerprint가 같은 chunk는 읽기만 하고, 기간이 늘어난 경우 새 일자만 다시 계산하면 됨.
+
+    Attributes:
+        cache_path : cache 파일들이 저장되는 base 경로
+
+    Functions:
+        __init__ : Class 선언 시 cache_path 입력 필요
+        run_key : strategy, main loop 상태, parameter, market, symbol로 run_key를 계산
+        chunk_fingerprint : chunk 기간 일자 별 fingerprint로 chunk fingerprint를 계산
+        find_chunks : 주어진 일자 별 fingerprint와 일치하는 cache된 chunk의 list를 반환
+        load : cache된 chunk의 record를 반환
+        save : task의 record를 저장
+
+    """
+
+    def __init__(self, cache_path: str):
+        self.cache_path = cache_path
+
+    @staticmethod
+    def run_key(strategy_name: str, code_version: str, params, markets: list, symbol: str, state=None):
+        return content_hash(
+            {
+                "version": RESULT_CACHE_VERSION,
+                "strategy_name": strategy_name,
+                "code_version": code_version,
+                "state": state,
+                "params": params,
+                "markets": sorted(markets),
+                "symbol": symbol,
+            }
+        )
+
+    @staticmethod
+    def chunk_fingerprint(interval: list, date_fingerprints: dict, warmup_days: int = 0):
+        """
+        interval 기간의 모든 일자가 date_fingerprints에 있으면 chunk fingerprint를, 하나라도 없으면 None을 반환
+        warmup_days : interval 앞에서 실제로 warm-up에 사용되는 일자들도 fingerprint에 포함
+        """
+        start_date = warmup_start_date(interval[0], date_fingerprints, warmup_days)
+        dates = [dt.strftime("%Y-%m-%d") for dt in pd.date_range(start=start_date, end=interval[1], freq="D")]
+        if any(date not in date_fingerprints for date in dates):
+            return None
+        return content_hash([[date, date_fingerprints[date]] for date in dates])[:16]
+
+    def _entry_path(self, run_key: str, interval: list, fingerprint: str):
+        return os.path.join(self.cache_path, run_key, f"{interval[0]}_{interval[1]}_{fingerprint}.pkl")
+
+    def find_chunks(self, run_key: str, date_fingerprints: dict, warmup_days: int = 0):
+        """
+        run_key로 저장된 chunk 중 기간 전체의 fingerprint가 date_fingerprints와 일치하는 chunk를
+        서로 겹치지 않게 골라 [interval, fingerprint] list로 반환 ( 같은 시작 일자면 긴 chunk 우선 )
+        """
+        run_path = os.path.join(self.cache_path, run_key)
+        if not os.path.isdir(run_path):
+            return []
+
+        candidates = []
+        for fname in os.listdir(run_path):
+            if not fname.endswith(".pkl"):
+                continue
+            start_date, end_date, fingerprint = fname[:-4].split("_")
+            if self.chunk_fingerprint([start_date, end_date], date_fingerprints, warmup_days) == fingerprint:
+                candidates.append(([start_date, end_date], fingerprint))
+        candidates.sort(key=lambda chunk: (chunk[0][0], -pd.Timestamp(chunk[0][1]).value))
+
+        chunks = []
+        for interval, fingerprint in candidates:
+            if chunks and interval[0] <= chunks[-1][0][1]:
+                continue
+            chunks.append((interval, fingerprint))
+        return chunks
+
+    def load(self, run_key: str, interval: list, fingerprint: str):
+        with open(self._entry_path(run_key, interval, fingerprint), "rb") as f:
+            return pickle.load(f)
+
+    def save(self, run_key: str, interval: list, fingerprint: str, record):
+        """
+        record를 pickle로 저장, 임시 파일에 쓴 후 교체하여 중간에 실패해도 깨진 cache가 남지 않음
+        """
+        entry_path = self._entry_path(run_key, interval, fingerprint)
+        parent_path = os.path.dirname(entry_path)
+        os.makedirs(parent_path, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=parent_path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, entry_path)
+        except:
+            os.remove(temp_path)
+            raise
@@ -0,0 +1,206 @@
+"""
+benchmark, test를 위한 synthetic trade, orderbook data를 생성합니다.
+"""
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from arte.data.trade_resampler import ONE_DAY_MS
+from arte.system.trading_rules import TRADING_RULES
+
+ONE_SECOND_MS = 1000
+MARKETS = ("upbit", "binance_spot")
+
+
+def upbit_tick_sizes(prices):
+    # upbit KRW market tick size of each price
+    return TRADING_RULES.get("upbit").tick_sizes_of(prices)
+
+
+def binance_tick_sizes(prices):
+    # roughly 6 significant digits like most of the binance spot USDT markets
+    return 10.0 ** (np.floor(np.log10(prices)) - 5)
+
+
+class SyntheticMarket:
+    """
+    Class SyntheticMarket
+        seed로 결정되는 synthetic trade, orderbook data를 TestDataLoader의 root_data_path 형식으로 저장하는 모듈
+        symbol 별 초 단위 mid price random walk를 binance ( USDT ) 가격으로 사용하고,
+        upbit ( KRW ) 가격은 여기에 환율과 premium을 곱해 tick size에 맞춤.
+        각 trade는 ask_bid에 따라 best ask ( BID ) 또는 best bid ( ASK ) 가격으로 체결됨.
+
+        root_data_path/
+            {market}/{SYMBOL}/{SYMBOL}-YYYY-MM-DD.csv : timestamp, price, quantity, ( upbit만 ask_bid )
+            {market}_orderbook/{SYMBOL}/{SYMBOL}-YYYY-MM-DD.csv : orderbook_interval 마다의 snapshot
+                timestamp, ask_price_0, ask_size_0, bid_price_0, bid_size_0, ... ( 0이 최우선 호가 )
+            market_index.csv : 일자 별 USDT/KOR 환율
+        일자, symbol 별로 독립적인 random stream을 사용하므로 기간 일부만 다시 생성해도 같은 파일이 만들어짐.
+
+    Attributes:
+        root_data_path : data를 저장할 base 경로
+        symbols : 생성할 pure symbol의 list
+        seed : random seed
+        trades_per_day : market, symbol, 일자 별 trade 수
+        start_prices : symbol 별 binance 기준 시작 가격, 입력하지 않은 symbol은 seed와 symbol 이름으로 결정
+        daily_volatility : 하루 log return의 표준편차
+        exchange_rate : USDT/KOR 환율의 기준값
+        premium : binance 대비 upbit 가격의 premium 비율
+        orderbook_interval : orderbook snapshot 간격, ms 단위
+        orderbook_depth : snapshot 별 ask, bid 호가 수
+
+    Functions:
+        __init__ : Class 선언 시 root_data_path, symbols 입력 필요
+        generate : start_date ~ end_date 기간의 trade, orderbook, market_index.csv를 저장하고 생성한 row 수를 반환
+        mid_prices : 특정 symbol, 일자의 초 단위 binance 기준 mid price array를 반환
+        trade_frame : 특정 market, symbol, 일자의 trade Dataframe을 반환
+        orderbook_frame : 특정 market, symbol, 일자의 orderbook snapshot Dataframe을 반환
+
+    """
+
+    def __init__(
+        self,
+        root_data_path: str,
+        symbols: list,
+        seed: int = 0,
+        trades_per_day: int = 20000,
+        start_prices: dict = None,
+        daily_volatility: float = 0.03,
+        exchange_rate: float = 1180.0,
+        premium: float = 0.02,
+        orderbook_interval: int = ONE_SECOND_MS,
+        orderbook_depth: int = 5,
+    ):
+        self.root_data_path = root_data_path
+        self.symbols = [symbol.upper() for symbol in symbols]
+        self.seed = seed
+        self.trades_per_day = trades_per_day
+        self.start_prices = {symbol: self._default_start_price(symbol) for symbol in self.symbols}
+        self.start_prices.update({symbol.upper(): price for symbol, price in (start_prices or dict()).items()})
+        self.daily_volatility = daily_volatility
+        self.exchange_rate = exchange_rate
+        self.premium = premium
+        self.orderbook_interval = orderbook_interval
+        self.orderbook_depth = orderbook_depth
+
+    def _rng(self, *keys):
+        # independent random stream of (seed, keys), keys are str
+        return np.random.default_rng([self.seed] + [zlib.crc32(str(key).encode()) for key in keys])
+
+    def _default_start_price(self, symbol: str):
+        # 1 ~ 100000 USDT
+        return float(10 ** self._rng("start_price", symbol).uniform(0, 5))
+
+    def mid_prices(self, symbol: str, date_str: str):
+        """
+        date_str 일자의 0초부터 86400초까지 ( 86401개 ) 초 단위 binance 기준 mid price
+        """
+        rng = self._rng("mid", symbol, date_str)
+        n_seconds = ONE_DAY_MS // ONE_SECOND_MS
+        day_open = self.start_prices[symbol] * np.exp(rng.normal(0, self.daily_volatility))
+        log_returns = rng.normal(0, self.daily_volatility / np.sqrt(n_seconds), n_seconds)
+        return day_open * np.exp(np.r_[0, np.cumsum(log_returns)])
+
+    def _quote_rate(self, market: str, date_str: str):
+        # USDT to the quote currency of the market
+        return self._daily_exchange_rate(date_str) if market == "upbit" else 1.0
+
+    def _market_mid_prices(self, market: str, symbol: str, date_str: str):
+        mid_prices = self.mid_prices(symbol, date_str)
+        if market == "upbit":
+            mid_prices = mid_prices * self._quote_rate(market, date_str) * (1 + self.premium)
+        return mid_prices
+
+    def _tick_sizes(self, market: str, prices):
+        return upbit_tick_sizes(prices) if market == "upbit" else binance_tick_sizes(prices)
+
+    def _best_quotes(self, market: str, mid_prices):
+        # best bid is the tick at or below the mid, best ask is one tick above the best bid
+        tick_sizes = self._tick_sizes(market, mid_prices)
+        best_bids = np.floor(mid_prices / tick_sizes) * tick_sizes
+        return best_bids, best_bids + tick_sizes, tick_sizes
+
+    def _daily_exchange_rate(self, date_str: str):
+        return round(float(self.exchange_rate * (1 + self._rng("exchange_rate", date_str).normal(0, 0.003))), 1)
+
+    def trade_frame(self, market: str, symbol: str, date_str: str):
+        rng = self._rng("trade", market, symbol, date_str)
+        day_start = pd.Timestamp(date_str).value // 1_000_000
+        timestamps = np.sort(rng.integers(day_start, day_start + ONE_DAY_MS, self.trades_per_day))
+        best_bids, best_asks, _ = self._best_quotes(
+            market, self._market_mid_prices(market, symbol, date_str)[(timestamps - day_start) // ONE_SECOND_MS]
+        )
+
+        # BID : buyer took the best ask, ASK : seller took the best bid
+        is_bid = rng.random(self.trades_per_day) < 0.5
+        prices = np.where(is_bid, best_asks, best_bids)
+        notionals = rng.lognormal(np.log(100), 1.0, self.trades_per_day) * self._quote_rate(market, date_str)
+        trade_df = pd.DataFrame(
+            {"timestamp": timestamps, "price": prices.round(8), "quantity": (notionals / prices).round(8)}
+        )
+        if market == "upbit":
+            trade_df["ask_bid"] = np.where(is_bid, "BID", "ASK")
+        return trade_df
+
+    def orderbook_frame(self, market: str, symbol: str, date_str: str):
+        rng = self._rng("orderbook", market, symbol, date_str)
+        day_start = pd.Timestamp(date_str).value // 1_000_000
+        snapshot_offsets = np.arange(0, ONE_DAY_MS, self.orderbook_interval)
+        best_bids, best_asks, tick_sizes = self._best_quotes(
+            market, self._market_mid_prices(market, symbol, date_str)[snapshot_offsets // ONE_SECOND_MS]
+        )
+
+        quote_rate = self._quote_rate(market, date_str)
+        orderbook = {"timestamp": day_start + snapshot_offsets}
+        n_snapshots = len(snapshot_offsets)
+        for level in range(self.orderbook_depth):
+            # deeper levels hold more quantity
+            ask_notionals = rng.lognormal(np.log(1000 * (level + 1)), 0.8, n_snapshots) * quote_rate
+            bid_notionals = rng.lognormal(np.log(1000 * (level + 1)), 0.8, n_snapshots) * quote_rate
+            ask_prices = best_asks + level * tick_sizes
+            bid_prices = best_bids - level * tick_sizes
+            orderbook[f"ask_price_{level}"] = ask_prices.round(8)
+            orderbook[f"ask_size_{level}"] = (ask_notionals / ask_prices).round(8)
+            orderbook[f"bid_price_{level}"] = bid_prices.round(8)
+            orderbook[f"bid_size_{level}"] = (bid_notionals / bid_prices).round(8)
+        return pd.DataFrame(orderbook)
+
+    def _data_path(self, market: str, symbol: str, date_str: str):
+        return os.path.join(self.root_data_path, market, symbol, f"{symbol}-{date_str}.csv")
+
+    def generate(
+        self, start_date: str, end_date: str, markets: list = MARKETS, with_orderbook: bool = True, overwrite=False
+    ):
+        """
+        start_date ~ end_date 기간의 data를 저장, 이미 있는 파일은 overwrite=True일 때만 다시 생성
+        {"trades": 생성한 trade 수, "orderbooks": 생성한 snapshot 수} 를 반환
+        """
+        dates = [dt.strftime("%Y-%m-%d") for dt in pd.date_range(start=start_date, end=end_date, freq="D")]
+        counts = {"trades": 0, "orderbooks": 0}
+        for market in markets:
+            for symbol in self.symbols:
+                for date_str in dates:
+                    targets = [(market, self.trade_frame, "trades")]
+                    if with_orderbook:
+                        targets.append((f"{market}_orderbook", self.orderbook_frame, "orderbooks"))
+                    for market_path, make_frame, count_key in targets:
+                        fpath = self._data_path(market_path, symbol, date_str)
+                        if os.path.exists(fpath) and not overwrite:
+                            continue
+                        os.makedirs(os.path.dirname(fpath), exist_ok=True)
+                        data_df = make_frame(market, symbol, date_str)
+                        data_df.to_csv(fpath, index=False)
+                        counts[count_key] += len(data_df)
+
+        # market_index.csv covers the day before start_date for the as-of lookup of the first day
+        index_dates = [(pd.Timestamp(start_date) - pd.Timedelta(days=1)).strftime("%Y-%m-%d")] + dates
+        index_path = os.path.join(self.root_data_path, "market_index.csv")
+        index_df = pd.DataFrame(
+            {"value": [self._daily_exchange_rate(date_str) for date_str in index_dates]}, index=index_dates
+        )
+        if os.path.exists(index_path) and not overwrite:
+            index_df = pd.read_csv(index_path, index_col=0).combine_first(index_df)
+        index_df.to_csv(index_path)
+        return counts
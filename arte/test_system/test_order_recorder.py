@@ -72,25 +72,25 @@ class TestOrderRecorder:
             order_dict["commissionAmount"] = order.fee
 
         # calc PNL and Profit
-        self.test_realized_pnl.proceeding(order, order_dict["commissionAmount"])
+        position = self.test_realized_pnl.proceeding(order, order_dict["commissionAmount"])
 
         # USDT qunatity calc
-        order_dict["USDT_Qty"] = round(self.test_realized_pnl.pnl_dict[order.symbol]["USDT_Qty"], 4)
+        order_dict["USDT_Qty"] = round(position.USDT_Qty, 4)
 
         # PNL calc
-        order_dict["realized_pnl"] = round(self.test_realized_pnl.pnl_dict[order.symbol]["realized_pnl"], 8)
-        order_dict["total_realized_pnl"] = round(self.test_realized_pnl.pnl_dict[order.symbol]["total_realized_pnl"], 8)
-        order_dict["ROE_pnl"] = round(self.test_realized_pnl.pnl_dict[order.symbol]["realized_pnl_rate"] * 100, 8)
-        order_dict["win_rate_pnl"] = round(self.test_realized_pnl.pnl_dict[order.symbol]["winrate_pnl"], 8)
+        order_dict["realized_pnl"] = round(position.realized_pnl, 8)
+        order_dict["total_realized_pnl"] = round(position.total_realized_pnl, 8)
+        order_dict["ROE_pnl"] = round(position.realized_pnl_rate * 100, 8)
+        order_dict["win_rate_pnl"] = round(position.winrate_pnl, 8)
 
         # Profit calc incl commission
-        order_dict["real_profit"] = round(self.test_realized_pnl.pnl_dict[order.symbol]["real_profit"], 8)
-        order_dict["total_real_profit"] = round(self.test_realized_pnl.pnl_dict[order.symbol]["total_real_profit"], 8)
-        order_dict["ROE_profit"] = round(self.test_realized_pnl.pnl_dict[order.symbol]["real_profit_rate"] * 100, 8)
-        order_dict["win_rate_profit"] = round(self.test_realized_pnl.pnl_dict[order.symbol]["winrate_profit"], 8)
+        order_dict["real_profit"] = round(position.real_profit, 8)
+        order_dict["total_real_profit"] = round(position.total_real_profit, 8)
+        order_dict["ROE_profit"] = round(position.real_profit_rate * 100, 8)
+        order_dict["win_rate_profit"] = round(position.winrate_profit, 8)
 
         # reset if all sold
-        if self.test_realized_pnl.pnl_dict[order.symbol]["quantity"] == 0:
+        if position.quantity == 0:
             self.test_realized_pnl.close_position(order.symbol)
 
         # test current time
@@ -1,13 +1,10 @@
 """
 Upbit
 """
-import sys
 from functools import wraps
-from decimal import Decimal, getcontext
-
-getcontext().prec = 6
 
 from binance_f.model.constant import *
+from arte.system.trading_rules import TRADING_RULES
 from .test_account import Account
 from .test_order_handler import OrderHandler
 from arte.test_system.bt_order_recorder import BackTestOrderRecorder
@@ -17,6 +14,8 @@ def _process_order(method):
     @wraps(method)
     def _impl(self, **kwargs):
         # print(kwargs)
+        if self.clock is not None:
+            self.test_current_time = self.clock.now()
         kwargs["symbol"] = kwargs["symbol"].upper()
         if kwargs["symbol"] not in self.symbols_state:
             self.symbols_state[kwargs["symbol"]] = self._init_symbol_state()
@@ -42,6 +41,14 @@ class BackTestUpbitTradeManager:
             self.bot = kwargs["bot"]
         if "max_order_count" in kwargs:
             self.max_order_count = kwargs["max_order_count"]
+        # FillSimulator, symbols with orderbook depth are filled by walking the depth instead of the last price
+        self.fill_simulator = None
+        if "fill_simulator" in kwargs:
+            self.fill_simulator = kwargs["fill_simulator"]
+        # SimulatedClock, orders are stamped with the replay time instead of the last update time
+        self.clock = None
+        if "clock" in kwargs:
+            self.clock = kwargs["clock"]
 
         # state manage
         self.symbols_state = dict()
@@ -50,24 +57,7 @@ class BackTestUpbitTradeManager:
         return dict(order_count=0, positionSize=0, positionSide=PositionSide.INVALID)
 
     def calc_market_order_price(self, last_price, last_askbid, buy_or_sell):
-        if last_price < 10:
-            tick_size = 0.01
-        elif last_price < 100:
-            tick_size = 0.1
-        elif last_price < 1000:
-            tick_size = 1
-        elif last_price < 10000:
-            tick_size = 5
-        elif last_price < 100000:
-            tick_size = 10
-        elif last_price < 500000:
-            tick_size = 50
-        elif last_price < 1000000:
-            tick_size = 100
-        elif last_price < 2000000:
-            tick_size = 500
-        else:
-            tick_size = 1000
+        tick_size = TRADING_RULES.get("upbit").tick_size(last_price)
 
         if buy_or_sell == "BUY":
             if last_askbid == "ASK":
@@ -82,9 +72,32 @@ class BackTestUpbitTradeManager:
 
         return trade_price
 
+    def _uses_depth(self, symbol):
+        return self.fill_simulator is not None and self.fill_simulator.has_depth(symbol[4:])
+
+    def _depth_open(self, symbol, krw, ratio):
+        # VWAP and KRW of the depth fill of a buy, the KRW is less than asked for a partial fill
+        if ratio:
+            krw = self.account["KRW"] * ratio
+        fill = self.fill_simulator.fill(symbol[4:], self.test_current_time, OrderSide.BUY, notional=krw)
+        return (fill.avg_price, fill.notional) if fill else (None, None)
+
+    def _depth_close(self, symbol, ratio):
+        # VWAP and ratio of the depth fill of a sell, the ratio is the filled share of the position for a partial fill
+        held = self.account.ledger.to_float(self.account.ledger.balance(symbol))
+        fill = self.fill_simulator.fill(symbol[4:], self.test_current_time, OrderSide.SELL, quantity=held * ratio)
+        if fill is None:
+            return None, None
+        return fill.avg_price, fill.quantity / held if fill.is_partial else ratio
+
     @_process_order
     def buy_long_market(self, symbol, krw=None, ratio=None):
         if self.symbols_state[symbol]["order_count"] < self.max_order_count:
+            if self._uses_depth(symbol):
+                market_trade_price, krw = self._depth_open(symbol, krw, ratio)
+                if market_trade_price is None:
+                    return None
+                return self.order_handler.open_long_market(symbol=symbol, price=market_trade_price, krw=krw)
             market_trade_price = self.calc_market_order_price(
                 last_price=self.trade_prices[symbol[4:]], last_askbid=self.last_askbid[symbol[4:]], buy_or_sell="BUY"
             )
@@ -92,6 +105,11 @@ class BackTestUpbitTradeManager:
 
     @_process_order
     def sell_long_market(self, symbol, ratio):
+        if self._uses_depth(symbol):
+            market_trade_price, ratio = self._depth_close(symbol, ratio)
+            if market_trade_price is None:
+                return None
+            return self.order_handler.close_long_market(symbol=symbol, price=market_trade_price, ratio=ratio)
         market_trade_price = self.calc_market_order_price(
             last_price=self.trade_prices[symbol[4:]], last_askbid=self.last_askbid[symbol[4:]], buy_or_sell="SELL"
         )
@@ -101,16 +119,12 @@ class BackTestUpbitTradeManager:
         symbol = order.symbol
         if order.side == OrderSide.BUY:
             self.symbols_state[symbol]["order_count"] += 1
-            self.symbols_state[symbol]["positionSize"] = float(
-                Decimal(self.symbols_state[symbol]["positionSize"] + order.origQty)
-            )
+            self.symbols_state[symbol]["positionSize"] = self.account[symbol]
             self.symbols_state[symbol]["positionSide"] = order.positionSide
 
         elif order.side == OrderSide.SELL:
-            self.symbols_state[symbol]["positionSize"] = float(
-                Decimal(self.symbols_state[symbol]["positionSize"] - order.origQty)
-            )
-            if self.symbols_state[symbol]["positionSize"] < sys.float_info.epsilon:
+            self.symbols_state[symbol]["positionSize"] = self.account[symbol]
+            if self.symbols_state[symbol]["positionSize"] == 0:
                 self.symbols_state[symbol] = self._init_symbol_state()
 
         self._process_order_record(order)
@@ -1,22 +1,21 @@
 """
 Upbit
 """
-import sys
 from functools import wraps
-from decimal import Decimal, getcontext
-
-getcontext().prec = 6
 
 from binance_f.model.constant import *
 from .test_account import Account
 from .test_order_handler import OrderHandler
 from arte.test_system.test_order_recorder import TestOrderRecorder
+from arte.test_system.fill_simulator import walk_levels
 
 
 def _process_order(method):
     @wraps(method)
     def _impl(self, **kwargs):
         print(kwargs)
+        if self.clock is not None:
+            self.test_current_time = self.clock.now()
         kwargs["symbol"] = kwargs["symbol"].upper()
         if kwargs["symbol"] not in self.symbols_state:
             self.symbols_state[kwargs["symbol"]] = self._init_symbol_state()
@@ -47,6 +46,10 @@ class RTTUpbitTradeManager:
             self.bot = kwargs["bot"]
         if "max_order_count" in kwargs:
             self.max_order_count = kwargs["max_order_count"]
+        # SimulatedClock, orders are stamped with the replay time instead of the last update time
+        self.clock = None
+        if "clock" in kwargs:
+            self.clock = kwargs["clock"]
 
         # state manage
         self.symbols_state = dict()
@@ -54,47 +57,47 @@ class RTTUpbitTradeManager:
     def _init_symbol_state(self):
         return dict(order_count=0, positionSize=0, positionSide=PositionSide.INVALID)
 
-    def calc_market_order_price_qty(self, symbol, buy_or_sell, krw=None):
+    def calc_market_order_fill(self, symbol, buy_or_sell, krw=None, quantity=None):
+        # walk every orderbook unit, a buy by KRW or a sell by quantity, partially filled if the depth is short
         if buy_or_sell == "BUY":
-            ask_price = self.orderbook[symbol]["ask_list"][0]
-            ask_qty = self.orderbook[symbol]["ask_list"][1]
-            if ask_price * ask_qty >= krw:
-                return ask_price
-            else:
-                return None
+            book = self.orderbook[symbol]
+            return walk_levels(book["ask_prices"], book["ask_sizes"], notional=krw)
         elif buy_or_sell == "SELL":
-            return self.orderbook[symbol]["bid_list"][0]
+            book = self.orderbook[symbol]
+            return walk_levels(book["bid_prices"], book["bid_sizes"], quantity=quantity)
 
     @_process_order
     def buy_long_market(self, symbol, krw=None, ratio=None):
         if self.symbols_state[symbol]["order_count"] < self.max_order_count:
-            market_trade_price = self.calc_market_order_price_qty(symbol=symbol[4:], buy_or_sell="BUY", krw=krw)
-            if market_trade_price:
-                return self.order_handler.open_long_market(
-                    symbol=symbol, price=market_trade_price, krw=krw, ratio=ratio
-                )
+            if ratio:
+                krw = self.account["KRW"] * ratio
+            fill = self.calc_market_order_fill(symbol=symbol[4:], buy_or_sell="BUY", krw=krw)
+            if fill:
+                return self.order_handler.open_long_market(symbol=symbol, price=fill.avg_price, krw=fill.notional)
             else:
                 return None
 
     @_process_order
     def sell_long_market(self, symbol, ratio):
-        market_trade_price = self.calc_market_order_price_qty(symbol=symbol[4:], buy_or_sell="SELL")
-        return self.order_handler.close_long_market(symbol=symbol, price=market_trade_price, ratio=ratio)
+        held = self.account.ledger.to_float(self.account.ledger.balance(symbol))
+        fill = self.calc_market_order_fill(symbol=symbol[4:], buy_or_sell="SELL", quantity=held * ratio)
+        if fill:
+            # a partial fill sells the filled share of the position
+            ratio = fill.quantity / held if fill.is_partial else ratio
+            return self.order_handler.close_long_market(symbol=symbol, price=fill.avg_price, ratio=ratio)
+        else:
+            return None
 
     def _postprocess_order(self, order):
         symbol = order.symbol
         if order.side == OrderSide.BUY:
             self.symbols_state[symbol]["order_count"] += 1
-            self.symbols_state[symbol]["positionSize"] = float(
-                Decimal(self.symbols_state[symbol]["positionSize"] + order.origQty)
-            )
+            self.symbols_state[symbol]["positionSize"] = self.account[symbol]
             self.symbols_state[symbol]["positionSide"] = order.positionSide
 
         elif order.side == OrderSide.SELL:
-            self.symbols_state[symbol]["positionSize"] = float(
-                Decimal(self.symbols_state[symbol]["positionSize"] - order.origQty)
-            )
-            if self.symbols_state[symbol]["positionSize"] < sys.float_info.epsilon:
+            self.symbols_state[symbol]["positionSize"] = self.account[symbol]
+            if self.symbols_state[symbol]["positionSize"] == 0:
                 self.symbols_state[symbol] = self._init_symbol_state()
 
         self._process_order_record(order)
@@ -119,6 +122,10 @@ if __name__ == "__main__":
         "bid_list": [99, 1],
         "total_ask_size": 100,
         "total_bid_size": 100,
+        "ask_prices": [101, 102, 103],
+        "ask_sizes": [500, 500, 500],
+        "bid_prices": [99, 98, 97],
+        "bid_sizes": [500, 500, 500],
     }
     tm.update(test_current_time=0, orderbook=orderbook)
     tm.buy_long_market(symbol=symbol, krw=100000)
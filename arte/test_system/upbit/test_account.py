@@ -1,41 +1,38 @@
 """
 Upbit
 """
-from decimal import Decimal
+from arte.test_system.fixed_point_ledger import FixedPointLedger, VENUE_DECIMALS
 
 
 class Account:
     def __init__(self, init_balance=100000):
-        self.assets = dict()
+        self.ledger = FixedPointLedger(VENUE_DECIMALS["upbit"])
         self._initialize_position("KRW", init_val=init_balance)
 
+    @property
+    def assets(self):
+        return {symbol: self.ledger.to_float(units) for symbol, units in self.ledger.balances.items()}
+
     def __getitem__(self, symbol):
-        return self.assets[symbol]
+        return self.ledger.to_float(self.ledger.balances[symbol])
 
     def __repr__(self):
         return str(self.assets)
 
     def _initialize_position(self, symbol, init_val=0):
-        self.assets[symbol] = Decimal(init_val)
+        self.ledger.balances[symbol] = self.ledger.to_units(init_val)
 
     def deposit(self, symbol, quantity):
-        if symbol not in self.assets.keys():
-            self._initialize_position(symbol)
-        self.assets[symbol] += quantity
+        self.ledger.deposit(symbol, self.ledger.to_units(quantity))
 
     def withdraw(self, symbol, quantity):
-        if self.has_asset(symbol, quantity):
-            self.assets[symbol] -= quantity
+        self.ledger.withdraw(symbol, self.ledger.to_units(quantity))
 
     def has_asset(self, symbol, quantity):
-        if symbol not in self.assets.keys():
-            return False
-        else:
-            return False if self.assets[symbol] < quantity else True
+        return self.ledger.has_asset(symbol, self.ledger.to_units(quantity))
 
 
 if __name__ == "__main__":
     acc = Account(init_balance=100000)
-    acc.deposit(symbol="KRW-BTC", quantity=Decimal("1.0"))
+    acc.deposit(symbol="KRW-BTC", quantity=1.0)
     print(acc)
-
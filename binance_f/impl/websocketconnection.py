@@ -67,7 +67,7 @@ def websocket_func(*args):
 
 
 class WebsocketConnection:
-    def __init__(self, api_key, secret_key, uri, watch_dog, request, is_upbit=False):
+    def __init__(self, api_key, secret_key, uri, watch_dog, request, is_upbit=False, capture=None, channel=None):
         self.__thread = None
         self.url = uri
         self.__api_key = api_key
@@ -84,6 +84,10 @@ class WebsocketConnection:
         connection_id += 1
         self.id = connection_id
         self.is_upbit = is_upbit
+        # optional raw market data tap ( ex : arte MarketDataCapture ), only a queue push on the receive thread
+        # user data streams carry account information and are never captured
+        self.capture = None if self.is_user_data_stream else capture
+        self.channel = channel
 
     def in_delay_connection(self):
         return self.delay_in_second != -1
@@ -148,6 +152,11 @@ class WebsocketConnection:
     def on_message(self, message):
 
         self.last_receive_time = get_current_timestamp()
+        if self.capture is not None:
+            self.capture.put((self.channel, self.last_receive_time, message))
+
+        if self.request.dict_parser is not None and self.__on_receive_dict(message):
+            return
 
         if not self.is_upbit:
             json_wrapper = parse_json_from_string(message)
@@ -171,6 +180,43 @@ class WebsocketConnection:
             except:
                 self.on_error("error in json_parser")
 
+    def __on_receive_dict(self, message):
+        try:
+            data = fast_loads(message)
+        except Exception:
+            return False
+        return self.on_dict(data)
+
+    def on_dict(self, data):
+        # fast path for decoded market data events, False falls back to the JsonWrapper path
+        # ( responses, errors and anything the dict parser can not build, which then reports the error )
+        # also called directly by the replay client, which decodes each message only once
+        if self.request.dict_parser is None:
+            return False
+        try:
+            if not isinstance(data, dict) or "result" in data or "status" in data or "err-code" in data:
+                return False
+            res = self.request.dict_parser(data)
+        except Exception:
+            return False
+
+        if self.is_upbit:
+            try:
+                self.request.update_callback(res)
+            except:
+                self.on_error("error in json_parser")
+            return True
+
+        try:
+            if self.request.update_callback is not None:
+                self.request.update_callback(SubscribeMessageType.PAYLOAD, res)
+        except Exception as e:
+            self.on_error("Process error: " + str(e) + " You should capture the exception in your error handler")
+
+        if self.request.auto_close:
+            self.close()
+        return True
+
     def __on_receive_response(self, json_wrapper):
         res = None
         try:
@@ -5,5 +5,6 @@ class WebsocketRequest(object):
         self.is_trading = False
         self.error_handler = None
         self.json_parser = None
+        self.dict_parser = None  # optional fast path, builds the event from the decoded dict without JsonWrapper
         self.update_callback = None
         self.is_user_data_stream = False
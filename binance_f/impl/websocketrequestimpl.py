@@ -32,6 +32,7 @@ class WebsocketRequestImpl(object):
         request = WebsocketRequest()
         request.subscription_handler = subscription_handler
         request.json_parser = json_parse
+        request.dict_parser = AggregateTradeEvent.from_dict
         request.update_callback = callback
         request.error_handler = error_handler
 
@@ -52,6 +53,7 @@ class WebsocketRequestImpl(object):
         request = WebsocketRequest()
         request.subscription_handler = subscription_handler
         request.json_parser = json_parse
+        request.dict_parser = AggregateTradeEvent.from_dict
         request.update_callback = callback
         request.error_handler = error_handler
 
@@ -115,6 +117,7 @@ class WebsocketRequestImpl(object):
         request = WebsocketRequest()
         request.subscription_handler = subscription_handler
         request.json_parser = json_parse
+        request.dict_parser = CandlestickEvent.from_dict
         request.update_callback = callback
         request.error_handler = error_handler
 
@@ -472,6 +475,7 @@ class WebsocketRequestImpl(object):
         request = WebsocketRequest()
         request.subscription_handler = subscription_handler
         request.json_parser = json_parse
+        request.dict_parser = UpbitTicker.from_dict
         request.update_callback = callback
         request.error_handler = error_handler
 
@@ -492,6 +496,7 @@ class WebsocketRequestImpl(object):
         request = WebsocketRequest()
         request.subscription_handler = subscription_handler
         request.json_parser = json_parse
+        request.dict_parser = UpbitTrade.from_dict
         request.update_callback = callback
         request.error_handler = error_handler
 
@@ -512,6 +517,7 @@ class WebsocketRequestImpl(object):
         request = WebsocketRequest()
         request.subscription_handler = subscription_handler
         request.json_parser = json_parse
+        request.dict_parser = UpbitOrderbook.from_dict
         request.update_callback = callback
         request.error_handler = error_handler
 
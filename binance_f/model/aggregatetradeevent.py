@@ -1,4 +1,5 @@
 class AggregateTradeEvent:
+    __slots__ = ["eventType", "eventTime", "symbol", "id", "price", "qty", "firstId", "lastId", "time", "isBuyerMaker"]
 
     def __init__(self):
         self.eventType = ""
@@ -25,4 +26,19 @@ class AggregateTradeEvent:
         result.lastId = json_wrapper.get_int("l")
         result.time = json_wrapper.get_int("T")
         result.isBuyerMaker = json_wrapper.get_boolean("m")
+        return result
+
+    @staticmethod
+    def from_dict(data):
+        result = AggregateTradeEvent()
+        result.eventType = str(data["e"])
+        result.eventTime = int(data["E"])
+        result.symbol = str(data["s"])
+        result.id = int(data["a"])
+        result.price = float(data["p"])
+        result.qty = float(data["q"])
+        result.firstId = int(data["f"])
+        result.lastId = int(data["l"])
+        result.time = int(data["T"])
+        result.isBuyerMaker = bool(data["m"])
         return result
\ No newline at end of file
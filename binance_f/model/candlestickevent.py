@@ -1,4 +1,23 @@
 class Candlestick:
+    __slots__ = [
+        "startTime",
+        "closeTime",
+        "symbol",
+        "interval",
+        "firstTradeId",
+        "lastTradeId",
+        "open",
+        "close",
+        "high",
+        "low",
+        "volume",
+        "numTrades",
+        "isClosed",
+        "quoteAssetVolume",
+        "takerBuyBaseAssetVolume",
+        "takerBuyQuoteAssetVolume",
+        "ignore",
+    ]
 
     def __init__(self):
         self.startTime = 0
@@ -42,8 +61,31 @@ class Candlestick:
   
         return data_obj
 
+    @staticmethod
+    def from_dict(data):
+        data_obj = Candlestick()
+        data_obj.startTime = int(data["t"])
+        data_obj.closeTime = int(data["T"])
+        data_obj.symbol = str(data["s"])
+        data_obj.interval = str(data["i"])
+        data_obj.firstTradeId = int(data["f"])
+        data_obj.lastTradeId = int(data["L"])
+        data_obj.open = float(data["o"])
+        data_obj.close = float(data["c"])
+        data_obj.high = float(data["h"])
+        data_obj.low = float(data["l"])
+        data_obj.volume = float(data["v"])
+        data_obj.numTrades = int(data["n"])
+        data_obj.isClosed = bool(data["x"])
+        data_obj.quoteAssetVolume = float(data["q"])
+        data_obj.takerBuyBaseAssetVolume = float(data["V"])
+        data_obj.takerBuyQuoteAssetVolume = float(data["Q"])
+        data_obj.ignore = int(data["B"])
+        return data_obj
+
 
 class CandlestickEvent:
+    __slots__ = ["eventType", "eventTime", "symbol", "data"]
 
     def __init__(self):
         self.eventType = ""
@@ -61,3 +103,12 @@ class CandlestickEvent:
         candlestick_event.data = data
         return candlestick_event
 
+    @staticmethod
+    def from_dict(data):
+        candlestick_event = CandlestickEvent()
+        candlestick_event.eventType = str(data["e"])
+        candlestick_event.eventTime = int(data["E"])
+        candlestick_event.symbol = str(data["s"])
+        candlestick_event.data = Candlestick.from_dict(data["k"])
+        return candlestick_event
+
@@ -1,4 +1,38 @@
 class OrderUpdate:
+    __slots__ = [
+        "eventType",
+        "eventTime",
+        "transactionTime",
+        "symbol",
+        "clientOrderId",
+        "side",
+        "type",
+        "timeInForce",
+        "origQty",
+        "price",
+        "avgPrice",
+        "stopPrice",
+        "executionType",
+        "orderStatus",
+        "orderId",
+        "lastFilledQty",
+        "cumulativeFilledQty",
+        "lastFilledPrice",
+        "commissionAsset",
+        "commissionAmount",
+        "orderTradeTime",
+        "tradeID",
+        "bidsNotional",
+        "asksNotional",
+        "isMarkerSide",
+        "isReduceOnly",
+        "workingType",
+        "isClosePosition",
+        "activationPrice",
+        "callbackRate",
+        "positionSide",
+    ]
+
     def __init__(self):
         self.eventType = ""
         self.eventTime = 0
@@ -32,6 +66,10 @@ class OrderUpdate:
         self.callbackRate = 0.0
         self.positionSide = None
 
+    def to_dict(self):
+        # field name to value in declaration order, a slots instance has no __dict__
+        return {name: getattr(self, name) for name in OrderUpdate.__slots__}
+
 
     @staticmethod
     def json_parse(json_data):
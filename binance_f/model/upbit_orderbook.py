@@ -2,20 +2,56 @@ from pyupbit.exchange_api import Upbit
 
 
 class Order:
-    def __init__(self):
-        self.price = 0.0
-        self.qty = 0.0
+    __slots__ = ["price", "qty"]
+
+    def __init__(self, price=0.0, qty=0.0):
+        self.price = price
+        self.qty = qty
 
 
 class UpbitOrderbook:
+    # orderbook units are kept as flat float lists, level 0 is the best price
+    # asks and bids build the per level Order objects only when they are read
+    __slots__ = [
+        "type",
+        "code",
+        "total_ask_size",
+        "total_bid_size",
+        "timestamp",
+        "ask_prices",
+        "ask_sizes",
+        "bid_prices",
+        "bid_sizes",
+    ]
+
     def __init__(self):
         self.type = None
         self.code = None
         self.total_ask_size = 0
         self.total_bid_size = 0
         self.timestamp = 0
-        self.asks = list()
-        self.bids = list()
+        self.ask_prices = list()
+        self.ask_sizes = list()
+        self.bid_prices = list()
+        self.bid_sizes = list()
+
+    @property
+    def asks(self):
+        return [Order(price, qty) for price, qty in zip(self.ask_prices, self.ask_sizes)]
+
+    @asks.setter
+    def asks(self, orders):
+        self.ask_prices = [float(order.price) for order in orders]
+        self.ask_sizes = [float(order.qty) for order in orders]
+
+    @property
+    def bids(self):
+        return [Order(price, qty) for price, qty in zip(self.bid_prices, self.bid_sizes)]
+
+    @bids.setter
+    def bids(self, orders):
+        self.bid_prices = [float(order.price) for order in orders]
+        self.bid_sizes = [float(order.qty) for order in orders]
 
     @staticmethod
     def json_parse(json_data):
@@ -27,20 +63,27 @@ class UpbitOrderbook:
         result.timestamp = json_data.get_float("timestamp")
 
         list_array = json_data.get_array("orderbook_units")
-        bid_list = list()
-        ask_list = list()
-
-        for item in list_array.get_items():
-            bid_order = Order()
-            ask_order = Order()
-            val = item.convert_2_dict()
-            bid_order.price = val["bid_price"]
-            bid_order.qty = val["bid_size"]
-            ask_order.price = val["ask_price"]
-            ask_order.qty = val["ask_size"]
-            bid_list.append(bid_order)
-            ask_list.append(ask_order)
-
-        result.asks = ask_list
-        result.bids = bid_list
+        result._set_units(item.convert_2_dict() for item in list_array.get_items())
+        return result
+
+    @staticmethod
+    def from_dict(data):
+        result = UpbitOrderbook()
+        result.type = str(data["type"])
+        result.code = str(data["code"])
+        result.total_ask_size = float(data["total_ask_size"])
+        result.total_bid_size = float(data["total_bid_size"])
+        result.timestamp = float(data["timestamp"])
+        result._set_units(data["orderbook_units"])
         return result
+
+    def _set_units(self, units):
+        ask_prices = self.ask_prices
+        ask_sizes = self.ask_sizes
+        bid_prices = self.bid_prices
+        bid_sizes = self.bid_sizes
+        for unit in units:
+            ask_prices.append(float(unit["ask_price"]))
+            ask_sizes.append(float(unit["ask_size"]))
+            bid_prices.append(float(unit["bid_price"]))
+            bid_sizes.append(float(unit["bid_size"]))
@@ -1,4 +1,42 @@
 class UpbitTicker:
+    __slots__ = [
+        "type",
+        "symbol",
+        "opening_price",
+        "high_price",
+        "low_price",
+        "lastPrice",
+        "prev_closing_price",
+        "change",
+        "change_price",
+        "signed_change_price",
+        "change_rate",
+        "signed_change_rate",
+        "lastQty",
+        "acc_trade_volume",
+        "acc_trade_volume_24h",
+        "acc_trade_price",
+        "acc_trade_price_24h",
+        "trade_date",
+        "trade_time",
+        "trade_timestamp",
+        "ask_bid",
+        "acc_ask_volume",
+        "acc_bid_volume",
+        "highest_52_week_price",
+        "highest_52_week_date",
+        "lowest_52_week_price",
+        "lowest_52_week_date",
+        "trade_status",
+        "market_state",
+        "market_state_for_ios",
+        "is_trading_suspended",
+        "delisting_date",
+        "market_warning",
+        "timestamp",
+        "stream_type",
+    ]
+
     def __init__(self):
         self.type = None
         self.symbol = None
@@ -75,3 +113,43 @@ class UpbitTicker:
         result.stream_type = json_data.get_string("stream_type")
 
         return result
+
+    @staticmethod
+    def from_dict(data):
+        result = UpbitTicker()
+        result.type = str(data["type"])
+        result.symbol = str(data["code"])
+        result.opening_price = float(data["opening_price"])
+        result.high_price = float(data["high_price"])
+        result.low_price = float(data["low_price"])
+        result.lastPrice = float(data["trade_price"])
+        result.prev_closing_price = float(data["prev_closing_price"])
+        result.change = str(data["change"])
+        result.change_price = float(data["change_price"])
+        result.signed_change_price = float(data["signed_change_price"])
+        result.change_rate = float(data["change_rate"])
+        result.signed_change_rate = float(data["signed_change_rate"])
+        result.lastQty = float(data["trade_volume"])
+        result.acc_trade_volume = float(data["acc_trade_volume"])
+        result.acc_trade_volume_24h = float(data["acc_trade_volume_24h"])
+        result.acc_trade_price = float(data["acc_trade_price"])
+        result.acc_trade_price_24h = float(data["acc_trade_price_24h"])
+        result.trade_date = str(data["trade_date"])
+        result.trade_time = str(data["trade_time"])
+        result.trade_timestamp = float(data["trade_timestamp"])
+        result.ask_bid = str(data["ask_bid"])
+        result.acc_ask_volume = float(data["acc_ask_volume"])
+        result.acc_bid_volume = float(data["acc_bid_volume"])
+        result.highest_52_week_price = float(data["highest_52_week_price"])
+        result.highest_52_week_date = str(data["highest_52_week_date"])
+        result.lowest_52_week_price = float(data["lowest_52_week_price"])
+        result.lowest_52_week_date = str(data["lowest_52_week_date"])
+        result.trade_status = str(data["trade_status"])
+        result.market_state = str(data["market_state"])
+        result.market_state_for_ios = str(data["market_state_for_ios"])
+        result.is_trading_suspended = bool(data["is_trading_suspended"])
+        result.market_warning = str(data["market_warning"])
+        result.timestamp = float(data["timestamp"])
+        result.stream_type = str(data["stream_type"])
+
+        return result
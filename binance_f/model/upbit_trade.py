@@ -2,6 +2,23 @@ from binance_f.model.exchangeinformation import Symbol
 
 
 class UpbitTrade:
+    __slots__ = [
+        "type",
+        "symbol",
+        "price",
+        "qty",
+        "ask_bid",
+        "prev_closing_price",
+        "change",
+        "change_price",
+        "trade_date",
+        "trade_time",
+        "trade_timestamp",
+        "timestamp",
+        "sequential_id",
+        "stream_type",
+    ]
+
     def __init__(self):
         self.type = None
         self.symbol = ""
@@ -37,3 +54,23 @@ class UpbitTrade:
         result.stream_type = json_data.get_string("stream_type")
 
         return result
+
+    @staticmethod
+    def from_dict(data):
+        result = UpbitTrade()
+        result.type = str(data["type"])
+        result.symbol = str(data["code"])
+        result.price = float(data["trade_price"])
+        result.qty = float(data["trade_volume"])
+        result.ask_bid = str(data["ask_bid"])
+        result.prev_closing_price = float(data["prev_closing_price"])
+        result.change = str(data["change"])
+        result.change_price = float(data["change_price"])
+        result.trade_date = str(data["trade_date"])
+        result.trade_time = str(data["trade_time"])
+        result.trade_timestamp = float(data["trade_timestamp"])
+        result.timestamp = float(data["timestamp"])
+        result.sequential_id = float(data["sequential_id"])
+        result.stream_type = str(data["stream_type"])
+
+        return result
@@ -21,6 +21,7 @@ class SubscriptionClient(object):
             api_key: The public key applied from Binance.
             secret_key: The private key applied from Binance.
             uri: Set the URI for subscription.
+            upbit_uri, spot_uri: Set the URI of the Upbit and Binance spot subscription, e.g. a local replay server.
             is_auto_connect: When the connection lost is happening on the subscription line, specify whether the client
                             reconnect to server automatically. The connection lost means:
                                 Caused by network problem
@@ -29,6 +30,8 @@ class SubscriptionClient(object):
             receive_limit_ms: Set the receive limit in millisecond. If no message is received within this limit time,
                             the connection will be disconnected.
             connection_delay_failure: If auto reconnect is enabled, specify the delay time before reconnect.
+            capture: Optional tap with a put((channel, receive_time, message)) method, e.g. MarketDataCapture.
+                            Every raw message is pushed to it with the market name as channel.
         """
         api_key = None
         secret_key = None
@@ -54,18 +57,24 @@ class SubscriptionClient(object):
         is_auto_connect = True
         receive_limit_ms = 60000
         connection_delay_failure = 1
+        self.upbit_uri = "wss://api.upbit.com/websocket/v1"
+        self.spot_uri = "wss://stream.binance.com/ws"
         if "uri" in kwargs:
             self.uri = kwargs["uri"]
         if "upbit_uri" in kwargs:
             self.upbit_uri = kwargs["upbit_uri"]
-        self.upbit_uri = "wss://api.upbit.com/websocket/v1"
-        self.spot_uri = "wss://stream.binance.com/ws"
+        if "spot_uri" in kwargs:
+            self.spot_uri = kwargs["spot_uri"]
         if "is_auto_connect" in kwargs:
             is_auto_connect = kwargs["is_auto_connect"]
         if "receive_limit_ms" in kwargs:
             receive_limit_ms = kwargs["receive_limit_ms"]
         if "connection_delay_failure" in kwargs:
             connection_delay_failure = kwargs["connection_delay_failure"]
+        capture = None
+        if "capture" in kwargs:
+            capture = kwargs["capture"]
+        self.capture = capture
         self.__watch_dog = WebSocketWatchDog(is_auto_connect, receive_limit_ms, connection_delay_failure)
 
     def __create_connection(self, request, market="binance_future"):
@@ -80,7 +89,14 @@ class SubscriptionClient(object):
         else:
             uri = self.uri
         connection = WebsocketConnection(
-            self.__api_key, self.__secret_key, uri, self.__watch_dog, request, is_upbit=isupbit
+            self.__api_key,
+            self.__secret_key,
+            uri,
+            self.__watch_dog,
+            request,
+            is_upbit=isupbit,
+            capture=self.capture,
+            channel=market,
         )
         self.connections.append(connection)
         connection.connect()
@@ -0,0 +1,71 @@
+import random
+import warnings
+
+import numpy as np
+
+from binance_f.model.constant import *
+from arte.system.position_pnl import PNL_FIELDS, PositionPnlEngine, position_pnl_history
+
+
+def random_fills(seed, n_positions=300):
+    rnd = random.Random(seed)
+    fills = []
+    for _ in range(n_positions):
+        symbol = rnd.choice(["BTCUSDT", "ETHUSDT", "KRW-XRP"])
+        position_side = rnd.choice([PositionSide.LONG, PositionSide.SHORT])
+        open_side, close_side = (
+            (OrderSide.BUY, OrderSide.SELL) if position_side == PositionSide.LONG else (OrderSide.SELL, OrderSide.BUY)
+        )
+        quantity = 0
+        for _ in range(rnd.randint(1, 4)):
+            fill_quantity = rnd.choice([0.5, 1.0, 2.0, 3.0])
+            fills.append((symbol, position_side, open_side, fill_quantity, rnd.uniform(100, 200), rnd.uniform(0, 0.1)))
+            quantity += fill_quantity
+        if rnd.random() < 0.5:
+            fills.append((symbol, position_side, close_side, quantity / 3, rnd.uniform(100, 200), rnd.uniform(0, 0.1)))
+            quantity -= quantity / 3
+        fills.append((symbol, position_side, close_side, quantity, rnd.uniform(100, 200), rnd.uniform(0, 0.1)))
+    return fills
+
+
+def scale_in_out_fills(n_rounds=1200):
+    # one open, then half closes and reopens without the position ever going flat
+    rnd = random.Random(0)
+    fills = [("BTCUSDT", PositionSide.LONG, OrderSide.BUY, 2.0, 150.0, 0.05)]
+    for _ in range(n_rounds):
+        fills.append(("BTCUSDT", PositionSide.LONG, OrderSide.SELL, 1.0, rnd.uniform(100, 200), 0.05))
+        fills.append(("BTCUSDT", PositionSide.LONG, OrderSide.BUY, 1.0, rnd.uniform(100, 200), 0.05))
+    fills.append(("BTCUSDT", PositionSide.LONG, OrderSide.SELL, 2.0, 150.0, 0.05))
+    return fills
+
+
+def sequential_history(fills):
+    engine = PositionPnlEngine()
+    history = {field: [] for field in PNL_FIELDS}
+    for symbol, position_side, side, quantity, price, commission in fills:
+        position = engine.fill(symbol, position_side, side, quantity, price, commission)
+        for field in PNL_FIELDS:
+            history[field].append(getattr(position, field))
+        if position.quantity == 0:
+            engine.close_position(symbol)
+    return history
+
+
+def check(fills):
+    expected = sequential_history(fills)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        history = position_pnl_history(*[list(column) for column in zip(*fills)])
+    for field in PNL_FIELDS:
+        if field == "position_side":
+            assert list(history[field]) == expected[field]
+            continue
+        values = history[field]
+        assert np.isfinite(values).all(), field
+        assert np.allclose(values, expected[field], rtol=1e-9, atol=1e-9), field
+
+
+check(random_fills(1))
+check(scale_in_out_fills())
+check(random_fills(2) + scale_in_out_fills() + random_fills(3))
+print("position pnl history ok")
@@ -0,0 +1,36 @@
+from decimal import Decimal
+
+import numpy as np
+
+from arte.system.trading_rules import TRADING_RULES, SymbolRules
+
+upbit_rules = TRADING_RULES.get("upbit")
+
+# float noise is ignored, 0.29 / 1e-8 = 28999999.999999996
+assert upbit_rules.floor_quantity(0.29) == 0.29
+assert upbit_rules.floor_quantity(0.1 * 3) == 0.3
+assert upbit_rules.format_quantity(0.29) == "0.29000000"
+
+# large holdings are never rounded up past a lot
+assert upbit_rules.floor_quantity(98765.4321) == 98765.4321
+assert upbit_rules.floor_quantity(1234567.12345678) == 1234567.12345678
+assert upbit_rules.format_quantity(Decimal("1234567.123456789")) == "1234567.12345678"
+assert upbit_rules.format_quantity(Decimal("98765.4321") * Decimal("0.5")) == "49382.71605000"
+
+# floored quantity is never greater than the input, for scalar and array versions
+rng = np.random.default_rng(0)
+for rules in [
+    upbit_rules,
+    TRADING_RULES.get("binance"),
+    SymbolRules([1], lot_size=1.0),
+    SymbolRules([1], lot_size=0.5),
+]:
+    quantities = rng.random(100000) * 10.0 ** rng.integers(-3, 9, 100000)
+    quantities = np.concatenate([quantities, np.round(quantities, 8)])
+    floored = rules.floor_quantities(quantities)
+    assert (floored <= quantities).all()
+    assert (quantities - floored < rules.lot_size * (1 + 1e-6) + quantities * 1e-15).all()
+    for quantity in quantities[::100]:
+        assert rules.floor_quantity(quantity) <= quantity
+
+print("trading rules ok")